@@ -2,23 +2,39 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from rendering import render_bar_rows
+from workbook_loader import load_sheet
+
 def plot_material_bars_from_excel(
     file_path: str,
     sheet_name: str = "25",
     start_date: str = "2025-04-01",
     periods: int = 12,
     width: int = 20,
-    figsize=(16, 5)
+    figsize=(16, 5),
+    output: str = None,
+    fmt: str = "png",
+    workers: int = None
 ):
     """
     Plots monthly bar charts for each material from an Excel sheet.
+
+    Without `output` every chart opens its own window. With a .pdf path or a
+    directory the charts are rendered headless instead (one PDF page or one
+    `fmt` file per material, see rendering.render_bar_rows), and the written
+    paths are returned.
     """
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    df = load_sheet(file_path, sheet_name)
 
     labels = df["FY25"].astype(str) + " - " + df["Material"].astype(str)
     df_numeric = df.drop(columns=["FY25", "Material"]).iloc[:, :periods]
     custom_timestamps = pd.date_range(start=start_date, periods=periods, freq="MS")
 
+    if output is not None:
+        values = df_numeric.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        return render_bar_rows(labels, values, custom_timestamps[:values.shape[1]], output, fmt=fmt,
+                               workers=workers, width=width, figsize=figsize)
+
     # inside plot_material_bars_from_excel()
 
     for i in range(len(df_numeric)):
@@ -42,7 +58,7 @@ def plot_material_bars_from_excel(
 
 
 def main():
-    # Call the plotting function with your file
+    # Call the plotting function with your file; pass e.g. output="materials.pdf" to render headless
     plot_material_bars_from_excel("pidsg25-05.xlsx")
 
 if __name__ == '__main__':
@@ -1,31 +1,79 @@
 
-from fastapi import FastAPI, UploadFile, File
+import time as _time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.responses import JSONResponse
 import pandas as pd
 import numpy as np
-from tempfile import NamedTemporaryFile
+import yaml
 
-from dataclass import ProcurementConfig, ModelData
+from dataclass import ProcurementConfig, ModelData, price_array_from_frames
+from jobs import JobManager, QueueFull
 from model import solve_price_saa
 from postprocess_order import extract_order_matrices
+from result_cache import ResultCache, cache_key
+from scenario_reduction import reduce_scenarios
+from upload_formats import UploadError, detect_format, read_upload
 
-app = FastAPI()
 
-@app.post("/optimize/")
-async def optimize(file: UploadFile = File(...)):
-    # Save uploaded Excel file
-    with NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        contents = await file.read()
-        tmp.write(contents)
-        tmp_path = tmp.name
-
-    # Load Excel sheets
-    xls = pd.ExcelFile(tmp_path)
-    demand_df = pd.read_excel(xls, sheet_name="demand", index_col=0)
-    price_df_s1 = pd.read_excel(xls, sheet_name="p1normal", index_col=0)
-    price_df_s2 = pd.read_excel(xls, sheet_name="p2normal", index_col=0)
-    supplier_df = pd.read_excel(xls, sheet_name="supplier")
-    capacity_df = pd.read_excel(xls, sheet_name="capacity", index_col=0)
+def load_service_config(path="config.yaml"):
+    try:
+        with open(path, "r") as f:
+            return (yaml.safe_load(f) or {}).get("service", {})
+    except FileNotFoundError:
+        return {}
+
+
+service_config = load_service_config()
+jobs = JobManager(workers=service_config.get("workers"),
+                  max_queue=service_config.get("max_queue", 16),
+                  timeout=service_config.get("timeout", 300.0),
+                  result_ttl=service_config.get("result_ttl", 3600.0))
+cache = ResultCache(max_entries=service_config.get("cache_entries", 128),
+                    directory=service_config.get("cache_dir"),
+                    max_bytes=service_config.get("cache_max_bytes", 100 * 2 ** 20))
+
+# Solve parameters; together with the uploaded bytes they form the cache key
+DEFAULT_PARAMS = {
+    "h": 5,
+    "b": 50,
+    "I_0": 0,
+    "B_0": 0,
+    "raw_orders_s2": {1: 125, 2: 125},
+    "enforce_fixed_orders": True,
+    "n_scenarios": None,  # scenario reduction off: the aggregated SAA only sees the mean price
+    "seed": 42,
+}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    jobs.start()
+    yield
+    jobs.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def optimize_upload(contents: bytes, fmt="xlsx", params=None):
+    """
+    Parses the upload from memory (xlsx workbook, Parquet/Arrow zip bundle or
+    JSON, see upload_formats) and solves the price SAA model.
+    Runs in a pool worker; returns the JSON-ready response body.
+    """
+    start = _time.perf_counter()
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
+    # Load and validate the five input tables
+    tables = read_upload(contents, fmt)
+    parse_time = _time.perf_counter() - start
+    demand_df = tables["demand"]
+    price_df_s1 = tables["p1normal"]
+    price_df_s2 = tables["p2normal"]
+    supplier_df = tables["supplier"]
+    capacity_df = tables["capacity"]
 
     # Basic setup
     fixed_demand = demand_df["Actual"].dropna().values
@@ -34,43 +82,122 @@ async def optimize(file: UploadFile = File(...)):
     lead_time = dict(zip(supplier_df["supplier"], supplier_df["lead_time"]))
     lead_time_s2 = int(lead_time["s2"])
 
-    raw_orders_s2 = {1: 125, 2: 125}
-    enforce_fixed_orders = True
+    raw_orders_s2 = {int(t): q for t, q in params["raw_orders_s2"].items()}
+    enforce_fixed_orders = params["enforce_fixed_orders"]
     fixed_orders_s2 = {
         (t, t + lead_time_s2): q
         for t, q in raw_orders_s2.items()
         if t + lead_time_s2 < T
     } if enforce_fixed_orders else None
 
-    price_samples = []
-    N = price_df_s1.shape[1]
-    for i in range(N):
-        sample_prices = {}
-        for t in range(T):
-            sample_prices[(t, 's1')] = price_df_s1.iloc[t, i]
-            sample_prices[(t, 's2')] = price_df_s2.iloc[t, i]
-        price_samples.append(sample_prices)
+    price_samples = price_array_from_frames({"s1": price_df_s1, "s2": price_df_s2}, S)[:, :T]
+
+    reduced_samples, scenario_weights, reduction = reduce_scenarios(
+        price_samples, n_scenarios=params["n_scenarios"], seed=params["seed"])
 
     order_cost = dict(zip(supplier_df["supplier"], supplier_df["order_cost"]))
     capacity_dict = {(t, s): capacity_df.loc[t + 1, s] for t in range(T) for s in S}
 
     # Optimization
-    h, b, I_0, B_0 = 5, 50, 0, 0
-    obj_val, df_result = solve_price_saa(
+    h, b, I_0, B_0 = params["h"], params["b"], params["I_0"], params["B_0"]
+    obj_val, result = solve_price_saa(
         fixed_demand=fixed_demand,
-        price_samples=price_samples[:5],
+        price_samples=reduced_samples,
+        scenario_weights=scenario_weights,
         order_cost=order_cost,
         lead_time=lead_time,
         capacity_dict=capacity_dict,
         h=h, b=b, I_0=I_0, B_0=B_0,
-        fixed_orders_s2=fixed_orders_s2
+        fixed_orders_s2=fixed_orders_s2,
+        return_result=True,
+        verbose=False,
     )
 
-    order_placed, order_arr = extract_order_matrices(df_result)
+    order_placed, order_arr = extract_order_matrices(result)
 
-    return JSONResponse({
+    return {
         "objective_value": obj_val,
         "orders_placed": order_placed.to_dict(),
         "orders_arrival": order_arr.to_dict(),
-    })
+        "scenario_reduction": reduction,
+        "parse_time": parse_time,
+        "compute_time": _time.perf_counter() - start,
+    }
+
+
+def _store(key):
+    def on_done(result):
+        try:
+            cache.put(key, result)
+        except OSError as exc:
+            print(f"Result cache write failed: {exc!r}")
+    return on_done
+
+
+def _submit(contents, fmt="xlsx"):
+    """
+    Returns a job id for the upload. A cache hit is registered as an already
+    finished job; a miss is queued in the pool and cached when it completes.
+    """
+    start = _time.perf_counter()
+    key = cache_key(contents, {**DEFAULT_PARAMS, "format": fmt})
+    cached, tier = cache.get(key)
+    if cached is not None:
+        result = {**cached, "cache": "hit", "cache_tier": tier,
+                  "lookup_time": _time.perf_counter() - start,
+                  "time_saved": cached.get("compute_time", 0.0)}
+        return jobs.add_finished(result)
+    try:
+        return jobs.submit(optimize_upload, contents, fmt, on_done=_store(key))
+    except QueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "5"})
+
+
+def _job_or_404(job_id):
+    if job_id not in jobs.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return jobs.status(job_id)
+
+
+@app.post("/jobs/", status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    job_id = _submit(await file.read(), detect_format(file.filename, file.content_type))
+    return {"job_id": job_id, "status": jobs.status(job_id)["status"]}
+
+
+@app.post("/jobs/json/", status_code=202)
+async def submit_job_json(request: Request):
+    job_id = _submit(await request.body(), "json")
+    return {"job_id": job_id, "status": jobs.status(job_id)["status"]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _job_or_404(job_id)
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    _job_or_404(job_id)
+    cancelled = jobs.cancel(job_id)
+    return {**jobs.status(job_id), "cancelled": cancelled}
+
+
+async def _respond(job_id):
+    job = await jobs.wait(job_id)
+    if job["status"] != "done":
+        status_code = {"timeout": 504, "failed": 422 if job.get("error_type") == UploadError.__name__ else 500}
+        return JSONResponse(job, status_code=status_code.get(job["status"], 500))
+    return JSONResponse({"cache": "miss", "time_saved": 0.0, **job["result"]})
+
+
+@app.post("/optimize/")
+async def optimize(file: UploadFile = File(...)):
+    # Same response as before, but the solve runs in the pool and this handler only awaits it.
+    # .xlsx workbooks and .zip Parquet/Arrow bundles are told apart by file name.
+    return await _respond(_submit(await file.read(), detect_format(file.filename, file.content_type)))
+
 
+@app.post("/optimize/json/")
+async def optimize_json(request: Request):
+    return await _respond(_submit(await request.body(), "json"))
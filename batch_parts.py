@@ -0,0 +1,173 @@
+
+import time as _time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from parametric_model import ParametricPriceSAA
+from price_distributions import PriceDistributionGenerator
+from rendering import render_bar_rows
+from workbook_loader import load_problem_sheets
+
+_MODEL = None
+
+
+def load_shared_setup(file_path, T):
+    """
+    Supplier order costs, lead times and capacities shared by every part, for a
+    T-month horizon.
+    """
+    sheets = load_problem_sheets(file_path, ("supplier", "capacity"))
+    supplier_df = sheets["supplier"]
+    capacity_df = sheets["capacity"]
+
+    S = supplier_df["supplier"].tolist()
+    return {
+        "S": S,
+        "lead_time": dict(zip(supplier_df["supplier"], supplier_df["lead_time"])),
+        "order_cost": dict(zip(supplier_df["supplier"], supplier_df["order_cost"])),
+        "capacity_dict": {(t, s): capacity_df.loc[t + 1, s] for t in range(T) for s in S},
+    }
+
+
+def _init_worker(setup, price_array, problem):
+    """Builds the parametric model once per worker; only demand changes per part."""
+    global _MODEL
+    T = price_array.shape[1]
+    _MODEL = ParametricPriceSAA(T, setup["S"], setup["lead_time"])
+    _MODEL.update(h=problem["h"], b=problem["b"], I_0=problem.get("I_0", 0.0), B_0=problem.get("B_0", 0.0),
+                  order_cost=setup["order_cost"], capacity=setup["capacity_dict"], price_samples=price_array)
+
+
+def solve_chunk(parts, demands):
+    """
+    Solves one plan per part for a chunk of parts. Returns one record per part;
+    infeasible parts and exceptions are recorded, not raised.
+    """
+    records = []
+    for part, demand in zip(parts, demands):
+        start = _time.perf_counter()
+        record = {"part": part, "objective": np.nan, "status": None, "error": None,
+                  "placed": None, "arrival": None}
+        try:
+            obj_val, result = _MODEL.solve(demand=demand, return_result=True)
+            record["status"] = result.status
+            if result.status in ("optimal", "optimal_inaccurate"):
+                placed, arrival = result.order_matrices()
+                record.update(objective=obj_val, placed=placed.values, arrival=arrival.values)
+        except Exception as exc:
+            record["status"] = "error"
+            record["error"] = repr(exc)
+        record["solve_time"] = _time.perf_counter() - start
+        records.append(record)
+    return records
+
+
+def _to_columnar(records, months, suppliers):
+    """Long (part, month) table with one placed_/arrival_ column per supplier."""
+    frames = []
+    for rec in records:
+        frame = pd.DataFrame({"part": rec["part"], "month": months})
+        for j, s in enumerate(suppliers):
+            frame[f"placed_{s}"] = rec["placed"][:, j] if rec["placed"] is not None else np.nan
+            frame[f"arrival_{s}"] = rec["arrival"][:, j] if rec["arrival"] is not None else np.nan
+        frame["objective"] = rec["objective"]
+        frame["status"] = rec["status"]
+        frame["error"] = rec["error"]
+        frame["solve_time"] = rec["solve_time"]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_batch(matrix, setup, price_array, problem, workers=None, chunk_size=16):
+    """
+    Solves one procurement plan per Part Number row of `matrix` (Part x month).
+
+    Parts are submitted to a process pool in chunks of chunk_size. Each worker
+    compiles the model once and re-solves it with each part's demand.
+
+    Returns the long results table keyed by (part, month).
+    """
+    parts = matrix.index.astype(str).tolist()
+    values = matrix.to_numpy(dtype=float)
+    months = [str(c) for c in matrix.columns]
+    suppliers = sorted(setup["S"])
+
+    records = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(setup, price_array, problem)) as pool:
+        futures = [pool.submit(solve_chunk, parts[i:i + chunk_size], values[i:i + chunk_size])
+                   for i in range(0, len(parts), chunk_size)]
+        for future in as_completed(futures):
+            try:
+                records.extend(future.result())
+            except Exception as exc:
+                # A crashed worker loses its whole chunk; report those parts as failed
+                i = futures.index(future) * chunk_size
+                records.extend({"part": p, "objective": np.nan, "status": "error", "error": repr(exc),
+                                "placed": None, "arrival": None, "solve_time": np.nan}
+                               for p in parts[i:i + chunk_size])
+
+    order = {p: i for i, p in enumerate(parts)}
+    records.sort(key=lambda rec: order[rec["part"]])
+    return _to_columnar(records, months, suppliers)
+
+
+def render_order_report(results, output, fmt="png", workers=None):
+    """
+    One chart of placed orders per part (a bar per supplier and month), written
+    headless to a multi-page .pdf or to a directory of `fmt` files.
+    """
+    placed = [c for c in results.columns if c.startswith("placed_")]
+    parts = results["part"].drop_duplicates().tolist()
+    months = results["month"].drop_duplicates().tolist()
+    values = results[placed].to_numpy(dtype=float).reshape(len(parts), len(months), len(placed))
+    timestamps = pd.PeriodIndex(months, freq="M").to_timestamp()
+    return render_bar_rows(parts, values, timestamps, output, fmt=fmt, workers=workers,
+                           series=[c[len("placed_"):] for c in placed])
+
+
+def write_results(results, output_path):
+    """Writes the results table to Parquet, or CSV when pyarrow is unavailable."""
+    if output_path.endswith(".parquet"):
+        try:
+            results.to_parquet(output_path, index=False)
+            return output_path
+        except ImportError:
+            output_path = output_path[:-len(".parquet")] + ".csv"
+    results.to_csv(output_path, index=False)
+    return output_path
+
+
+if __name__ == "__main__":
+    with open("config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    batch_cfg = config["batch"]
+    problem = config["problem"]
+
+    matrix = pd.read_csv(batch_cfg["input"], index_col=0)
+    T = matrix.shape[1]
+    setup = load_shared_setup(batch_cfg["workbook"], T)
+
+    dist_name = config["distribution_name"]
+    generator = PriceDistributionGenerator(T=T, N=problem["N"], seed=problem["seed"])
+    price_array = generator.generate_array(dist_name, config["distributions"][dist_name], suppliers=setup["S"])
+
+    start = _time.perf_counter()
+    results = run_batch(matrix, setup, price_array, {**problem, "I_0": 0.0, "B_0": 0.0},
+                        workers=batch_cfg.get("workers"), chunk_size=batch_cfg.get("chunk_size", 16))
+    output_path = write_results(results, batch_cfg["output"])
+
+    summary = results.drop_duplicates("part")
+    failed = summary[~summary["status"].isin(["optimal", "optimal_inaccurate"])]
+    print(f"Solved {len(summary)} parts in {_time.perf_counter() - start:.2f}s -> {output_path}")
+
+    if batch_cfg.get("report"):
+        start = _time.perf_counter()
+        paths = render_order_report(results, batch_cfg["report"], workers=batch_cfg.get("workers"))
+        print(f"Rendered {len(paths)} order charts in {_time.perf_counter() - start:.2f}s -> {batch_cfg['report']}")
+    print(f"Failed or infeasible parts: {len(failed)}")
+    if len(failed):
+        print(failed[["part", "status", "error"]].to_string(index=False))
@@ -0,0 +1,263 @@
+
+"""
+Scaling benchmark for the price SAA pipeline.
+
+Each case (T periods, S suppliers, N price samples, backend) is a synthetic
+instance. Its prices come from PriceDistributionGenerator; demand, price
+levels, order costs, lead times (1-3) and capacities are drawn per supplier, so
+no supplier dominates and every supplier count is a different problem. Both
+backends solve the LP relaxation (integer_orders=False for highs), so their
+objectives are comparable. The case runs in a fresh process, and the stages
+are timed separately:
+
+    generate     PriceDistributionGenerator.generate_array, (N, T, S) prices
+    build        model assembly (solve_price_saa timings)
+    compile      CVXPY canonicalization (0 for the highs backend)
+    solve        solver time
+    to_frame     SAAResult.to_frame, the string-keyed result table
+    extract      postprocess_order.extract_order_matrices
+    cost         Cost.compute_inventory_backlog_cost
+
+Peak memory is the process's maximum RSS after each stage. The order variables
+grow as O(T^2 S) and the prices as O(N T S), so cases over max_variables or
+max_price_cells are recorded as skipped instead of run.
+
+Results go to a JSON file (environment plus one record per case). With a
+baseline file, every stage time is compared against the matching baseline
+case. Stages that got slower by more than the tolerance (and by more than
+min_seconds) are reported as regressions.
+
+Usage:
+    python benchmark.py                       # grid "quick" from the benchmark block of config.yaml
+    python benchmark.py --grid full
+    python benchmark.py --save-baseline       # also store the results as the baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time as _time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import yaml
+
+STAGES = ("generate", "build", "compile", "solve", "to_frame", "extract", "cost")
+CASE_KEY = ("T", "S", "N", "backend")
+
+# Used when config.yaml has no benchmark block
+DEFAULT_GRIDS = {
+    "quick": {"T": [12, 24], "S": [2, 5], "N": [5, 1000], "backend": ["cvxpy", "highs"]},
+    "full": {"T": [12, 24, 52, 104, 365], "S": [2, 5, 10, 20, 50], "N": [5, 100, 1000, 10000, 100000],
+             "backend": ["cvxpy"]},
+}
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def make_instance(T, S, N, dist="normal", seed=0):
+    """
+    Synthetic procurement instance with S suppliers "s1".."sS" and N price samples
+    from PriceDistributionGenerator. Returns the solve_price_saa keyword arguments.
+    """
+    from price_distributions import PriceDistributionGenerator
+
+    suppliers = [f"s{j + 1}" for j in range(S)]
+    rng = np.random.default_rng(seed)
+    demand = rng.uniform(100, 300, T)
+    means = rng.uniform(35.0, 55.0, S)
+    params = {s: {"mean": means[j], "std": rng.uniform(2.0, 8.0)} for j, s in enumerate(suppliers)}
+    price_samples = PriceDistributionGenerator(T=T, N=N, seed=seed).generate_array(dist, params, suppliers)
+    # Each supplier covers 20-60% of the peak demand per period, so cheap
+    # suppliers run out and the solver has to mix
+    capacity = rng.uniform(0.2, 0.6, (T, S)) * demand.max()
+    return {
+        "fixed_demand": demand,
+        "price_samples": price_samples,
+        "order_cost": dict(zip(suppliers, rng.uniform(30.0, 80.0, S))),
+        "lead_time": dict(zip(suppliers, rng.integers(1, 4, S).tolist())),
+        "capacity_dict": {(t, s): capacity[t, j] for t in range(T) for j, s in enumerate(suppliers)},
+        "h": 5, "b": 50, "I_0": 0.0, "B_0": 0.0,
+    }
+
+
+def n_order_variables(T, S):
+    """Number of (t, s, t') order triples, i.e. the length of the flat Q axis."""
+    return S * T * (T + 1) // 2
+
+
+def run_case(T, S, N, backend="cvxpy", seed=0):
+    """Runs one case and returns its record (stage times in seconds, peak RSS in MB)."""
+    from cost import Cost
+    from model import solve_price_saa
+    from postprocess_order import extract_order_matrices
+
+    record = {"T": T, "S": S, "N": N, "backend": backend, "variables": n_order_variables(T, S),
+              "status": None, "error": None, "objective": None}
+    memory = {"start": _peak_rss_mb()}
+    times = {}
+    try:
+        start = _time.perf_counter()
+        instance = make_instance(T, S, N, seed=seed)
+        times["generate"] = _time.perf_counter() - start
+        memory["generate"] = _peak_rss_mb()
+
+        # The cvxpy path relaxes Y; solve the same LP relaxation with HiGHS
+        objective, result = solve_price_saa(**instance, backend=backend, return_result=True, verbose=False,
+                                            solver_options={"integer_orders": False} if backend == "highs" else None)
+        for stage in ("build", "compile", "solve"):
+            times[stage] = result.timings.get(f"{stage}_time", 0.0)
+        memory["solve"] = _peak_rss_mb()
+        record["status"], record["objective"] = result.status, objective
+
+        start = _time.perf_counter()
+        frame = result.to_frame()
+        times["to_frame"] = _time.perf_counter() - start
+
+        start = _time.perf_counter()
+        order_placed, _ = extract_order_matrices(frame)
+        times["extract"] = _time.perf_counter() - start
+        memory["postprocess"] = _peak_rss_mb()
+
+        start = _time.perf_counter()
+        Cost(frame, order_placed, initial_inventory=instance["I_0"],
+             demand=instance["fixed_demand"]).compute_inventory_backlog_cost(instance["h"], instance["b"])
+        times["cost"] = _time.perf_counter() - start
+    except Exception as exc:
+        record["status"], record["error"] = "error", repr(exc)
+    memory["end"] = _peak_rss_mb()
+
+    record.update({f"{stage}_time": times.get(stage) for stage in STAGES})
+    record["total_time"] = sum(times.values())
+    record.update({f"peak_rss_mb_{stage}": value for stage, value in memory.items()})
+    return record
+
+
+def grid_cases(grid, max_variables=250_000, max_price_cells=50_000_000):
+    """Cartesian product of the grid; yields (case, skip reason or None)."""
+    for T, S, N, backend in product(grid["T"], grid["S"], grid["N"], grid.get("backend", ["cvxpy"])):
+        case = {"T": T, "S": S, "N": N, "backend": backend}
+        if n_order_variables(T, S) > max_variables:
+            yield case, f"{n_order_variables(T, S)} order variables > max_variables"
+        elif N * T * S > max_price_cells:
+            yield case, f"{N * T * S} price cells > max_price_cells"
+        else:
+            yield case, None
+
+
+def run_benchmark(grid, max_variables=250_000, max_price_cells=50_000_000, seed=0, repeats=1):
+    """
+    Runs every case of the grid, each repeat in a fresh process (so the peak RSS
+    belongs to that case alone), and keeps the fastest repeat per case.
+
+    Returns a DataFrame with one row per case.
+    """
+    records = []
+    for case, skip in grid_cases(grid, max_variables, max_price_cells):
+        if skip:
+            records.append({**case, "variables": n_order_variables(case["T"], case["S"]),
+                            "status": "skipped", "error": skip})
+            print(f"T={case['T']:>4} S={case['S']:>3} N={case['N']:>6} {case['backend']:<6} skipped: {skip}")
+            continue
+        runs = []
+        for _ in range(repeats):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                runs.append(pool.submit(run_case, **case, seed=seed).result())
+        best = min(runs, key=lambda rec: rec["total_time"])
+        records.append(best)
+        print(f"T={case['T']:>4} S={case['S']:>3} N={case['N']:>6} {case['backend']:<6} "
+              f"{str(best['status'])[:10]:<10} total {best['total_time']:8.3f}s  "
+              + "  ".join(f"{stage} {best[f'{stage}_time'] or 0:.3f}" for stage in STAGES)
+              + f"  peak {best['peak_rss_mb_end']:.0f} MB")
+    return pd.DataFrame.from_records(records)
+
+
+def environment():
+    versions = {"python": platform.python_version()}
+    for module in ("numpy", "scipy", "pandas", "cvxpy"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {"platform": platform.platform(), "cpu_count": os.cpu_count(), "versions": versions,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+
+
+def write_results(results, path, grid_name=None):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {"grid": grid_name, "environment": environment(),
+               "cases": json.loads(results.to_json(orient="records"))}
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=1)
+    return path
+
+
+def read_results(path):
+    with open(path) as f:
+        return pd.DataFrame.from_records(json.load(f)["cases"])
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_seconds=0.05):
+    """
+    Stage-by-stage comparison with a baseline run (DataFrame or results file).
+
+    Returns one row per (case, stage) present in both runs with the baseline and
+    current times, their ratio and a `regression` flag: slower by more than
+    `tolerance` (relative) and by more than `min_seconds` (absolute).
+    """
+    if isinstance(baseline, str):
+        baseline = read_results(baseline)
+    columns = [f"{stage}_time" for stage in STAGES] + ["total_time"]
+
+    def long(df):
+        df = df[df["status"] != "skipped"]
+        df = df[list(CASE_KEY) + [c for c in columns if c in df.columns]]
+        return df.melt(id_vars=list(CASE_KEY), var_name="stage", value_name="seconds").dropna()
+
+    merged = long(baseline).merge(long(results), on=list(CASE_KEY) + ["stage"], suffixes=("_baseline", ""))
+    merged["stage"] = merged["stage"].str.replace("_time", "", regex=False)
+    merged["ratio"] = merged["seconds"] / merged["seconds_baseline"].where(merged["seconds_baseline"] > 0)
+    merged["regression"] = ((merged["seconds"] > merged["seconds_baseline"] * (1 + tolerance))
+                            & (merged["seconds"] - merged["seconds_baseline"] > min_seconds))
+    return merged
+
+
+if __name__ == "__main__":
+    with open("config.yaml", "r") as f:
+        bench_cfg = (yaml.safe_load(f) or {}).get("benchmark", {})
+    grids = {**DEFAULT_GRIDS, **bench_cfg.get("grids", {})}
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--grid", default="quick", choices=sorted(grids))
+    parser.add_argument("--output", default=bench_cfg.get("output", "benchmark_results/latest.json"))
+    parser.add_argument("--baseline", default=bench_cfg.get("baseline", "benchmark_results/baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--repeats", type=int, default=bench_cfg.get("repeats", 1))
+    args = parser.parse_args()
+
+    results = run_benchmark(grids[args.grid],
+                            max_variables=bench_cfg.get("max_variables", 250_000),
+                            max_price_cells=bench_cfg.get("max_price_cells", 50_000_000),
+                            seed=bench_cfg.get("seed", 0), repeats=args.repeats)
+    print(f"Results written to {write_results(results, args.output, args.grid)}")
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        comparison = compare_to_baseline(results, args.baseline, tolerance=bench_cfg.get("tolerance", 0.25),
+                                         min_seconds=bench_cfg.get("min_seconds", 0.05))
+        regressions = comparison[comparison["regression"]]
+        print(f"Compared {len(comparison)} stage timings with {args.baseline}: {len(regressions)} regressions")
+        if len(regressions):
+            print(regressions.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+            sys.exit(1)
+    if args.save_baseline:
+        print(f"Baseline written to {write_results(results, args.baseline, args.grid)}")
@@ -0,0 +1,58 @@
+
+"""
+Timing of extraction_demand.fuzzy_match_part_numbers against the naive nested loop.
+
+Usage:
+    python benchmark_fuzzy_match.py
+"""
+
+import time as _time
+
+import numpy as np
+import pandas as pd
+
+from extraction_demand import fuzzy_match_part_numbers
+
+
+def benchmark_fuzzy_match(n1=100_000, n2=100_000, seed=0, naive_sample=2_000):
+    """
+    Times fuzzy_match_part_numbers on synthetic catalogues shaped like the real
+    part numbers (e.g. 'EEFSX0E471E4EF1'): df2 holds n2 unique codes, df1 draws
+    n1 parts of which a third are exact, a third are truncated codes and a third
+    are unknown. The naive nested loop is timed on naive_sample x naive_sample
+    and extrapolated.
+    """
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list("ABCDEFGHJKLMNPRSTUVWXYZ0123456789"))
+
+    def codes(n):
+        body = rng.choice(alphabet, size=(n, 10))
+        return ["EEF" + "".join(row) for row in body]
+
+    catalogue = list(dict.fromkeys(codes(int(n2 * 1.1))))[:n2]
+    picks = rng.integers(len(catalogue), size=n1)
+    kind = rng.integers(3, size=n1)
+    unknown = codes(n1)
+    queries = [catalogue[p] if k == 0 else catalogue[p][:11] + " " + catalogue[p][11:12] if k == 1 else u
+               for p, k, u in zip(picks, kind, unknown)]
+    df1 = pd.DataFrame(index=pd.Index(queries).unique())
+    df2 = pd.DataFrame(index=pd.Index(catalogue))
+
+    start = _time.perf_counter()
+    mapping, unmatched_df1, _ = fuzzy_match_part_numbers(df1, df2)
+    indexed_time = _time.perf_counter() - start
+
+    sample1, sample2 = list(df1.index[:naive_sample]), list(df2.index[:naive_sample])
+    start = _time.perf_counter()
+    for part1 in sample1:
+        for part2 in sample2:
+            if part1.replace(" ", "") in part2.replace(" ", "") or part2.replace(" ", "") in part1.replace(" ", ""):
+                break
+    naive_time = (_time.perf_counter() - start) * (len(df1) / len(sample1)) * (len(df2) / len(sample2))
+
+    return {"n1": len(df1), "n2": len(df2), "matched": len(mapping), "unmatched": len(unmatched_df1),
+            "indexed_time": indexed_time, "naive_time_estimate": naive_time}
+
+
+if __name__ == "__main__":
+    print(benchmark_fuzzy_match())
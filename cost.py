@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 
 class Cost:
     def __init__(self, df_result, order_placed, initial_inventory=0.0, demand=None):
@@ -14,22 +15,93 @@ class Cost:
         - h: inventory holding cost per unit
         - b: backlog cost per unit
         """
-        T = self.order_placed.shape[0]
-        inventory = self.initial_inventory
-        backlog = 0.0
+        plans = np.asarray(self.order_placed, dtype=float)[None]
+        demands = np.asarray(self.demand, dtype=float)[None]
+        sim = self.simulate_batch(plans, demands, h, b, initial_inventory=self.initial_inventory,
+                                  return_tensors=True)
+        return sim["inventory_cost"][0, 0], sim["backlog_cost"][0, 0]
 
-        inv_cost = np.zeros(T)
-        backlog_cost = np.zeros(T)
+    @staticmethod
+    def step(inventory, backlog, inflow, demand):
+        """
+        Advances inventory and backlog by one period given the period's inflow and demand.
+        """
+        supply = inventory + inflow - backlog
+        return max(supply - demand, 0), max(demand - supply, 0)
+
+    @staticmethod
+    def simulate_batch(plans, demands, h, b, initial_inventory=0.0, initial_backlog=0.0,
+                       return_tensors=False, chunk_size=None, dtype=np.float64,
+                       quantiles=(0.05, 0.5, 0.95)):
+        """
+        Simulates inventory and backlog for P order plans against D demand paths at once.
+
+        - plans: (P, T, S) quantities entering stock per period and supplier
+          (e.g. stacked order_placed or order_arrival matrices)
+        - demands: (D, T) demand paths
+        - h, b: inventory holding / backlog cost per unit
+        - return_tensors: also return the per-period (P, D, T) cost tensors (opt-in:
+          at P=10^3, D=10^4, T=12 each tensor takes about 1 GB); by default only
+          (P, D) totals are kept, which scales to far larger P x D
+        - chunk_size: demand paths processed per block (bounds temporary memory)
+
+        Returns a dict with
+            - inventory_cost, backlog_cost: (P, D, T) per-period costs (if return_tensors)
+            - total_cost: (P, D) total inventory + backlog cost
+            - summary: DataFrame with one row per plan: mean, std, min, quantiles and
+              max of total cost over the demand paths, mean inventory and backlog cost,
+              and the share of paths that ever end a period in backlog
+        """
+        plans = np.asarray(plans, dtype=dtype)
+        demands = np.asarray(demands, dtype=dtype)
+        if plans.ndim == 2:
+            plans = plans[:, :, None]
+        P, T = plans.shape[:2]
+        D = len(demands)
+        if demands.shape[1] != T:
+            raise ValueError(f"Demand paths have {demands.shape[1]} periods, plans have {T}")
+        chunk_size = chunk_size or max(1, min(D, 2 ** 24 // max(P * T, 1)))
 
-        for t in range(T):
-            total_order = self.order_placed.iloc[t].sum()
-            supply = inventory + total_order - backlog
-            fulfilled = min(supply, self.demand[t])
+        # Repeating step() gives I_t - B_t = I_0 - B_0 + sum_{u<=t} (inflow_u - demand_u),
+        # with I_t and B_t its positive and negative parts, so the recurrence over t
+        # reduces to two cumulative sums broadcast over (P, D).
+        cum_inflow = np.cumsum(plans.sum(axis=2), axis=1)[:, None, :]
+        x0 = np.dtype(dtype).type(initial_inventory - initial_backlog)
 
-            inventory = max(supply - self.demand[t], 0)
-            backlog = max(self.demand[t] - supply, 0)
+        inventory_cost = np.empty((P, D, T), dtype=dtype) if return_tensors else None
+        backlog_cost = np.empty((P, D, T), dtype=dtype) if return_tensors else None
+        total_inventory = np.empty((P, D), dtype=dtype)
+        total_backlog = np.empty((P, D), dtype=dtype)
+        any_backlog = np.empty((P, D), dtype=bool)
 
-            inv_cost[t] = h * inventory
-            backlog_cost[t] = b * backlog
+        for start in range(0, D, chunk_size):
+            stop = min(start + chunk_size, D)
+            net = cum_inflow - np.cumsum(demands[start:stop], axis=1)[None]
+            net += x0
+            inventory = np.maximum(net, 0)
+            backlog = np.maximum(np.negative(net, out=net), 0, out=net)
+            total_inventory[:, start:stop] = h * inventory.sum(axis=2)
+            total_backlog[:, start:stop] = b * backlog.sum(axis=2)
+            any_backlog[:, start:stop] = (backlog > 0).any(axis=2)
+            if return_tensors:
+                np.multiply(inventory, h, out=inventory_cost[:, start:stop])
+                np.multiply(backlog, b, out=backlog_cost[:, start:stop])
 
-        return inv_cost, backlog_cost
+        total_cost = total_inventory + total_backlog
+        summary = pd.DataFrame({
+            "plan": np.arange(P),
+            "mean_cost": total_cost.mean(axis=1),
+            "std_cost": total_cost.std(axis=1, ddof=1) if D > 1 else np.zeros(P),
+            "min_cost": total_cost.min(axis=1),
+            **{f"q{round(q * 100):02d}_cost": np.quantile(total_cost, q, axis=1) for q in quantiles},
+            "max_cost": total_cost.max(axis=1),
+            "mean_inventory_cost": total_inventory.mean(axis=1),
+            "mean_backlog_cost": total_backlog.mean(axis=1),
+            "backlog_probability": any_backlog.mean(axis=1),
+        })
+        return {
+            "inventory_cost": inventory_cost,
+            "backlog_cost": backlog_cost,
+            "total_cost": total_cost,
+            "summary": summary,
+        }
@@ -16,10 +16,45 @@ class ProcurementConfig:
 @dataclass
 class ModelData:
     fixed_demand: np.ndarray
-    price_samples: List[Dict[Tuple[int, str], float]]
+    price_samples: np.ndarray            # (N, T, S) float, suppliers ordered as S
     order_cost: Dict[str, float]
     lead_time: Dict[str, int]
     capacity_dict: Dict[Tuple[int, str], float]
     T: int
     S: List[str]
 
+    @property
+    def supplier_index(self) -> Dict[str, int]:
+        return {s: j for j, s in enumerate(self.S)}
+
+    def price_sample_dicts(self) -> List[Dict[Tuple[int, str], float]]:
+        """Compatibility view of price_samples as [(t, s) -> price] dicts."""
+        return price_dicts_from_array(self.price_samples, self.S)
+
+
+def price_array_from_frames(price_frames, suppliers, n_samples=None) -> np.ndarray:
+    """
+    Stacks per-supplier price frames ({supplier: T x N frame}, one column per
+    sample) into one contiguous (N, T, S) float array with the last axis in
+    `suppliers` order (the solver's order, i.e. list(order_cost)), optionally
+    keeping the first n_samples.
+    """
+    missing = [s for s in suppliers if s not in price_frames]
+    if missing:
+        raise ValueError(f"No price samples for suppliers: {missing}")
+    arrays = [price_frames[s].to_numpy(dtype=float)[:, :n_samples] for s in suppliers]
+    N = min(a.shape[1] for a in arrays)
+    return np.ascontiguousarray(np.stack([a[:, :N].T for a in arrays], axis=2))
+
+
+def price_array_from_dicts(price_samples, T, S) -> np.ndarray:
+    """Converts [(t, s) -> price] dicts into an (N, T, S) float array."""
+    return np.array([[[sample[(t, s)] for s in S] for t in range(T)]
+                     for sample in price_samples], dtype=float)
+
+
+def price_dicts_from_array(price_array, S) -> List[Dict[Tuple[int, str], float]]:
+    """Converts an (N, T, S) price array into [(t, s) -> price] dicts."""
+    T = price_array.shape[1]
+    return [{(t, s): sample[t, j] for t in range(T) for j, s in enumerate(S)}
+            for sample in price_array]
@@ -0,0 +1,116 @@
+
+import time as _time
+
+import numpy as np
+from scipy.stats import norm
+
+from cost import Cost
+from price_distributions import PriceDistributionGenerator
+
+
+def evaluate_plan_out_of_sample(order_placed, order_arr, demand, dist, params, order_cost,
+                                h, b, I_0=0.0, B_0=0.0, n_scenarios=100_000, chunk_size=100_000,
+                                seed=None, worker=1, confidence=0.95,
+                                quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), in_sample_objective=None,
+                                in_sample_prices=None, in_sample_weights=None):
+    """
+    Evaluates a fixed procurement plan against a fresh price sample.
+
+    Parameters:
+    -----------
+    order_placed, order_arr : pd.DataFrame
+        [T x S] matrices from extract_order_matrices (columns are supplier names).
+    demand : array-like
+        (T,) demand path the plan was solved for.
+    dist, params :
+        Price distribution name and parameters, as for PriceDistributionGenerator.
+    order_cost : dict
+        Fixed cost per order, charged once for every (t, s) with a positive placement
+        (the plan's actual cost; the cvxpy SAA objective charges the relaxed,
+        fractional Y instead).
+    h, b, I_0, B_0 :
+        Holding and backlog follow the arrivals (order_arr), as in the SAA model.
+        Cost.compute_inventory_backlog_cost, as main.py calls it, books the
+        placements (order_placed) without lead times, so its holding and backlog
+        figures differ from these.
+    n_scenarios, chunk_size : int
+        Scenarios are drawn and priced chunk_size at a time, so only one
+        (T, chunk) block per supplier is in memory. 10^6 scenarios narrow the
+        confidence interval further at about 10x the run time.
+    seed, worker :
+        The sample uses the generator stream for `worker`. The default worker=1
+        is independent of the worker-0 stream used to build the SAA samples
+        from the same seed.
+    in_sample_objective : float, optional
+        SAA objective of the plan, reported as is.
+    in_sample_prices, in_sample_weights : optional
+        The (N, T, S) SAA price samples (suppliers in order_placed column order)
+        and their probabilities (default uniform). The plan is re-costed on them
+        with the same cost model as the fresh sample (in_sample_cost), so that
+        optimism_gap = mean - in_sample_cost is the SAA optimism bias alone and
+        relaxation_gap = in_sample_cost - in_sample_objective is the part due to
+        the relaxed fixed-order term.
+
+    Returns:
+    --------
+    dict with mean, std, standard error, confidence interval and quantiles of the
+    total (procurement + order + holding + backlog) cost per scenario, the
+    deterministic holding/backlog part, and the in-sample figures when available.
+    """
+    suppliers = list(order_placed.columns)
+    placed = order_placed[suppliers].to_numpy(dtype=float)                 # (T, S)
+    arrivals = order_arr[suppliers].to_numpy(dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    T = len(demand)
+
+    # Prices only touch the procurement term; holding and backlog follow from the
+    # arrivals and demand, so they are the same in every scenario.
+    sim = Cost.simulate_batch(arrivals[None], demand[None], h, b,
+                              initial_inventory=I_0, initial_backlog=B_0)
+    holding_cost = float(sim["summary"]["mean_inventory_cost"].iloc[0])
+    backlog_cost = float(sim["summary"]["mean_backlog_cost"].iloc[0])
+    fixed_cost = sum(order_cost[s] * int((placed[:, j] > 1e-9).sum()) for j, s in enumerate(suppliers))
+    base_cost = fixed_cost + holding_cost + backlog_cost
+
+    start = _time.perf_counter()
+    generator = PriceDistributionGenerator(T=T, N=n_scenarios, seed=seed, worker=worker)
+    costs = np.empty(n_scenarios)
+    filled = 0
+    for block in generator.iter_chunks(dist, params, chunk_size=chunk_size):
+        width = next(iter(block.values())).shape[1]
+        procurement = sum(placed[:, j] @ block[s] for j, s in enumerate(suppliers))   # (chunk,)
+        costs[filled:filled + width] = procurement + base_cost
+        filled += width
+    elapsed = _time.perf_counter() - start
+
+    mean = costs.mean()
+    std = costs.std(ddof=1) if n_scenarios > 1 else 0.0
+    stderr = std / np.sqrt(n_scenarios)
+    z = norm.ppf(0.5 + confidence / 2)
+    report = {
+        "n_scenarios": n_scenarios,
+        "mean": float(mean),
+        "std": float(std),
+        "stderr": float(stderr),
+        "confidence": confidence,
+        "ci_low": float(mean - z * stderr),
+        "ci_high": float(mean + z * stderr),
+        **{f"q{round(q * 100):02d}": float(v) for q, v in zip(quantiles, np.quantile(costs, quantiles))},
+        "fixed_order_cost": float(fixed_cost),
+        "holding_cost": holding_cost,
+        "backlog_cost": backlog_cost,
+        "eval_time": elapsed,
+    }
+    if in_sample_objective is not None:
+        report["in_sample_objective"] = float(in_sample_objective)
+    if in_sample_prices is not None:
+        in_sample_prices = np.asarray(in_sample_prices, dtype=float)
+        weights = (np.full(len(in_sample_prices), 1.0) if in_sample_weights is None
+                   else np.asarray(in_sample_weights, dtype=float))
+        procurement = np.einsum("nts,ts->n", in_sample_prices, placed)
+        in_sample_cost = float(weights @ procurement / weights.sum() + base_cost)
+        report["in_sample_cost"] = in_sample_cost
+        report["optimism_gap"] = float(mean - in_sample_cost)
+        if in_sample_objective is not None:
+            report["relaxation_gap"] = float(in_sample_cost - in_sample_objective)
+    return report
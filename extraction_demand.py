@@ -1,5 +1,10 @@
+from collections import defaultdict
+
+import numpy as np
 import pandas as pd
 
+from workbook_loader import load_sheet
+
 def load_and_prepare_data(file_path):
     """
     Loads the CSV file and prepares the DataFrame by parsing dates
@@ -22,8 +27,61 @@ def generate_monthly_prediction_matrix(df, output_path=None):
         monthly_pred_matrix.to_csv(output_path)
     return monthly_pred_matrix, monthly_totals
 
+# Only the columns the matrix needs; other columns (e.g. Customer Code) are optional
+AI_FORECAST_DTYPES = {
+    "date": "category",
+    "Part Number": "category",
+    "pred": "float64",
+}
+
+
+def stream_monthly_prediction_matrix(file_path, chunksize=100_000, date_format="%d/%m/%y", output_path=None):
+    """
+    Streaming version of load_and_prepare_data + generate_monthly_prediction_matrix.
+
+    Reads the date, Part Number and pred columns in chunks with explicit dtypes
+    (categorical date and Part Number), parses each chunk's distinct dates only once, and folds
+    the chunk into a running Part x month array, so memory grows with the number
+    of distinct parts and months, not rows.
+
+    Returns the same (monthly_pred_matrix, monthly_totals) as the in-memory path.
+    """
+    part_ids, month_ids = {}, {}
+    acc = np.zeros((0, 0))
+
+    for chunk in pd.read_csv(file_path, usecols=list(AI_FORECAST_DTYPES), dtype=AI_FORECAST_DTYPES,
+                             chunksize=chunksize):
+        parts = chunk["Part Number"].cat
+        dates = chunk["date"].cat
+        months = pd.to_datetime(dates.categories, format=date_format).to_period("M")
+
+        # Map this chunk's category codes onto the running row/column ids
+        part_map = np.array([part_ids.setdefault(p, len(part_ids)) for p in parts.categories], dtype=np.int64)
+        month_map = np.array([month_ids.setdefault(m, len(month_ids)) for m in months], dtype=np.int64)
+        if acc.shape != (len(part_ids), len(month_ids)):
+            acc = np.pad(acc, ((0, len(part_ids) - acc.shape[0]), (0, len(month_ids) - acc.shape[1])))
+
+        valid = (parts.codes >= 0) & (dates.codes >= 0)
+        rows = part_map[parts.codes[valid]]
+        cols = month_map[dates.codes[valid]]
+        pred = chunk["pred"].to_numpy()[valid]
+        flat = np.bincount(rows * acc.shape[1] + cols, weights=np.nan_to_num(pred), minlength=acc.size)
+        acc += flat.reshape(acc.shape)
+
+    part_order = sorted(part_ids, key=str)
+    month_order = sorted(month_ids)
+    monthly_pred_matrix = pd.DataFrame(
+        acc[np.ix_([part_ids[p] for p in part_order], [month_ids[m] for m in month_order])],
+        index=pd.Index(part_order, name="Part Number"),
+        columns=pd.PeriodIndex(month_order, freq="M", name="month"),
+    )
+    monthly_totals = monthly_pred_matrix.sum(axis=0)
+    if output_path:
+        monthly_pred_matrix.to_csv(output_path)
+    return monthly_pred_matrix, monthly_totals
+
 def preprocess_forecast_excel(file_path, sheet_name='Production qty (forecast)'):
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=1)
+    df = load_sheet(file_path, sheet_name, header=1)
     df = df.rename(columns={df.columns[0]: 'Part Number'})
     df = df.set_index('Part Number')
 
@@ -63,36 +121,100 @@ def compare_part_numbers(df1, df2):
 
     return only_in_df1, only_in_df2, common_parts
 
+def normalize_part_number(part):
+    """Comparison key of a part number: the string with all spaces removed."""
+    return str(part).replace(" ", "")
+
+
+class PartNumberIndex:
+    """
+    Substring index over normalized part numbers.
+
+    A query key matches an indexed key when either contains the other.
+    - Indexed keys containing the query are found through an inverted index of
+      q-grams: only keys sharing the query's two rarest q-grams are verified.
+    - Indexed keys contained in the query are found by looking up every substring
+      of the query in a key -> positions dict (part numbers are short).
+    """
+
+    def __init__(self, parts, q=3):
+        self.parts = list(parts)
+        self.keys = [normalize_part_number(p) for p in self.parts]
+        self.q = q
+        self.by_key = defaultdict(list)
+        self.grams = defaultdict(list)
+        for j, key in enumerate(self.keys):
+            self.by_key[key].append(j)
+            for gram in {key[i:i + q] for i in range(len(key) - q + 1)}:
+                self.grams[gram].append(j)
+        self.lengths = sorted({len(key) for key in self.by_key})
+
+    def _containing(self, key):
+        """Positions of indexed keys that contain key."""
+        q = self.q
+        if len(key) < q:
+            return [j for j, other in enumerate(self.keys) if key in other]
+        postings = sorted((self.grams.get(key[i:i + q], ()) for i in range(len(key) - q + 1)), key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0])
+        if len(postings) > 1:
+            candidates.intersection_update(postings[1])
+        return [j for j in candidates if key in self.keys[j]]
+
+    def _contained(self, key):
+        """Positions of indexed keys that are substrings of key."""
+        found = []
+        for length in self.lengths:
+            if length > len(key):
+                break
+            for i in range(len(key) - length + 1):
+                found.extend(self.by_key.get(key[i:i + length], ()))
+        return found
+
+    def candidates(self, part):
+        """
+        Indexed positions matching part, ranked deterministically: exact key
+        first, then by the smallest length difference, then by index order.
+        """
+        key = normalize_part_number(part)
+        positions = set(self._containing(key))
+        positions.update(self._contained(key))
+        return sorted(positions, key=lambda j: (self.keys[j] != key, abs(len(self.keys[j]) - len(key)), j))
+
+    def best_match(self, part):
+        ranked = self.candidates(part)
+        return self.parts[ranked[0]] if ranked else None
+
+
 def fuzzy_match_part_numbers(df1, df2):
     """
-    Match part numbers between df1 and df2 by substring containment.
+    Match part numbers between df1 and df2 by substring containment (spaces ignored).
     Returns a mapping from df1 parts to df2 parts if one is contained in the other.
+
+    Candidates come from a PartNumberIndex over df2; among several matches the
+    exact key wins, then the closest length, then the earlier df2 row.
     """
+    index = PartNumberIndex(df2.index)
     mapping = {}
     unmatched_df1 = set()
     unmatched_df2 = set(df2.index)
 
     for part1 in df1.index:
-        match_found = False
-        for part2 in df2.index:
-            if part1.replace(" ", "") in part2.replace(" ", "") or part2.replace(" ", "") in part1.replace(" ", ""):
-                mapping[part1] = part2
-                unmatched_df2.discard(part2)
-                match_found = True
-                break
-        if not match_found:
+        part2 = index.best_match(part1)
+        if part2 is None:
             unmatched_df1.add(part1)
+        else:
+            mapping[part1] = part2
+            unmatched_df2.discard(part2)
 
     return mapping, unmatched_df1, unmatched_df2
 
 
-
-
 # Example usage
 if __name__ == "__main__":
     file_path = 'AI-forecast.csv'  # Adjust path if needed
-    df = load_and_prepare_data(file_path)
-    monthly_matrix, monthly_sum = generate_monthly_prediction_matrix(df, output_path='monthly_prediction_matrix.csv')
+    monthly_matrix, monthly_sum = stream_monthly_prediction_matrix(file_path, output_path='monthly_prediction_matrix.csv')
 
     # Optional: print results
     print("Monthly prediction matrix (head):")
@@ -0,0 +1,278 @@
+
+"""
+Part x Customer x Month forecast cube.
+
+The customer-level forecasts (AI-forecast.csv, customer-forecast.csv) are folded
+once into a dense (part, customer, month) array with integer-coded dimensions.
+Rollups by part x month, customer x month and month are precomputed, so cuts
+such as "demand for customer X across parts in Q2" are array lookups:
+
+    cube = ForecastCube.from_csv("AI-forecast.csv")
+    cube.total(customers="PSI/SAN", months="2025Q2")
+    cube.total(months="2025Q2", by="part")           # Series over parts
+    cube.save("ai_forecast_cube.npz")                # reload with ForecastCube.load
+
+Rows without a customer are kept under the UNKNOWN_CUSTOMER label, so
+part_month_matrix() matches extraction_demand.generate_monthly_prediction_matrix
+(up to floating-point summation order). Rows without a part or a date are
+dropped, as in that function.
+"""
+
+import time as _time
+
+import numpy as np
+import pandas as pd
+
+AXES = ("part", "customer", "month")
+
+# Customer label of forecast rows whose customer column is empty
+UNKNOWN_CUSTOMER = "unknown"
+
+# Column layout of the customer-level forecast files
+CSV_LAYOUTS = {
+    "ai_forecast": {"part": "Part Number", "customer": "Customer Code", "date": "date",
+                    "value": "pred", "date_format": "%d/%m/%y"},
+    "customer_forecast": {"part": "Part Number", "customer": "Customer", "date": "date",
+                          "value": "Sales forecast", "date_format": "%Y-%m-%d"},
+}
+
+
+class ForecastCube:
+    """
+    Dense forecast cube.
+
+    Parameters:
+    -----------
+    values : (P, C, M) array
+    parts, customers : sequences of labels for the first two axes
+    months : pd.PeriodIndex (monthly) for the last axis
+    """
+
+    def __init__(self, values, parts, customers, months):
+        self.values = np.asarray(values)
+        self.parts = pd.Index(parts, name="Part Number")
+        self.customers = pd.Index(customers, name="Customer")
+        self.months = pd.PeriodIndex(months, freq="M", name="month")
+        if self.values.shape != (len(self.parts), len(self.customers), len(self.months)):
+            raise ValueError(f"values shape {self.values.shape} does not match the labels")
+        self._rollups()
+
+    def _rollups(self):
+        self.by_part_month = self.values.sum(axis=1)
+        self.by_customer_month = self.values.sum(axis=0)
+        self.by_month = self.by_part_month.sum(axis=0)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    # ------------------------------------------------------------------ construction
+
+    @classmethod
+    def from_frame(cls, df, part="Part Number", customer="Customer Code", date="date", value="pred",
+                   date_format=None, dtype=np.float64):
+        """Builds the cube from raw forecast rows; duplicate (part, customer, month) rows are summed."""
+        return cls._from_chunks([df], part, customer, date, value, date_format, dtype)
+
+    @classmethod
+    def from_csv(cls, file_path, layout="ai_forecast", chunksize=100_000, dtype=np.float64):
+        """
+        Builds the cube from a forecast CSV in chunks; `layout` is a key of
+        CSV_LAYOUTS or a dict with the same fields.
+        """
+        spec = CSV_LAYOUTS[layout] if isinstance(layout, str) else layout
+        chunks = pd.read_csv(file_path, usecols=[spec["part"], spec["customer"], spec["date"], spec["value"]],
+                             dtype={spec["part"]: "category", spec["customer"]: "category",
+                                    spec["date"]: "category", spec["value"]: "float64"},
+                             chunksize=chunksize)
+        return cls._from_chunks(chunks, spec["part"], spec["customer"], spec["date"], spec["value"],
+                                spec.get("date_format"), dtype)
+
+    @classmethod
+    def _from_chunks(cls, chunks, part, customer, date, value, date_format, dtype):
+        ids = {"part": {}, "customer": {}, "month": {}}
+        keys, sums = [], []
+        for chunk in chunks:
+            codes = []
+            for axis, column in (("part", part), ("customer", customer), ("month", date)):
+                col = chunk[column].astype("category")
+                labels = col.cat.categories
+                if axis == "month":
+                    labels = pd.to_datetime(labels, format=date_format).to_period("M")
+                else:
+                    labels = labels.astype(str)
+                lookup = [ids[axis].setdefault(label, len(ids[axis])) for label in labels]
+                missing = -1
+                if axis == "customer" and col.isna().any():
+                    missing = ids[axis].setdefault(UNKNOWN_CUSTOMER, len(ids[axis]))
+                codes.append(np.array(lookup + [missing])[col.cat.codes.to_numpy()])  # code -1 is missing
+
+            valid = (codes[0] >= 0) & (codes[2] >= 0)
+            frame = pd.DataFrame({"p": codes[0][valid], "c": codes[1][valid], "m": codes[2][valid],
+                                  "v": np.nan_to_num(chunk[value].to_numpy(dtype=float)[valid])})
+            grouped = frame.groupby(["p", "c", "m"], sort=False)["v"].sum()
+            keys.append(np.stack([grouped.index.get_level_values(level).to_numpy() for level in range(3)]))
+            sums.append(grouped.to_numpy())
+
+        # Sorted labels; remap the running ids onto sorted positions
+        labels, remap = {}, {}
+        for axis in AXES:
+            names = list(ids[axis])
+            order = sorted(range(len(names)), key=lambda k: names[k])
+            labels[axis] = [names[k] for k in order]
+            remap[axis] = np.empty(len(names), dtype=np.int64)
+            remap[axis][order] = np.arange(len(names))
+
+        values = np.zeros(tuple(len(labels[axis]) for axis in AXES), dtype=dtype)
+        for key, total in zip(keys, sums):
+            np.add.at(values, (remap["part"][key[0]], remap["customer"][key[1]], remap["month"][key[2]]), total)
+        return cls(values, labels["part"], labels["customer"], labels["month"])
+
+    # ------------------------------------------------------------------ slicing
+
+    def _positions(self, axis, selection):
+        """Integer positions along `axis` for a label, list of labels or slice; None selects all."""
+        index = {"part": self.parts, "customer": self.customers, "month": self.months}[axis]
+        if selection is None:
+            return None
+        if axis == "month":
+            return self._month_positions(selection)
+        if isinstance(selection, slice):
+            return np.arange(len(index))[index.slice_indexer(selection.start, selection.stop)]
+        labels = [selection] if np.isscalar(selection) else list(selection)
+        positions = index.get_indexer(labels)
+        if (positions < 0).any():
+            raise KeyError(f"Unknown {axis}: {[l for l, p in zip(labels, positions) if p < 0]}")
+        return positions
+
+    def _month_positions(self, selection):
+        # A period of any frequency (e.g. "2025Q2", "2025") selects the months inside it
+        if isinstance(selection, slice):
+            start = self.months[0] if selection.start is None else pd.Period(selection.start, freq="M")
+            stop = self.months[-1] if selection.stop is None else pd.Period(selection.stop, freq="M")
+            return np.flatnonzero((self.months >= start) & (self.months <= stop))
+        items = [selection] if isinstance(selection, (str, pd.Period)) else list(selection)
+        mask = np.zeros(len(self.months), dtype=bool)
+        for item in items:
+            period = item if isinstance(item, pd.Period) else pd.Period(item)
+            start, end = period.start_time.to_period("M"), period.end_time.to_period("M")
+            mask |= (self.months >= start) & (self.months <= end)
+        return np.flatnonzero(mask)
+
+    def select(self, parts=None, customers=None, months=None):
+        """Sub-cube for the given labels (see total for the accepted selections)."""
+        positions = [self._positions(axis, sel) for axis, sel in zip(AXES, (parts, customers, months))]
+        positions = [np.arange(n) if pos is None else pos for pos, n in zip(positions, self.shape)]
+        return ForecastCube(self.values[np.ix_(*positions)], self.parts[positions[0]],
+                            self.customers[positions[1]], self.months[positions[2]])
+
+    def total(self, parts=None, customers=None, months=None, by=None):
+        """
+        Sum over the selected cells.
+
+        Parameters:
+        -----------
+        parts, customers : label, list of labels or slice of labels, optional
+        months : "2025-04", "2025Q2", "2025", a pd.Period, a list of these, or a
+            slice of months such as slice("2025-04", "2025-06"), optional
+        by : None, an axis name ("part", "customer", "month") or a pair of them
+
+        Returns:
+        --------
+        float for by=None, pd.Series for one axis, pd.DataFrame for two.
+        """
+        by = () if by is None else ((by,) if isinstance(by, str) else tuple(by))
+        unknown = [axis for axis in by if axis not in AXES]
+        if unknown:
+            raise ValueError(f"Unsupported axis: {unknown}")
+        selections = dict(zip(AXES, (parts, customers, months)))
+        needed = set(by) | {axis for axis, sel in selections.items() if sel is not None}
+
+        # Smallest precomputed array that still has every needed axis
+        if needed <= {"month"}:
+            array, axes = self.by_month, ("month",)
+        elif needed <= {"part", "month"}:
+            array, axes = self.by_part_month, ("part", "month")
+        elif needed <= {"customer", "month"}:
+            array, axes = self.by_customer_month, ("customer", "month")
+        else:
+            array, axes = self.values, AXES
+
+        labels = {"part": self.parts, "customer": self.customers, "month": self.months}
+        for k, axis in enumerate(axes):
+            pos = self._positions(axis, selections[axis])
+            if pos is not None:
+                array = np.take(array, pos, axis=k)
+                labels[axis] = labels[axis][pos]
+
+        summed = tuple(k for k, axis in enumerate(axes) if axis not in by)
+        array = array.sum(axis=summed) if summed else array
+        kept = [axis for axis in axes if axis in by]
+        if not kept:
+            return float(array)
+        if len(kept) == 1:
+            return pd.Series(array, index=labels[kept[0]])
+        df = pd.DataFrame(array, index=labels[kept[0]], columns=labels[kept[1]])
+        return df if kept == list(by) else df.T
+
+    def part_month_matrix(self):
+        """Part x month totals, as generate_monthly_prediction_matrix returns them."""
+        return pd.DataFrame(self.by_part_month, index=self.parts, columns=self.months)
+
+    # ------------------------------------------------------------------ persistence
+
+    def save(self, path, compress=False):
+        """
+        Writes the cube to an .npz file: the dense values, the rollups and the
+        labels as fixed-width unicode arrays (no pickled objects).
+        """
+        arrays = {
+            "values": self.values,
+            "by_part_month": self.by_part_month,
+            "by_customer_month": self.by_customer_month,
+            "parts": np.asarray(self.parts, dtype=str),
+            "customers": np.asarray(self.customers, dtype=str),
+            "months": self.months.asi8,
+        }
+        (np.savez_compressed if compress else np.savez)(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            cube = cls.__new__(cls)
+            cube.values = data["values"]
+            cube.parts = pd.Index(data["parts"].astype(object), name="Part Number")
+            cube.customers = pd.Index(data["customers"].astype(object), name="Customer")
+            cube.months = pd.PeriodIndex.from_ordinals(data["months"], freq="M").rename("month")
+            cube.by_part_month = data["by_part_month"]
+            cube.by_customer_month = data["by_customer_month"]
+        cube.by_month = cube.by_part_month.sum(axis=0)
+        return cube
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from extraction_demand import stream_monthly_prediction_matrix
+
+    start = _time.perf_counter()
+    cube = ForecastCube.from_csv("AI-forecast.csv")
+    print(f"Built {cube.shape} cube in {_time.perf_counter() - start:.3f}s")
+
+    path = os.path.join(tempfile.mkdtemp(), "ai_forecast_cube.npz")
+    cube.save(path)
+    start = _time.perf_counter()
+    cube = ForecastCube.load(path)
+    print(f"Reloaded {os.path.getsize(path) / 2 ** 20:.1f} MB in {_time.perf_counter() - start:.4f}s")
+
+    customer = cube.customers[0]
+    start = _time.perf_counter()
+    q2 = cube.total(customers=customer, months="2025Q2")
+    print(f"Demand for {customer} across parts in 2025Q2: {q2:,.0f} ({(_time.perf_counter() - start) * 1e3:.2f} ms)")
+    print(cube.total(months="2025Q2", by="customer").nlargest(5))
+
+    matrix, _ = stream_monthly_prediction_matrix("AI-forecast.csv")
+    print("Matches monthly prediction matrix:",
+          np.allclose(cube.part_month_matrix().loc[matrix.index, matrix.columns], matrix))
@@ -0,0 +1,296 @@
+
+"""
+Side-by-side comparison of all forecast revisions.
+
+Every revision is read once (the workbooks through workbook_loader, in parallel)
+and normalized into a Part x month matrix:
+
+    ai_forecast        AI-forecast.csv, summed per part and month
+    customer_forecast  customer-forecast.csv, "Sales forecast" summed over customers
+    production         Production Qty (Forecast).xlsx
+    material_plan      a "FY25 / Material" sheet of pidsg25-05/06.xlsx; part = "<FY25> - <Material>",
+                       columns are consecutive months from start_month (as in analysis.py)
+    demand_sheet       the "demand" sheet of pidsg25/pidsg25-02.xlsx; one part "Actual",
+                       periods 1..T mapped to consecutive months from start_month
+
+Part numbers are mapped onto one canonical key set (spaces removed, then
+substring matches through extraction_demand.PartNumberIndex, see
+canonical_part_keys). The matrices are aligned on the union of parts and months
+into a (version x part x month) array, NaN where a version does not cover the
+cell, and every pair of versions is compared in one vectorized pass. Pairs
+without a common cell have no error metrics and are listed separately.
+
+Usage:
+    python forecast_versions.py     # revisions from the forecast_versions block of config.yaml
+"""
+
+import os
+import time as _time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from extraction_demand import (PartNumberIndex, normalize_part_number, preprocess_forecast_excel,
+                               stream_monthly_prediction_matrix)
+from workbook_loader import load_sheet
+
+
+def read_ai_forecast(path):
+    return stream_monthly_prediction_matrix(path)[0]
+
+
+def read_customer_forecast(path, value="Sales forecast"):
+    df = pd.read_csv(path, usecols=["Part Number", "date", value],
+                     dtype={"Part Number": "category", "date": "category"})
+    month = pd.to_datetime(df["date"].cat.categories).to_period("M")[df["date"].cat.codes]
+    return (df.groupby([df["Part Number"].astype(str), pd.Series(month, index=df.index, name="month")])[value]
+            .sum().unstack(fill_value=0))
+
+
+def read_production_forecast(path):
+    return preprocess_forecast_excel(path)
+
+
+def read_material_plan(path, sheet_name="25", start_month="2025-04", periods=12):
+    df = load_sheet(path, sheet_name)
+    df = df[df["FY25"].notna() & df["Material"].notna()]
+    df = df[pd.to_numeric(df.iloc[:, 2], errors="coerce").notna()]  # drop the price block below the plan
+    values = df.drop(columns=["FY25", "Material"]).iloc[:, :periods].apply(pd.to_numeric, errors="coerce")
+    values.index = df["FY25"].astype(str) + " - " + df["Material"].astype(str)
+    values.columns = pd.period_range(start_month, periods=values.shape[1], freq="M")
+    return values
+
+
+def read_demand_sheet(path, start_month="2025-04", column="Actual"):
+    demand = load_sheet(path, "demand", index_col=0)[column].dropna()
+    months = pd.period_range(start_month, periods=len(demand), freq="M")
+    return pd.DataFrame([demand.to_numpy(dtype=float)], index=[column], columns=months)
+
+
+READERS = {
+    "ai_forecast": read_ai_forecast,
+    "customer_forecast": read_customer_forecast,
+    "production": read_production_forecast,
+    "material_plan": read_material_plan,
+    "demand_sheet": read_demand_sheet,
+}
+
+# Used when config.yaml has no forecast_versions block
+DEFAULT_VERSIONS = [
+    {"name": "pidsg25", "path": "pidsg25.xlsx", "kind": "demand_sheet"},
+    {"name": "pidsg25-02", "path": "pidsg25-02.xlsx", "kind": "demand_sheet"},
+    {"name": "pidsg25-05", "path": "pidsg25-05.xlsx", "kind": "material_plan"},
+    {"name": "pidsg25-06", "path": "pidsg25-06.xlsx", "kind": "material_plan"},
+    {"name": "production", "path": "Production Qty (Forecast).xlsx", "kind": "production"},
+    {"name": "ai", "path": "AI-forecast.csv", "kind": "ai_forecast"},
+    {"name": "customer", "path": "customer-forecast.csv", "kind": "customer_forecast"},
+]
+
+
+def load_version(spec):
+    """Reads one revision ({"name", "path", "kind", optional "kwargs"}) into a Part x month matrix."""
+    if spec["kind"] not in READERS:
+        raise ValueError(f"Unsupported forecast kind: {spec['kind']}")
+    df = READERS[spec["kind"]](spec["path"], **spec.get("kwargs", {}))
+    df = df.astype(float)
+    df.index = pd.Index(df.index.astype(str), name="Part Number")
+    df.columns = pd.PeriodIndex(df.columns, freq="M", name="month")
+    return df
+
+
+def load_versions(specs, workers=None):
+    """Loads all revisions, one process per revision unless workers == 1."""
+    if workers == 1 or len(specs) < 2:
+        frames = [load_version(spec) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(specs), workers or os.cpu_count() or 1)) as pool:
+            frames = list(pool.map(load_version, specs))
+    return {spec["name"]: df for spec, df in zip(specs, frames)}
+
+
+def canonical_part_keys(matrices):
+    """
+    Maps every version's part numbers onto one canonical key set.
+
+    Part numbers are first compared with spaces removed
+    (extraction_demand.normalize_part_number). Keys that are still different
+    are matched by substring containment through a PartNumberIndex over all
+    keys: taken shortest first, a key maps onto its best-ranked canonical key
+    (ranked as in PartNumberIndex.candidates) that no version lists next to it,
+    or becomes a canonical key itself. Variants such as "EEFCX1C680R EA1" and
+    "EEFCX1C680R WA1" thus share the key of the base part "EEFCX1C680R" of
+    another version, while two parts of one version are never merged.
+
+    Returns:
+    --------
+    {version: {part number: canonical key}}
+    """
+    normalized = {name: {part: normalize_part_number(part) for part in df.index}
+                  for name, df in matrices.items()}
+    listed_in = {}
+    for name, mapping in normalized.items():
+        for key in mapping.values():
+            listed_in.setdefault(key, set()).add(name)
+    keys = sorted(listed_in, key=lambda k: (len(k), k))
+    index = PartNumberIndex(keys)
+
+    canonical = {}
+    for key in keys:
+        matches = [index.parts[j] for j in index.candidates(key)
+                   if canonical.get(index.parts[j]) == index.parts[j]
+                   and not listed_in[key] & listed_in[index.parts[j]]]
+        canonical[key] = matches[0] if matches else key
+    return {name: {part: canonical[key] for part, key in mapping.items()}
+            for name, mapping in normalized.items()}
+
+
+def stack_versions(matrices, normalize=True, match=True):
+    """
+    Aligns the Part x month matrices on the union of parts and months.
+
+    With normalize=True, part numbers are compared with spaces removed
+    (extraction_demand.normalize_part_number); with match=True as well, they
+    are mapped onto canonical keys (canonical_part_keys). Rows that collapse
+    onto the same key are summed.
+
+    Returns:
+    --------
+    cube : (V, P, M) float array, NaN where a version has no such part or month
+    versions : list of V names
+    parts : pd.Index of P part keys
+    months : pd.PeriodIndex of M months
+    """
+    if normalize:
+        if match:
+            part_keys = canonical_part_keys(matrices)
+        else:
+            part_keys = {name: {part: normalize_part_number(part) for part in df.index}
+                         for name, df in matrices.items()}
+        matrices = {name: df.groupby(df.index.map(part_keys[name])).sum()
+                    for name, df in matrices.items()}
+    versions = list(matrices)
+    parts = pd.Index(sorted(set().union(*(df.index for df in matrices.values()))), name="Part Number")
+    months = pd.PeriodIndex(sorted(set().union(*(df.columns for df in matrices.values()))), freq="M", name="month")
+
+    cube = np.full((len(versions), len(parts), len(months)), np.nan)
+    for v, df in enumerate(matrices.values()):
+        rows, cols = parts.get_indexer(df.index), months.get_indexer(df.columns)
+        cube[v][np.ix_(rows, cols)] = np.nan_to_num(df.to_numpy(dtype=float))
+    return cube, versions, parts, months
+
+
+def pairwise_comparison(cube, versions):
+    """
+    Reconciles and scores every ordered pair (a, b) with a before b.
+
+    The reconciliation follows reconcile_monthly_forecast: a - b with a missing
+    side counted as 0, NaN where neither version covers the cell. Error metrics
+    treat b as the reference and only use cells both versions cover.
+
+    Returns:
+    --------
+    reconciliation : (K, P, M) array for the K = V(V-1)/2 pairs
+    metrics : pd.DataFrame with one row per pair
+    """
+    i, j = np.triu_indices(len(versions), k=1)
+    a, b = cube[i], cube[j]
+    present_a, present_b = ~np.isnan(a), ~np.isnan(b)
+
+    reconciliation = np.nan_to_num(a) - np.nan_to_num(b)
+    reconciliation[~present_a & ~present_b] = np.nan
+
+    both = present_a & present_b
+    err = np.where(both, a - b, 0.0)
+    ref = np.where(both, b, 0.0)
+    n = both.sum(axis=(1, 2))
+    abs_err = np.abs(err).sum(axis=(1, 2))
+    nonzero_ref = both & (ref != 0)
+    ape = np.divide(np.abs(err), np.abs(ref), out=np.zeros_like(err), where=nonzero_ref)
+
+    parts_a, parts_b = present_a.any(axis=2), present_b.any(axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        metrics = pd.DataFrame({
+            "version_a": np.asarray(versions)[i],
+            "version_b": np.asarray(versions)[j],
+            "common_parts": (parts_a & parts_b).sum(axis=1),
+            "only_in_a": (parts_a & ~parts_b).sum(axis=1),
+            "only_in_b": (~parts_a & parts_b).sum(axis=1),
+            "common_cells": n,
+            "total_a": np.where(both, a, 0.0).sum(axis=(1, 2)),
+            "total_b": ref.sum(axis=(1, 2)),
+            "bias": err.sum(axis=(1, 2)) / n,
+            "mae": abs_err / n,
+            "rmse": np.sqrt((err ** 2).sum(axis=(1, 2)) / n),
+            "wape": abs_err / np.abs(ref).sum(axis=(1, 2)),
+            "mape": ape.sum(axis=(1, 2)) / nonzero_ref.sum(axis=(1, 2)),
+            "net_difference": np.nansum(reconciliation, axis=(1, 2)),
+        })
+    return reconciliation, metrics
+
+
+def compare_forecast_versions(specs=None, workers=None, normalize=True, match=True):
+    """
+    Loads every revision, stacks them and compares all pairs.
+
+    Returns a dict with cube, versions, parts, months, reconciliation, metrics,
+    no_overlap (the (version_a, version_b) pairs without a common cell, whose
+    metrics are NaN) and timings (seconds per stage).
+    """
+    specs = specs or DEFAULT_VERSIONS
+    timings = {}
+    start = _time.perf_counter()
+    matrices = load_versions(specs, workers=workers)
+    timings["load"] = _time.perf_counter() - start
+
+    start = _time.perf_counter()
+    cube, versions, parts, months = stack_versions(matrices, normalize=normalize, match=match)
+    timings["stack"] = _time.perf_counter() - start
+
+    start = _time.perf_counter()
+    reconciliation, metrics = pairwise_comparison(cube, versions)
+    timings["compare"] = _time.perf_counter() - start
+
+    no_overlap = list(metrics.loc[metrics["common_cells"] == 0, ["version_a", "version_b"]]
+                      .itertuples(index=False, name=None))
+    return {"cube": cube, "versions": versions, "parts": parts, "months": months,
+            "reconciliation": reconciliation, "metrics": metrics, "no_overlap": no_overlap,
+            "timings": timings}
+
+
+def pair_frame(comparison, version_a, version_b):
+    """The reconciliation of one pair as a Part x month DataFrame (rows/months neither covers dropped)."""
+    versions = comparison["versions"]
+    a, b = versions.index(version_a), versions.index(version_b)
+    sign = 1.0
+    if a > b:
+        a, b, sign = b, a, -1.0
+    i, j = np.triu_indices(len(versions), k=1)
+    k = np.flatnonzero((i == a) & (j == b))[0]
+    df = pd.DataFrame(sign * comparison["reconciliation"][k],
+                      index=comparison["parts"], columns=comparison["months"])
+    return df.dropna(how="all").dropna(axis=1, how="all")
+
+
+if __name__ == "__main__":
+    import yaml
+
+    with open("config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+    versions_cfg = config.get("forecast_versions", {})
+
+    result = compare_forecast_versions(versions_cfg.get("versions"), workers=versions_cfg.get("workers"),
+                                       normalize=versions_cfg.get("normalize_part_numbers", True),
+                                       match=versions_cfg.get("match_part_numbers", True))
+    V, P, M = result["cube"].shape
+    print(f"{V} versions x {P} parts x {M} months; "
+          + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["timings"].items()))
+
+    metrics = result["metrics"]
+    print(metrics[metrics["common_cells"] > 0].to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+    if result["no_overlap"]:
+        print(f"{len(result['no_overlap'])} pairs share no part and month, no metrics: "
+              + ", ".join(f"{a} / {b}" for a, b in result["no_overlap"]))
+    if versions_cfg.get("output"):
+        metrics.to_csv(versions_cfg["output"], index=False)
+        print(f"Pairwise metrics written to {versions_cfg['output']}")
@@ -1,56 +1,150 @@
 
-import pandas as pd
+
+import time as _time
+
 import numpy as np
 
-# Load the Excel file
-# file_path = "price_pidsg.xlsx"  # update the path as needed
-file_path= 'pidsg25-02.xlsx'
-xls = pd.ExcelFile(file_path)
+from workbook_loader import load_sheets, sheet_names
 
-# Read both sheets
-sheet1 = xls.parse(xls.sheet_names[0])
-sheet2 = xls.parse(xls.sheet_names[1])
 
-# Extract the first column of each sheet
-col1 = sheet1.iloc[:, 1].values
-col2 = sheet2.iloc[:, 1].values
+def load_source_columns(file_path, sheets=(0, 1), column=1):
+    """
+    Reads the reference price path (column `column`, T entries) from each of the
+    given sheets of the workbook. Returns a list of float arrays.
+    """
+    if any(isinstance(s, int) for s in sheets):
+        all_names = sheet_names(file_path)
+        sheets = [all_names[s] if isinstance(s, int) else s for s in sheets]
+    frames = load_sheets(file_path, list(sheets))
+    return [frames[name].iloc[:, column].to_numpy(dtype=float) for name in sheets]
+
+
+def _rescale_columns(generated, original_variance):
+    """Rescales every column of `generated` to the target variance around its own mean."""
+    col_mean = generated.mean(axis=0)
+    col_std = generated.std(axis=0, ddof=1)
+    factor = np.divide(np.sqrt(original_variance), col_std,
+                       out=np.ones_like(col_std), where=col_std > 0)
+    generated -= col_mean
+    generated *= factor
+    generated += col_mean
+    return generated
 
-def generate_matrix(original_col):
+
+def iter_matrix_blocks(original_col, n_samples=100, block_size=100_000, var_ratio=0.3,
+                       seed=None, dtype=np.float64):
     """
-    Generate a (T x 100) matrix such that:
-    - Each row has mean equal to the original entry
-    - Each row has variance = 0.2 × original entry
-    - Each column has variance matching original column variance
+    Yields the columns of the (T x n_samples) matrix from generate_matrix in
+    (T x block) pieces, so arbitrarily wide matrices are produced in bounded memory.
+
+    The column rescaling only involves each column's own entries, so blocks are
+    independent. Draws are sample-major, so the values do not depend on block_size.
     """
+    if n_samples < 1:
+        raise ValueError(f"n_samples must be at least 1, got {n_samples}")
+    original_col = np.asarray(original_col, dtype=float)
     T = len(original_col)
-    generated = np.zeros((T, 100))
-
-    for t in range(T):
-        mean_t = original_col[t]
-        var_t = 0.3 * mean_t
-        std_t = np.sqrt(var_t)
-        generated[t, :] = np.random.normal(loc=mean_t, scale=std_t, size=100)
-
-    # Adjust column-wise variance
-    original_col_variance = np.var(original_col, ddof=1)
-    for j in range(100):
-        col = generated[:, j]
-        col_std = np.std(col, ddof=1)
-        if col_std > 0:
-            generated[:, j] = (col - np.mean(col)) / col_std * np.sqrt(original_col_variance) + np.mean(col)
+    mean = original_col
+    std = np.sqrt(var_ratio * original_col)
+    original_variance = np.var(original_col, ddof=1)
 
-    return generated
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_samples, block_size):
+        width = min(block_size, n_samples - start)
+        block = rng.normal(size=(width, T)).T
+        block *= std[:, None]
+        block += mean[:, None]
+        yield _rescale_columns(block, original_variance).astype(dtype, copy=False)
+
+
+def generate_matrix(original_col, n_samples=100, var_ratio=0.3, seed=None, dtype=np.float64):
+    """
+    Generate a (T x n_samples) matrix such that:
+    - Row t is drawn with mean equal to original_col[t]
+    - and variance = var_ratio × original_col[t]
+    - Each column is then rescaled to the variance of original_col
+    """
+    return next(iter_matrix_blocks(original_col, n_samples, block_size=n_samples,
+                                   var_ratio=var_ratio, seed=seed, dtype=dtype))
+
+
+def write_matrix_blocks(blocks, T, n_samples, output_path, dtype=np.float64):
+    """
+    Streams (T x block) pieces to disk.
+
+    - .npy: the (T x n_samples) matrix, written through a memory map.
+    - .parquet: one row per sample and one column per period ("t0", "t1", ...),
+      written one row group per block (Parquet does not suit millions of columns).
+    """
+    if output_path.endswith(".npy"):
+        out = np.lib.format.open_memmap(output_path, mode="w+", dtype=dtype, shape=(T, n_samples))
+        start = 0
+        for block in blocks:
+            out[:, start:start + block.shape[1]] = block
+            start += block.shape[1]
+        out.flush()
+        del out
+    elif output_path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for block in blocks:
+                table = pa.table({f"t{t}": block[t] for t in range(T)})
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unsupported output format: {output_path}")
+    return output_path
+
+
+def generate_price_vectors(file_path, n_samples=100, output_paths=None, block_size=None,
+                           var_ratio=0.3, seed=None, dtype=np.float64):
+    """
+    Generates one price matrix per reference sheet of the workbook.
+
+    Parameters:
+    -----------
+    file_path : str
+        Workbook whose first two sheets hold the reference price paths.
+    n_samples : int
+        Number of generated columns per sheet.
+    output_paths : list of str, optional
+        One .npy or .parquet path per sheet. Without it the matrices are returned
+        in memory, which requires block_size to be None.
+    block_size : int, optional
+        Generate and write this many columns at a time (bounded memory).
+    seed : int, optional
+        Each sheet gets an independent stream spawned from this seed.
+
+    Returns:
+    --------
+    list of (T x n_samples) arrays, or the list of written paths.
+    """
+    columns = load_source_columns(file_path)
+    seeds = np.random.SeedSequence(seed).spawn(len(columns))
+    if output_paths is None:
+        if block_size is not None:
+            raise ValueError("block_size requires output_paths")
+        return [generate_matrix(col, n_samples, var_ratio, seed=ss, dtype=dtype)
+                for col, ss in zip(columns, seeds)]
 
-# Generate matrices for both sheets
-generated1 = generate_matrix(col1)
-generated2 = generate_matrix(col2)
+    block_size = block_size or n_samples
+    return [write_matrix_blocks(iter_matrix_blocks(col, n_samples, block_size, var_ratio, ss, dtype),
+                                len(col), n_samples, path, dtype=dtype)
+            for col, ss, path in zip(columns, seeds, output_paths)]
 
-# Optionally convert to DataFrame and save
-df1 = pd.DataFrame(generated1)
-df2 = pd.DataFrame(generated2)
 
-# Save to Excel
-with pd.ExcelWriter("generated_price_vectors.xlsx") as writer:
-    df1.to_excel(writer, sheet_name="Generated_Sheet1", index=False)
-    df2.to_excel(writer, sheet_name="Generated_Sheet2", index=False)
+if __name__ == "__main__":
+    # file_path = "price_pidsg.xlsx"  # update the path as needed
+    file_path = 'pidsg25-02.xlsx'
 
+    start = _time.perf_counter()
+    paths = generate_price_vectors(file_path, n_samples=100, seed=42,
+                                   output_paths=["generated_price_sheet1.npy", "generated_price_sheet2.npy"])
+    print(f"Wrote {paths} in {_time.perf_counter() - start:.2f}s")
@@ -0,0 +1,154 @@
+
+import time as _time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from model import (SAAResult, build_saa_index, fixed_order_positions, price_sample_matrix,
+                   scenario_probabilities)
+
+
+def build_sparse_saa(fixed_demand, price_samples, order_cost, lead_time, capacity_dict,
+                     h, b, I_0, B_0, fixed_orders_s2=None, scenario_weights=None,
+                     integer_orders=True):
+    """
+    Assembles the price SAA model as c, integrality, bounds and one CSR constraint block.
+
+    Column layout matches result_frame: [Q (K), theta (T*S), Y (K), I (T), B (T)].
+    Returns (idx, c, integrality, bounds, constraint).
+    """
+    fixed_demand = np.asarray(fixed_demand, dtype=float)
+    T = len(fixed_demand)
+    S = list(order_cost.keys())
+    n_s = len(S)
+    idx = build_saa_index(T, S, lead_time)
+    K, TS = idx.K, T * n_s
+    n_var = 2 * K + TS + 2 * T
+    q0, th0, y0, i0, b0 = 0, K, K + TS, 2 * K + TS, 2 * K + TS + T
+
+    # Objective: mean price on Q, order cost on Y, holding/backlog on I/B
+    prob_n = scenario_probabilities(len(price_samples), scenario_weights)
+    mean_price = (prob_n @ price_sample_matrix(price_samples, T, S))[idx.place_row]
+    order_cost_k = np.array([order_cost[s] for s in S], dtype=float)[idx.k_s]
+    c = np.concatenate([mean_price, np.zeros(TS), order_cost_k, np.full(T, h), np.full(T, b)])
+
+    # Bounds: nonneg, Y in [0, 1], early orders fixed at 0, fixed s2 orders pinned
+    lb = np.zeros(n_var)
+    ub = np.full(n_var, np.inf)
+    ub[y0:y0 + K] = 1.0
+    ub[q0:q0 + K][~idx.valid] = 0.0
+    if fixed_orders_s2:
+        fixed_pos, fixed_val = fixed_order_positions(idx, fixed_orders_s2)
+        lb[q0 + fixed_pos] = ub[q0 + fixed_pos] = fixed_val
+        lb[y0 + fixed_pos] = 1.0
+
+    integrality = np.zeros(n_var, dtype=int)
+    if integer_orders:
+        integrality[y0:y0 + K] = 1
+
+    def block(mat, col0, n_rows):
+        """Places `mat` at column offset col0 in an (n_rows x n_var) sparse matrix."""
+        mat = sp.coo_matrix(mat)
+        return sp.csr_matrix((mat.data, (mat.row, mat.col + col0)), shape=(n_rows, n_var))
+
+    rows, lower, upper = [], [], []
+
+    def add(parts, n_rows, lo, hi):
+        rows.append(sum((block(mat, col0, n_rows) for mat, col0 in parts),
+                        sp.csr_matrix((n_rows, n_var))))
+        lower.append(np.broadcast_to(lo, n_rows))
+        upper.append(np.broadcast_to(hi, n_rows))
+
+    # Inventory balance: D (I - B) - inflow(theta) == carry_in - demand
+    diff_matrix = sp.eye(T, format="csr") - sp.eye(T, k=-1, format="csr")
+    inflow_matrix = sp.kron(sp.eye(T), np.ones((1, n_s)), format="csr")
+    rhs = -fixed_demand.copy()
+    rhs[0] += I_0 - B_0
+    add([(diff_matrix, i0), (-diff_matrix, b0), (-inflow_matrix, th0)], T, rhs, rhs)
+
+    # Order-arrival logic with lead time
+    lead_coef = (idx.k_t - idx.k_tp + idx.lead[idx.k_s]).astype(float)
+    add([(idx.incidence(idx.arrive_row, mask=lead_coef != 0, data=lead_coef), y0)], TS, 0.0, 0.0)
+    add([(idx.incidence(idx.arrive_row), y0)], TS, -np.inf, 1.0)
+    add([(sp.eye(TS), th0), (-idx.incidence(idx.arrive_row, mask=idx.valid), q0)], TS, 0.0, 0.0)
+
+    # Q <= total_demand * Y on lead-feasible triples
+    on_time = np.flatnonzero(idx.valid)
+    select = sp.csr_matrix((np.ones(len(on_time)), (np.arange(len(on_time)), on_time)),
+                           shape=(len(on_time), K))
+    add([(select, q0), (-fixed_demand.sum() * select, y0)], len(on_time), -np.inf, 0.0)
+
+    # Capacity per time-slot per supplier
+    has_valid = np.bincount(idx.place_row[idx.valid], minlength=TS) > 0
+    capacity = np.array([capacity_dict.get((t, s), np.inf) for t in range(T) for s in S], dtype=float)
+    cap_rows = np.flatnonzero(has_valid & np.isfinite(capacity))
+    add([(idx.incidence(idx.place_row, mask=idx.valid)[cap_rows], q0)], len(cap_rows),
+        -np.inf, capacity[cap_rows])
+
+    # Order frequency limit
+    add([(idx.incidence(idx.place_row), y0)], TS, -np.inf, 1.0)
+
+    A = sp.vstack(rows, format="csr")
+    constraint = LinearConstraint(A, np.concatenate(lower), np.concatenate(upper))
+    return idx, c, integrality, Bounds(lb, ub), constraint
+
+
+def solve_price_saa_highs(fixed_demand,
+                          price_samples,
+                          order_cost,
+                          lead_time,
+                          capacity_dict,
+                          h,
+                          b,
+                          I_0,
+                          B_0,
+                          fixed_orders_s2=None,
+                          scenario_weights=None,
+                          integer_orders=True,
+                          time_limit=None,
+                          mip_gap=None,
+                          presolve=True,
+                          return_result=False,
+                          verbose=True):
+    """
+    Solves the price SAA model with HiGHS through scipy.optimize.milp, bypassing CVXPY.
+
+    With integer_orders=True the order indicators Y are binary; with False they are
+    relaxed to [0, 1], which reproduces the CVXPY formulation exactly.
+
+    Returns (obj_val, df_result), or (obj_val, SAAResult) with return_result=True,
+    in the same layout as model.solve_price_saa.
+    """
+    start = _time.perf_counter()
+    idx, c, integrality, bounds, constraint = build_sparse_saa(
+        fixed_demand, price_samples, order_cost, lead_time, capacity_dict,
+        h, b, I_0, B_0, fixed_orders_s2, scenario_weights=scenario_weights,
+        integer_orders=integer_orders)
+    build_time = _time.perf_counter() - start
+
+    options = {"disp": verbose, "presolve": presolve}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    if mip_gap is not None:
+        options["mip_rel_gap"] = mip_gap
+
+    start = _time.perf_counter()
+    res = milp(c, integrality=integrality, bounds=bounds, constraints=constraint, options=options)
+    solve_time = _time.perf_counter() - start
+
+    timings = {
+        "builder": "highs",
+        "scenario_mode": "aggregated",
+        "build_time": build_time,
+        "compile_time": 0.0,
+        "solve_time": solve_time,
+    }
+    if verbose:
+        print(f"[highs] build: {build_time:.3f}s, solve: {solve_time:.3f}s ({res.message})")
+
+    obj_val = res.fun if res.x is not None else None
+    result = SAAResult.from_flat(idx, res.x, objective=obj_val, status=res.message, timings=timings)
+    if return_result:
+        return obj_val, result
+    return obj_val, result.to_frame()
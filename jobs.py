@@ -0,0 +1,188 @@
+
+import asyncio
+import time as _time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class QueueFull(Exception):
+    """Raised when the number of unfinished jobs has reached max_queue."""
+
+
+class JobManager:
+    """
+    Runs CPU-bound jobs in a process pool and tracks them by id for an async API.
+
+    - max_queue bounds the number of jobs still holding the pool (queued or
+      running in a worker); submit raises QueueFull beyond that so callers can
+      apply backpressure.
+    - Jobs that exceed timeout seconds are marked "timeout" and their result is
+      discarded. A job that has not started is removed from the pool queue; a
+      running one finishes in its worker but its result is dropped. Until it
+      does, it still counts towards max_queue.
+    - The pool is created by start() (the app lifespan) or on the first submit.
+      When a worker dies (e.g. killed for memory) the pool is broken: its
+      unfinished jobs are marked failed and a new pool is started.
+    - Finished jobs are kept for result_ttl seconds and then forgotten.
+
+    Job status is one of queued, running, done, failed, cancelled, timeout.
+    """
+
+    FINISHED = ("done", "failed", "cancelled", "timeout")
+
+    def __init__(self, workers=None, max_queue=16, timeout=300.0, result_ttl=3600.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self.jobs = {}
+        self._pool = None
+
+    def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def _recycle(self, broken):
+        """Replaces the broken pool `broken` (no-op if already replaced) and fails its unfinished jobs."""
+        if self._pool is not broken:
+            return
+        now = _time.time()
+        for job in self.jobs.values():
+            if job["pool"] is broken and job["status"] not in self.FINISHED:
+                job["status"] = "failed"
+                job["error"] = "Worker process died; the pool was restarted"
+                job["error_type"] = BrokenProcessPool.__name__
+                job["finished"] = now
+        self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            if job["status"] not in self.FINISHED:
+                job["future"].cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @property
+    def pending(self):
+        """Jobs whose pool future has not completed, including timed-out or cancelled running ones."""
+        return sum(not job["future"].done() for job in self.jobs.values())
+
+    def submit(self, fn, *args, on_done=None):
+        """
+        Queues fn(*args) in the pool and returns the new job id. on_done(result)
+        is called on the event loop when the job completes successfully.
+        """
+        self._purge()
+        if self.pending >= self.max_queue:
+            raise QueueFull(f"{self.pending} jobs pending (max_queue={self.max_queue})")
+
+        if self._pool is None:
+            self.start()
+        job_id = uuid.uuid4().hex
+        try:
+            future = self._pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._recycle(self._pool)
+            future = self._pool.submit(fn, *args)
+        job = {
+            "pool": self._pool,
+            "status": "queued",
+            "submitted": _time.time(),
+            "finished": None,
+            "future": future,
+            "result": None,
+            "error": None,
+            "error_type": None,
+        }
+        job["task"] = asyncio.get_running_loop().create_task(self._watch(job, on_done))
+        self.jobs[job_id] = job
+        return job_id
+
+    def add_finished(self, result):
+        """Registers an already computed result (e.g. a cache hit) as a done job."""
+        self._purge()
+        job_id = uuid.uuid4().hex
+        now = _time.time()
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(result)
+        self.jobs[job_id] = {"pool": None, "status": "done", "submitted": now, "finished": now, "future": future,
+                             "task": future, "result": result, "error": None, "error_type": None}
+        return job_id
+
+    async def _watch(self, job, on_done=None):
+        try:
+            job["result"] = await asyncio.wait_for(asyncio.wrap_future(job["future"]), self.timeout)
+            job["status"] = "done"
+            if on_done is not None:
+                on_done(job["result"])
+        except asyncio.TimeoutError:
+            job["future"].cancel()
+            job["status"] = "timeout"
+            job["error"] = f"Job exceeded {self.timeout}s"
+        except asyncio.CancelledError:
+            return
+        except BrokenProcessPool:
+            if job["status"] not in self.FINISHED:
+                job["status"] = "failed"
+                job["error"] = "Worker process died; the pool was restarted"
+                job["error_type"] = BrokenProcessPool.__name__
+            self._recycle(job["pool"])
+        except Exception as exc:
+            job["status"] = "failed"
+            job["error"] = repr(exc)
+            job["error_type"] = type(exc).__name__
+        job["finished"] = _time.time()
+
+    async def wait(self, job_id):
+        """Waits for a job to finish and returns its status dict."""
+        task = self.jobs[job_id]["task"]
+        if not task.done():
+            await asyncio.wait({task})
+        return self.status(job_id)
+
+    def status(self, job_id):
+        """Public view of a job: status, timing, and result or error once finished."""
+        self._purge()
+        job = self.jobs[job_id]
+        status = job["status"]
+        if status == "queued" and job["future"].running():
+            status = "running"
+        view = {
+            "job_id": job_id,
+            "status": status,
+            "submitted": job["submitted"],
+            "elapsed": (job["finished"] or _time.time()) - job["submitted"],
+        }
+        if status == "done":
+            view["result"] = job["result"]
+        if job["error"] is not None:
+            view["error"] = job["error"]
+            view["error_type"] = job["error_type"]
+        return view
+
+    def cancel(self, job_id):
+        """
+        Cancels a job. Returns False if it had already finished. A job that is
+        already running completes in its worker, but its result is discarded;
+        it keeps counting towards max_queue until then.
+        """
+        job = self.jobs[job_id]
+        if job["status"] in self.FINISHED:
+            return False
+        job["future"].cancel()
+        job["task"].cancel()
+        job["status"] = "cancelled"
+        job["finished"] = _time.time()
+        return True
+
+    def _purge(self):
+        now = _time.time()
+        # Running jobs stay tracked after a timeout or cancel so pending sees them
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job["finished"] is not None and now - job["finished"] > self.result_ttl
+                   and job["future"].done()]
+        for job_id in expired:
+            del self.jobs[job_id]
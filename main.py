@@ -2,7 +2,7 @@
 import pandas as pd
 import numpy as np
 import yaml
-from dataclass import ProcurementConfig, ModelData
+from dataclass import ProcurementConfig, ModelData, price_array_from_frames
 from model import solve_price_saa
 from postprocess_order import extract_order_matrices
 from plots import (plot_order_placement_bar, 
@@ -10,23 +10,15 @@ from plots import (plot_order_placement_bar,
                    plot_price_and_orders, 
                    plot_price_and_orders_deterministic)
 from price_distributions import PriceDistributionGenerator
+from rendering import FigureWriter
+from scenario_reduction import reduce_scenarios
 from cost import Cost
+from workbook_loader import load_problem_sheets
+from evaluation import evaluate_plan_out_of_sample
 
 
 # # Load Excel file
 file_path = "pidsg25-02.xlsx"
-xls = pd.ExcelFile(file_path)
-
-# Define parameters for all supported distributions
-all_distribution_params = {
-    "lognormal": {"mean1": 3.8, "sigma1": 0.25, "mean2": 4.0, "sigma2": 0.3},
-    "gamma": {"shape1": 2.0, "scale1": 22.0, "shape2": 2.5, "scale2": 25.0},
-    "normal": {"mean1": 45, "std1": 5, "mean2": 50, "std2": 6},
-    "pareto": {"alpha1": 3.0, "scale1": 40.0, "alpha2": 2.5, "scale2": 45.0},
-    "triangular": {"left1": 40, "mode1": 45, "right1": 50, "left2": 42, "mode2": 48, "right2": 55},
-    "weibull": {"a1": 1.5, "scale1": 50.0, "a2": 1.2, "scale2": 55.0},
-    "beta": {"a1": 2.0, "b1": 5.0, "scale1": 100, "a2": 2.5, "b2": 4.5, "scale2": 110}
-}
 
 # --- Load config ---
 with open("config.yaml", "r") as f:
@@ -34,8 +26,8 @@ with open("config.yaml", "r") as f:
 
 dist_name = config["distribution_name"]
 
-# dist_params = config["distribution"]["params"]
-distribution_params = all_distribution_params[dist_name]
+# Parameters for all supported distributions live in config.yaml
+distribution_params = config["distributions"][dist_name]
 
 T = config["problem"]["T"]
 N = config["problem"]["N"]
@@ -47,9 +39,10 @@ B_0 = config["problem"]["B_0"]
 enforce_fixed_orders = config["problem"]["enforce_fixed_orders"]
 
 # Load data sheets
-demand_df = pd.read_excel(xls, sheet_name="demand", index_col=0)
-supplier_df = pd.read_excel(xls, sheet_name="supplier")
-capacity_df = pd.read_excel(xls, sheet_name="capacity", index_col=0)
+sheets = load_problem_sheets(file_path, ("demand", "supplier", "capacity"))
+demand_df = sheets["demand"]
+supplier_df = sheets["supplier"]
+capacity_df = sheets["capacity"]
 
 
 
@@ -69,10 +62,7 @@ lead_time = dict(zip(supplier_df["supplier"], supplier_df["lead_time"]))
 lead_time_s2 = int(lead_time["s2"])
 
 # --- 3. Optional raw orders for s2 (order_time: quantity)
-raw_orders_s2 = {
-    **{i: 4886.83127572017 for i in range(6)},
-    **{i: 2764.92 if i == 6 else 2767.36 for i in range(6, 12)}
-}
+raw_orders_s2 = dict(enumerate(config["problem"]["raw_orders_s2"]))
 
 
 enforce_fixed_orders = True  # Toggle
@@ -86,14 +76,17 @@ fixed_orders_s2 = {
 
 print("Fixed orders with arrival time:", fixed_orders_s2)
 
-# --- 4. Construct price samples [(t,s) -> price] for each sample
-price_samples = []
-for i in range(N):
-    sample_prices = {}
-    for t in range(T):
-        sample_prices[(t, 's1')] = price_df_s1.iloc[t, i]
-        sample_prices[(t, 's2')] = price_df_s2.iloc[t, i]
-    price_samples.append(sample_prices)
+# --- 4. Construct price samples as one (N, T, S) array
+price_samples = price_array_from_frames({"s1": price_df_s1, "s2": price_df_s2}, S, N)[:, :T]
+
+# --- 4b. Reduce the N samples to weighted representative scenarios
+reduced_samples, scenario_weights, reduction = reduce_scenarios(
+    price_samples,
+    n_scenarios=config["problem"]["n_scenarios"],
+    method=config["problem"]["scenario_reduction"],
+    seed=seed,
+)
+print("Scenario reduction:", reduction)
 
 # --- 5. Supplier order costs
 order_cost = dict(zip(supplier_df["supplier"], supplier_df["order_cost"]))
@@ -104,7 +97,8 @@ capacity_dict = {(t, s): capacity_df.loc[t + 1, s] for t in range(T) for s in S}
 # --- 7. Solve the price uncertainty SAA problem
 obj_val, df_result = solve_price_saa(
     fixed_demand=fixed_demand,
-    price_samples=price_samples[:5],
+    price_samples=reduced_samples,
+    scenario_weights=scenario_weights,
     order_cost=order_cost,
     lead_time=lead_time,
     capacity_dict=capacity_dict,
@@ -121,13 +115,19 @@ print(df_result)
 
 order_placed, order_arr = extract_order_matrices(df_result)
 
-plot_order_placement_bar(order_placed, start_date="2025-04-01")
-plot_price_distribution_band(price_df_s1, price_df_s2, start_date="2025-04-01")
-plot_price_and_orders(price_df_s1, order_placed, supplier='s1', start_date="2025-04-01")
-plot_price_and_orders(price_df_s2, order_placed, supplier='s2', start_date="2025-04-01")
+# Figures open interactively unless report.output names a .pdf or a directory (headless)
+report_cfg = config.get("report", {})
+with FigureWriter(report_cfg.get("output"), fmt=report_cfg.get("format", "png")) as report:
+    plot_order_placement_bar(order_placed, start_date="2025-04-01", output=report)
+    plot_price_distribution_band(price_df_s1, price_df_s2, start_date="2025-04-01", output=report)
+    plot_price_and_orders(price_df_s1, order_placed, supplier='s1', start_date="2025-04-01", output=report)
+    plot_price_and_orders(price_df_s2, order_placed, supplier='s2', start_date="2025-04-01", output=report)
 
-mean_price_s2 = price_df_s2.iloc[:, 0].values
-plot_price_and_orders_deterministic(mean_price_s2, order_placed, supplier='s2', start_date="2025-04-01")
+    mean_price_s2 = price_df_s2.iloc[:, 0].values
+    plot_price_and_orders_deterministic(mean_price_s2, order_placed, supplier='s2', start_date="2025-04-01",
+                                        output=report)
+if report.paths:
+    print(f"Figures written to {sorted(set(report.paths))}")
 
 print("Raw orders:", raw_orders_s2)
 print("Enforced fixed_orders_s2 (with arrival):", fixed_orders_s2)
@@ -138,8 +138,26 @@ order_placed.to_csv(output_filename, index=True)
 print(f"Saved order_placed to {output_filename}")
 
 
+# Books placements without lead times; the out-of-sample evaluation below uses
+# arrivals (as the SAA model does), so its holding/backlog figures differ
 cost= Cost(df_result, order_placed, initial_inventory=I_0, demand=fixed_demand)
 inv_cost, backlog_cost = cost.compute_inventory_backlog_cost(h, b)
 
 print('Storage cost', inv_cost)
 print('Backlog cost', backlog_cost)
+
+
+# --- 10. Out-of-sample evaluation against a fresh price sample
+eval_cfg = config.get("evaluation", {})
+oos = evaluate_plan_out_of_sample(
+    order_placed, order_arr, fixed_demand, dist_name, distribution_params, order_cost,
+    h=h, b=b, I_0=I_0, B_0=B_0,
+    n_scenarios=eval_cfg.get("n_scenarios", 100_000),
+    chunk_size=eval_cfg.get("chunk_size", 100_000),
+    seed=seed,
+    confidence=eval_cfg.get("confidence", 0.95),
+    in_sample_objective=obj_val,
+    in_sample_prices=reduced_samples[:, :, [S.index(s) for s in order_placed.columns]],
+    in_sample_weights=scenario_weights,
+)
+print("Out-of-sample evaluation:", oos)
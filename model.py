@@ -1,22 +1,210 @@
 
+import time as _time
+from dataclasses import dataclass
+
 import cvxpy as cp
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+
+from dataclass import price_array_from_dicts, price_dicts_from_array
+
+
+@dataclass
+class SAAIndex:
+    """
+    Flat index over the valid (t, s, t') order triples of the price SAA model.
+
+    Triples are ordered t -> s -> t' (t' >= t), i.e. the same order in which
+    the scalar builder enumerates `t_supplier_tprime`. All incidence matrices
+    map the flat triple axis (length K) onto (t, s) or (t', s) rows, where row
+    index = t * len(S) + s.
+    """
+    T: int
+    S: list
+    lead: np.ndarray        # (S,) integer lead times
+    k_t: np.ndarray         # (K,) placement period
+    k_s: np.ndarray         # (K,) supplier position
+    k_tp: np.ndarray        # (K,) arrival period
+    valid: np.ndarray       # (K,) bool, t' >= t + lead[s]
+
+    @property
+    def K(self):
+        return len(self.k_t)
+
+    @property
+    def place_row(self):
+        return self.k_t * len(self.S) + self.k_s
+
+    @property
+    def arrive_row(self):
+        return self.k_tp * len(self.S) + self.k_s
+
+    def position(self, t, s, t_prime):
+        """Flat position of triple (t, s, t'), where s is a supplier name."""
+        return self.flat_position(t, self.S.index(s), t_prime)
+
+    def flat_position(self, t, j, t_prime):
+        """Flat position of triple (t, j, t') for supplier position j; accepts arrays."""
+        n_s = len(self.S)
+        return n_s * (t * self.T - t * (t - 1) // 2) + j * (self.T - t) + (t_prime - t)
+
+    def incidence(self, rows, mask=None, data=None):
+        """Sparse (T*S x K) matrix summing triples into `rows`, optionally masked/weighted."""
+        cols = np.arange(self.K)
+        if data is None:
+            data = np.ones(self.K)
+        if mask is not None:
+            rows, cols, data = rows[mask], cols[mask], data[mask]
+        return sp.csr_matrix((data, (rows, cols)), shape=(self.T * len(self.S), self.K))
+
+
+def build_saa_index(T, S, lead_time):
+    """
+    Builds the flat (t, s, t') index for horizon T and supplier list S.
+    """
+    S = list(S)
+    n_s = len(S)
+    tri_t, tri_tp = np.triu_indices(T)
+    k_t = np.repeat(tri_t, n_s)
+    k_tp = np.repeat(tri_tp, n_s)
+    k_s = np.tile(np.arange(n_s), len(tri_t))
+    order = np.lexsort((k_tp, k_s, k_t))
+    k_t, k_s, k_tp = k_t[order], k_s[order], k_tp[order]
+
+    lead = np.array([int(lead_time[s]) for s in S])
+    valid = k_tp >= k_t + lead[k_s]
+    return SAAIndex(T=T, S=S, lead=lead, k_t=k_t, k_s=k_s, k_tp=k_tp, valid=valid)
+
+
+def price_sample_matrix(price_samples, T, S):
+    """
+    Returns price samples as an (N, T*S) array, row-major in (t, s). Accepts the
+    (N, T, S) array form of ModelData.price_samples or a list of {(t, s): price} dicts.
+    """
+    if not isinstance(price_samples, np.ndarray):
+        price_samples = price_array_from_dicts(price_samples, T, S)
+    return np.asarray(price_samples, dtype=float).reshape(len(price_samples), T * len(S))
+
+
+def scenario_probabilities(N, scenario_weights=None):
+    """
+    Normalized per-scenario probabilities; uniform 1/N when no weights are given.
+    """
+    if scenario_weights is None:
+        return np.full(N, 1.0 / N)
+    weights = np.asarray(scenario_weights, dtype=float)
+    if weights.shape != (N,) or np.any(weights < 0) or weights.sum() <= 0:
+        raise ValueError("scenario_weights must be N nonnegative values with a positive sum")
+    return weights / weights.sum()
+
+
+def result_frame(idx, values):
+    """
+    Builds the long (variable_name, value) result DataFrame from a flat value
+    vector laid out as [Q (K), theta (T*S), Y (K), I (T), B (T)].
+    """
+    S, T = idx.S, idx.T
+    q_names = [f"order_quantity[{t},{S[j]},{tp}]" for t, j, tp in zip(idx.k_t, idx.k_s, idx.k_tp)]
+    y_names = [f"if_make_order_arrive[{t},{S[j]},{tp}]" for t, j, tp in zip(idx.k_t, idx.k_s, idx.k_tp)]
+    theta_names = [f"arrive_quantity[{t},{s}]" for t in range(T) for s in S]
+    names = (q_names + theta_names + y_names +
+             [f"inventory[{t}]" for t in range(T)] + [f"backlog[{t}]" for t in range(T)])
+    if values is None:
+        values = [None] * len(names)
+    return pd.DataFrame({"variable_name": names, "value": values})
+
+
+@dataclass(eq=False)
+class SAAResult:
+    """
+    Solution of the price SAA model as dense numpy arrays.
+
+    Q and Y are (T, S, T) and indexed by (t, s, t'); entries with t' < t are zero.
+    theta is (T, S), I and B are (T,). Unsolved problems hold NaN arrays.
+    Suppliers are ordered as idx.S.
+    """
+    idx: SAAIndex
+    Q: np.ndarray
+    theta: np.ndarray
+    Y: np.ndarray
+    I: np.ndarray
+    B: np.ndarray
+    objective: float = None
+    status: str = None
+    timings: dict = None
+
+    @classmethod
+    def from_flat(cls, idx, values, objective=None, status=None, timings=None):
+        """
+        Builds the result from a flat value vector laid out as
+        [Q (K), theta (T*S), Y (K), I (T), B (T)], or None for an unsolved problem.
+        """
+        T, n_s, K = idx.T, len(idx.S), idx.K
+        fill = 0.0 if values is not None else np.nan
+        if values is None:
+            values = np.full(2 * K + T * n_s + 2 * T, np.nan)
+        values = np.asarray(values, dtype=float)
+        Q = np.full((T, n_s, T), fill)
+        Y = np.full((T, n_s, T), fill)
+        Q[idx.k_t, idx.k_s, idx.k_tp] = values[:K]
+        Y[idx.k_t, idx.k_s, idx.k_tp] = values[K + T * n_s:2 * K + T * n_s]
+        theta = values[K:K + T * n_s].reshape(T, n_s)
+        I = values[2 * K + T * n_s:2 * K + T * n_s + T]
+        B = values[2 * K + T * n_s + T:]
+        return cls(idx=idx, Q=Q, theta=theta, Y=Y, I=I, B=B,
+                   objective=objective, status=status, timings=timings)
+
+    @property
+    def solved(self):
+        return bool(np.isfinite(self.I).all())
+
+    def flat_values(self):
+        """Values in the result_frame layout [Q (K), theta (T*S), Y (K), I (T), B (T)]."""
+        idx = self.idx
+        return np.concatenate([self.Q[idx.k_t, idx.k_s, idx.k_tp], self.theta.ravel(),
+                               self.Y[idx.k_t, idx.k_s, idx.k_tp], self.I, self.B])
+
+    def to_frame(self):
+        """The long (variable_name, value) DataFrame, built on demand."""
+        df_result = result_frame(self.idx, self.flat_values() if self.solved else None)
+        if self.timings is not None:
+            df_result.attrs["timings"] = self.timings
+        if self.status is not None:
+            df_result.attrs["status"] = self.status
+        return df_result
+
+    def order_matrices(self):
+        """
+        Order placement and arrival matrices [T x S] (suppliers sorted), in the
+        layout of postprocess_order.extract_order_matrices.
+        """
+        T, S = self.idx.T, self.idx.S
+        suppliers = sorted(S)
+        placement = pd.DataFrame(self.Q.sum(axis=2), index=range(T), columns=S)[suppliers]
+        arrival = pd.DataFrame(self.Q.sum(axis=0).T, index=range(T), columns=S)[suppliers]
+        return placement, arrival
+
+
+def fixed_order_positions(idx, fixed_orders_s2):
+    """Flat positions and values of the fixed (t, t') -> quantity orders for supplier 's2'."""
+    fixed_pos = np.array([idx.position(t, 's2', t_prime) for t, t_prime in fixed_orders_s2], dtype=int)
+    fixed_val = np.array(list(fixed_orders_s2.values()), dtype=float)
+    return fixed_pos, fixed_val
+
+
+def _build_scalar_model(fixed_demand, price_samples, order_cost, lead_time, capacity_dict,
+                        h, b, I_0, B_0, fixed_orders_s2=None, scenario_weights=None,
+                        aggregate_scenarios=True, cvar_weight=0.0, cvar_alpha=0.95):
+    if cvar_weight:
+        raise ValueError("CVaR term is only supported by the array builder")
 
-def solve_price_saa(fixed_demand, 
-                    price_samples, 
-                    order_cost, 
-                    lead_time, 
-                    capacity_dict, 
-                    h, 
-                    b, 
-                    I_0, 
-                    B_0,
-                    fixed_orders_s2=None):
-    
     T = len(fixed_demand)
     S = list(order_cost.keys())
     N = len(price_samples)
+    prob_n = scenario_probabilities(N, scenario_weights)
+    if isinstance(price_samples, np.ndarray):
+        price_samples = price_dicts_from_array(price_samples, S)
 
     time = list(range(T))
     t_supplier_tprime = [(t, s, t_prime) for t in time for s in S for t_prime in time if t_prime >= t]
@@ -40,7 +228,7 @@ def solve_price_saa(fixed_demand,
         for t, s, t_prime in t_supplier_tprime:
             sample_cost += order_cost[s] * Y[t, s, t_prime]
         sample_costs.append(sample_cost)
-    obj1 = sum(sample_costs) / N
+    obj1 = sum(prob_n[n] * sample_costs[n] for n in range(N))
     obj2 = sum(h * I[t] + b * B[t] for t in time)
     objective = cp.Minimize(obj1 + obj2)
 
@@ -88,29 +276,215 @@ def solve_price_saa(fixed_demand,
         for t in time:
             constraints.append(sum(Y[t, s, t_prime] for t_prime in time if t_prime >= t) <= 1)
 
-    # Enforce fixed order values for supplier 's2' if specified
-    # if fixed_orders_s2:
-    #     for (t, t_prime), val in fixed_orders_s2.items():
-    #         constraints.append(Q[t, 's2', t_prime] == val)
-
     if fixed_orders_s2:
         for (t, t_prime), val in fixed_orders_s2.items():
             constraints.append(Q[t, 's2', t_prime] == val)
             constraints.append(Y[t, 's2', t_prime] == 1)  # ✅ ensure this order is marked active
 
+    prob = cp.Problem(objective, constraints)
+
+    idx = build_saa_index(T, S, lead_time)
+
+    def collect():
+        # Dict insertion order is t -> s -> t', the SAAIndex order
+        variables = (list(Q.values()) + list(theta.values()) + list(Y.values()) +
+                     list(I.values()) + list(B.values()))
+        if any(var.value is None for var in variables):
+            return idx, None
+        return idx, np.array([float(var.value) for var in variables])
+
+    return prob, collect
+
+
+def _build_array_model(fixed_demand, price_samples, order_cost, lead_time, capacity_dict,
+                       h, b, I_0, B_0, fixed_orders_s2=None, scenario_weights=None,
+                       aggregate_scenarios=True, cvar_weight=0.0, cvar_alpha=0.95):
+    fixed_demand = np.asarray(fixed_demand, dtype=float)
+    T = len(fixed_demand)
+    S = list(order_cost.keys())
+    n_s = len(S)
+    N = len(price_samples)
+    prob_n = scenario_probabilities(N, scenario_weights)
+    idx = build_saa_index(T, S, lead_time)
+    K = idx.K
+
+    # Decision variables over the flat (t, s, t') axis
+    Q = cp.Variable(K, nonneg=True, name="order_quantity")
+    theta = cp.Variable(T * n_s, nonneg=True, name="arrive_quantity")
+    Y = cp.Variable(K, nonneg=True, name="if_make_order_arrive")  # relaxed binary
+    I = cp.Variable(T, nonneg=True, name="inventory")
+    B = cp.Variable(T, nonneg=True, name="backlog")
+
+    # Objective: expected procurement + inventory/backlog cost
+    prices = price_sample_matrix(price_samples, T, S)                    # (N, T*S)
+    order_cost_k = np.array([order_cost[s] for s in S], dtype=float)[idx.k_s]
+
+    constraints = []
+
+    # Prices only multiply Q, so without per-scenario terms the sample average
+    # equals a single term at the mean price and N drops out of the model.
+    per_scenario = cvar_weight > 0
+    if aggregate_scenarios and not per_scenario:
+        mean_price = (prob_n @ prices)[idx.place_row]                    # (K,)
+        obj1 = mean_price @ Q + order_cost_k @ Y
+    else:
+        sample_costs = prices[:, idx.place_row] @ Q + order_cost_k @ Y   # (N,)
+        obj1 = prob_n @ sample_costs
+        if cvar_weight > 0:
+            eta = cp.Variable(name="cvar_threshold")
+            excess = cp.Variable(N, nonneg=True, name="cvar_excess")
+            constraints.append(excess >= sample_costs - eta)
+            obj1 = obj1 + cvar_weight * (eta + prob_n @ excess / (1 - cvar_alpha))
+    obj2 = h * cp.sum(I) + b * cp.sum(B)
+    objective = cp.Minimize(obj1 + obj2)
+
+    # Inventory balance: (I - B)[t] - (I - B)[t-1] == inflow[t] - demand[t]
+    inflow_matrix = sp.kron(sp.eye(T), np.ones((1, n_s)), format="csr")
+    diff_matrix = sp.eye(T, format="csr") - sp.eye(T, k=-1, format="csr")
+    carry_in = np.zeros(T)
+    carry_in[0] = I_0 - B_0
+    constraints.append(diff_matrix @ (I - B) == inflow_matrix @ theta - fixed_demand + carry_in)
+
+    # Order-arrival logic with lead time: sum_t (t - t' + L_s) * Y == 0 per (t', s)
+    lead_coef = (idx.k_t - idx.k_tp + idx.lead[idx.k_s]).astype(float)
+    constraints.append(idx.incidence(idx.arrive_row, mask=lead_coef != 0, data=lead_coef) @ Y == 0)
+    constraints.append(idx.incidence(idx.arrive_row) @ Y <= 1)
+    constraints.append(theta == idx.incidence(idx.arrive_row, mask=idx.valid) @ Q)
+
+    # Lead time constraint: orders can't arrive early
+    total_demand = fixed_demand.sum()
+    early = np.flatnonzero(~idx.valid)
+    on_time = np.flatnonzero(idx.valid)
+    if len(early) > 0:
+        constraints.append(Q[early] == 0)
+    if len(on_time) > 0:
+        constraints.append(Q[on_time] <= total_demand * Y[on_time])
+
+    # Capacity constraint per time-slot per supplier
+    place_valid = idx.incidence(idx.place_row, mask=idx.valid)
+    has_valid = np.bincount(idx.place_row[idx.valid], minlength=T * n_s) > 0
+    capacity = np.array([capacity_dict.get((t, s), np.inf) for t in range(T) for s in S], dtype=float)
+    cap_rows = np.flatnonzero(has_valid & np.isfinite(capacity))
+    if len(cap_rows) > 0:
+        constraints.append(place_valid[cap_rows] @ Q <= capacity[cap_rows])
+
+    # Order frequency limit
+    constraints.append(idx.incidence(idx.place_row) @ Y <= 1)
+
+    if fixed_orders_s2:
+        fixed_pos, fixed_val = fixed_order_positions(idx, fixed_orders_s2)
+        constraints.append(Q[fixed_pos] == fixed_val)
+        constraints.append(Y[fixed_pos] == 1)
 
-    # Solve
     prob = cp.Problem(objective, constraints)
-    prob.solve(solver=cp.SCIPY, verbose=True)
+
+    def collect():
+        values = [Q.value, theta.value, Y.value, I.value, B.value]
+        if any(v is None for v in values):
+            return idx, None
+        return idx, np.concatenate(values)
+
+    return prob, collect
+
+
+_BUILDERS = {
+    "array": _build_array_model,
+    "scalar": _build_scalar_model,
+}
+
+
+def solve_price_saa(fixed_demand,
+                    price_samples,
+                    order_cost,
+                    lead_time,
+                    capacity_dict,
+                    h,
+                    b,
+                    I_0,
+                    B_0,
+                    fixed_orders_s2=None,
+                    scenario_weights=None,
+                    builder="array",
+                    aggregate_scenarios=True,
+                    cvar_weight=0.0,
+                    cvar_alpha=0.95,
+                    backend="cvxpy",
+                    solver_options=None,
+                    return_result=False,
+                    verbose=True):
+    """
+    Solves the price-uncertainty SAA procurement model.
+
+    builder selects how the CVXPY problem is assembled:
+        - "array":  Q/Y as flat array variables over the valid (t, s, t') triples,
+                    constraints written as sparse matrix expressions (default).
+        - "scalar": one cp.Variable per index and per-constraint Python loops.
+
+    price_samples is an (N, T, S) array with suppliers ordered as order_cost, or
+    a list of {(t, s): price} dicts.
+
+    scenario_weights gives per-scenario probabilities (e.g. from scenario_reduction);
+    they are normalized to sum to one and default to a uniform 1/N.
+
+    aggregate_scenarios collapses the N price samples into one expected-cost term
+    at the mean price (exact for the price-only objective). It falls back to the
+    per-scenario formulation automatically when a per-scenario term is present,
+    i.e. a CVaR term with cvar_weight > 0 (array builder only).
+
+    backend selects the solver path:
+        - "cvxpy": CVXPY with cp.SCIPY, Y relaxed to a continuous indicator (default).
+        - "highs": sparse matrices passed straight to scipy.optimize.milp with binary Y;
+                   solver_options may set integer_orders, time_limit, mip_gap, presolve.
+
+    Returns (obj_val, df_result). Build, compile and solve times are stored in
+    df_result.attrs["timings"] (and printed with verbose=True). With return_result=True,
+    returns (obj_val, SAAResult) instead and the string-keyed frame is only built by
+    SAAResult.to_frame().
+    """
+    if backend == "highs":
+        if cvar_weight:
+            raise ValueError("CVaR term is only supported by the cvxpy backend")
+        from highs_backend import solve_price_saa_highs
+        return solve_price_saa_highs(fixed_demand, price_samples, order_cost, lead_time,
+                                     capacity_dict, h, b, I_0, B_0, fixed_orders_s2,
+                                     scenario_weights=scenario_weights, return_result=return_result,
+                                     verbose=verbose, **(solver_options or {}))
+    if backend != "cvxpy":
+        raise ValueError(f"Unsupported backend: {backend}")
+    if builder not in _BUILDERS:
+        raise ValueError(f"Unsupported builder: {builder}")
+
+    scenario_mode = ("aggregated" if builder == "array" and aggregate_scenarios and not cvar_weight
+                     else "per-scenario")
+
+    start = _time.perf_counter()
+    prob, collect = _BUILDERS[builder](fixed_demand, price_samples, order_cost, lead_time,
+                                       capacity_dict, h, b, I_0, B_0, fixed_orders_s2,
+                                       scenario_weights=scenario_weights,
+                                       aggregate_scenarios=aggregate_scenarios,
+                                       cvar_weight=cvar_weight, cvar_alpha=cvar_alpha)
+    build_time = _time.perf_counter() - start
+
+    # Solve
+    start = _time.perf_counter()
+    prob.solve(solver=cp.SCIPY, verbose=verbose)
+    solve_wall = _time.perf_counter() - start
+
+    compile_time = getattr(prob, "compilation_time", None) or 0.0
+    timings = {
+        "builder": builder,
+        "scenario_mode": scenario_mode,
+        "build_time": build_time,
+        "compile_time": compile_time,
+        "solve_time": solve_wall - compile_time,
+    }
+    if verbose:
+        print(f"[{builder}] build: {build_time:.3f}s, compile: {compile_time:.3f}s, "
+              f"solve: {solve_wall - compile_time:.3f}s")
 
     # Collect results
-    df_result = pd.DataFrame(
-        [(var.name(), var.value) for var in Q.values()] +
-        [(var.name(), var.value) for var in theta.values()] +
-        [(var.name(), var.value) for var in Y.values()] +
-        [(var.name(), var.value) for var in I.values()] +
-        [(var.name(), var.value) for var in B.values()],
-        columns=["variable_name", "value"]
-    )
-
-    return prob.value, df_result
+    idx, values = collect()
+    result = SAAResult.from_flat(idx, values, objective=prob.value, status=prob.status, timings=timings)
+    if return_result:
+        return prob.value, result
+    return prob.value, result.to_frame()
@@ -0,0 +1,247 @@
+
+import itertools
+import time as _time
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from model import (SAAResult, build_saa_index, fixed_order_positions, price_sample_matrix,
+                   scenario_probabilities)
+
+
+class ParametricPriceSAA:
+    """
+    Compile-once price SAA model for parameter sweeps.
+
+    The index structure (horizon T, suppliers S and lead times) is fixed at
+    construction. h, b, I_0, B_0, the supplier order costs, the demand vector, the
+    capacities, the mean price, exogenous pipeline arrivals and the fixed s2 orders
+    are cp.Parameters in DPP form, so CVXPY canonicalizes the problem on the first
+    solve and later solves only substitute new parameter values.
+
+    Usage:
+        model = ParametricPriceSAA(T, S, lead_time, fixed_orders_s2)
+        model.update(h=5, b=20, I_0=1000, B_0=0, order_cost=order_cost,
+                     demand=fixed_demand, capacity=capacity_dict, price_samples=price_samples)
+        obj_val, df_result = model.solve()
+        table = model.sweep({"h": [1, 5, 10], "b": [20, 50]})
+    """
+
+    PARAMETERS = ("h", "b", "I_0", "B_0", "order_cost", "demand", "capacity", "price_samples",
+                  "scenario_weights", "pipeline", "fixed_orders_s2")
+
+    def __init__(self, T, S, lead_time, fixed_orders_s2=None, solver=cp.SCIPY):
+        self.T = T
+        self.S = list(S)
+        self.solver = solver
+        self.idx = idx = build_saa_index(T, self.S, lead_time)
+        n_s, K, TS = len(self.S), idx.K, T * len(self.S)
+
+        # Parameters
+        self.h = cp.Parameter(nonneg=True, name="h")
+        self.b = cp.Parameter(nonneg=True, name="b")
+        self.I_0 = cp.Parameter(name="I_0")
+        self.B_0 = cp.Parameter(name="B_0")
+        self.order_cost = cp.Parameter(n_s, nonneg=True, name="order_cost")
+        self.demand = cp.Parameter(T, name="demand")
+        self.capacity = cp.Parameter(TS, name="capacity")
+        self.mean_price = cp.Parameter(TS, name="mean_price")
+        self.pipeline = cp.Parameter(T, nonneg=True, name="pipeline", value=np.zeros(T))
+        self.fixed_qty = cp.Parameter(K, nonneg=True, name="fixed_qty", value=np.zeros(K))
+        self.fixed_cap = cp.Parameter(K, nonneg=True, name="fixed_cap", value=np.zeros(K))
+        self.fixed_flag = cp.Parameter(K, nonneg=True, name="fixed_flag", value=np.zeros(K))
+        self._fixed_orders = {}
+        self._price_matrix = None  # (N, T*S) samples behind mean_price
+
+        # Decision variables over the flat (t, s, t') axis
+        self.Q = Q = cp.Variable(K, nonneg=True, name="order_quantity")
+        self.theta = theta = cp.Variable(TS, nonneg=True, name="arrive_quantity")
+        self.Y = Y = cp.Variable(K, nonneg=True, name="if_make_order_arrive")  # relaxed binary
+        self.I = I = cp.Variable(T, nonneg=True, name="inventory")
+        self.B = B = cp.Variable(T, nonneg=True, name="backlog")
+
+        # Objective: each parameter multiplies a parameter-free expression (DPP)
+        self._place_all = idx.incidence(idx.place_row)
+        self._arrive_valid = idx.incidence(idx.arrive_row, mask=idx.valid)
+        supplier_sum = sp.csr_matrix((np.ones(K), (idx.k_s, np.arange(K))), shape=(n_s, K))
+        obj1 = self.mean_price @ (self._place_all @ Q) + self.order_cost @ (supplier_sum @ Y)
+        obj2 = self.h * cp.sum(I) + self.b * cp.sum(B)
+        objective = cp.Minimize(obj1 + obj2)
+
+        constraints = []
+
+        # Inventory balance: (I - B)[t] - (I - B)[t-1] == inflow[t] + pipeline[t] - demand[t]
+        inflow_matrix = sp.kron(sp.eye(T), np.ones((1, n_s)), format="csr")
+        diff_matrix = sp.eye(T, format="csr") - sp.eye(T, k=-1, format="csr")
+        first = np.zeros(T)
+        first[0] = 1.0
+        constraints.append(diff_matrix @ (I - B) ==
+                           inflow_matrix @ theta + self.pipeline - self.demand
+                           + (self.I_0 - self.B_0) * first)
+
+        # Order-arrival logic with lead time
+        lead_coef = (idx.k_t - idx.k_tp + idx.lead[idx.k_s]).astype(float)
+        constraints.append(idx.incidence(idx.arrive_row, mask=lead_coef != 0, data=lead_coef) @ Y == 0)
+        constraints.append(idx.incidence(idx.arrive_row) @ Y <= 1)
+        constraints.append(theta == self._arrive_valid @ Q)
+
+        # Lead time constraint: orders can't arrive early
+        early = np.flatnonzero(~idx.valid)
+        on_time = np.flatnonzero(idx.valid)
+        if len(early) > 0:
+            constraints.append(Q[early] == 0)
+        if len(on_time) > 0:
+            constraints.append(Q[on_time] <= cp.sum(self.demand) * Y[on_time])
+
+        # Capacity constraint per time-slot per supplier
+        has_valid = np.flatnonzero(np.bincount(idx.place_row[idx.valid], minlength=TS) > 0)
+        if len(has_valid) > 0:
+            place_valid = idx.incidence(idx.place_row, mask=idx.valid)
+            constraints.append(place_valid[has_valid] @ Q <= self.capacity[has_valid])
+
+        # Order frequency limit
+        constraints.append(self._place_all @ Y <= 1)
+
+        # Fixed orders: fixed_qty <= Q <= fixed_cap, Y >= fixed_flag (see _refresh_fixed)
+        constraints.append(Q >= self.fixed_qty)
+        constraints.append(Q <= self.fixed_cap)
+        constraints.append(Y >= self.fixed_flag)
+
+        self.problem = cp.Problem(objective, constraints)
+        self.solve_count = 0
+        if fixed_orders_s2:
+            self.update(fixed_orders_s2=fixed_orders_s2)
+
+    def update(self, **values):
+        """
+        Sets parameter values. Accepts h, b, I_0, B_0, order_cost ({supplier: cost}),
+        demand (length-T array), capacity ({(t, s): cap} or length T*S array),
+        price_samples ((N, T, S) or (N, T*S) array, or {(t, s): price} dicts) with
+        optional scenario_weights (length-N probabilities; on their own they
+        reweight the last price_samples),
+        pipeline (length-T exogenous arrivals) and fixed_orders_s2 ({(t, t'): qty}).
+        """
+        reweight = "scenario_weights" in values or "price_samples" in values
+        scenario_weights = values.pop("scenario_weights", None)
+        if reweight and "price_samples" not in values and self._price_matrix is None:
+            raise ValueError("scenario_weights need price_samples to weight")
+        for name, value in values.items():
+            if name in ("h", "b", "I_0", "B_0"):
+                getattr(self, name).value = float(value)
+            elif name == "order_cost":
+                self.order_cost.value = np.array([value[s] for s in self.S], dtype=float)
+            elif name == "demand":
+                self.demand.value = np.asarray(value, dtype=float)
+            elif name == "capacity":
+                if isinstance(value, dict):
+                    value = [value[t, s] for t in range(self.T) for s in self.S]
+                self.capacity.value = np.asarray(value, dtype=float)
+            elif name == "price_samples":
+                self._price_matrix = price_sample_matrix(value, self.T, self.S)
+            elif name == "pipeline":
+                self.pipeline.value = np.asarray(value, dtype=float)
+            elif name == "fixed_orders_s2":
+                self._fixed_orders = dict(value or {})
+            else:
+                raise ValueError(f"Unsupported parameter: {name}")
+        if reweight:
+            self.mean_price.value = (scenario_probabilities(len(self._price_matrix), scenario_weights)
+                                     @ self._price_matrix)
+        return self
+
+    def _refresh_fixed(self):
+        """
+        Pins fixed s2 orders through the bound parameters. Free triples get
+        fixed_cap = total demand, which Q <= total_demand * Y already implies.
+        """
+        K = self.idx.K
+        qty, flag = np.zeros(K), np.zeros(K)
+        if self._fixed_orders:
+            fixed_pos, fixed_val = fixed_order_positions(self.idx, self._fixed_orders)
+            qty[fixed_pos] = fixed_val
+            flag[fixed_pos] = 1.0
+        cap = np.full(K, max(float(np.sum(self.demand.value)), 0.0))
+        cap[flag > 0] = qty[flag > 0]
+        self.fixed_qty.value, self.fixed_cap.value, self.fixed_flag.value = qty, cap, flag
+
+    def warm_start_from(self, Q=None, Y=None):
+        """Seeds the variables with an initial point for solvers that accept warm starts."""
+        if Q is not None:
+            self.Q.value = np.asarray(Q, dtype=float)
+        if Y is not None:
+            self.Y.value = np.asarray(Y, dtype=float)
+
+    def solve(self, verbose=False, warm_start=False, return_result=False, **values):
+        """
+        Updates any given parameters, re-solves and returns (obj_val, df_result),
+        or (obj_val, SAAResult) with return_result=True.
+        Only the first solve pays for canonicalization. warm_start is passed to
+        CVXPY and used by solvers that support it (ignored by SCIPY/HiGHS).
+        """
+        if values:
+            self.update(**values)
+        self._refresh_fixed()
+
+        start = _time.perf_counter()
+        self.problem.solve(solver=self.solver, verbose=verbose, warm_start=warm_start)
+        solve_time = _time.perf_counter() - start
+        self.solve_count += 1
+
+        values = [self.Q.value, self.theta.value, self.Y.value, self.I.value, self.B.value]
+        compile_time = getattr(self.problem, "compilation_time", None) or 0.0
+        timings = {
+            "builder": "parametric",
+            "scenario_mode": "aggregated",
+            "build_time": 0.0,
+            "compile_time": compile_time if self.solve_count == 1 else 0.0,
+            "solve_time": solve_time,
+        }
+        result = SAAResult.from_flat(self.idx, None if any(v is None for v in values) else np.concatenate(values),
+                                     objective=self.problem.value, status=self.problem.status, timings=timings)
+        if return_result:
+            return self.problem.value, result
+        return self.problem.value, result.to_frame()
+
+    def order_matrices(self):
+        """
+        Order placement and arrival matrices [T x S] from the current solution,
+        in the same layout as postprocess_order.extract_order_matrices.
+        """
+        q = self.Q.value
+        suppliers = sorted(self.S)
+        placement = pd.DataFrame((self._place_all @ q).reshape(self.T, len(self.S)),
+                                 index=range(self.T), columns=self.S)[suppliers]
+        arrival = pd.DataFrame((self._arrive_valid @ q).reshape(self.T, len(self.S)),
+                               index=range(self.T), columns=self.S)[suppliers]
+        return placement, arrival
+
+    def sweep(self, grid, verbose=False):
+        """
+        Re-solves the compiled model over a grid of parameter settings.
+
+        grid is either a list of {parameter: value} dicts, or a dict of
+        {parameter: [values]} whose Cartesian product is swept. Settings only
+        override the parameters they name; the rest keep their current values.
+
+        Returns a DataFrame with one row per setting: the setting, objective,
+        status, solve_time and the order_placed / order_arrival matrices.
+        """
+        if isinstance(grid, dict):
+            keys = list(grid)
+            grid = [dict(zip(keys, combo)) for combo in itertools.product(*grid.values())]
+
+        rows = []
+        for setting in grid:
+            obj_val, result = self.solve(verbose=verbose, return_result=True, **setting)
+            order_placed, order_arr = result.order_matrices() if result.solved else (None, None)
+            rows.append({
+                **setting,
+                "objective": obj_val,
+                "status": self.problem.status,
+                "solve_time": result.timings["solve_time"],
+                "order_placed": order_placed,
+                "order_arrival": order_arr,
+            })
+        return pd.DataFrame(rows)
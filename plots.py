@@ -1,7 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 
-def plot_order_placement_bar(order_placement, start_date="2024-01-01"):
+from rendering import finish_figure
+
+def plot_order_placement_bar(order_placement, start_date="2024-01-01", output=None):
     """
     Plots order placement over time as grouped bars (one per supplier per time point).
 
@@ -12,6 +14,9 @@ def plot_order_placement_bar(order_placement, start_date="2024-01-01"):
 
     start_date : str
         Start date in 'YYYY-MM-DD' format.
+
+    output : FigureWriter or str, optional
+        Where the figure goes (see rendering.FigureWriter); None shows it.
     """
     T = order_placement.shape[0]
     time_index = pd.date_range(start=start_date, periods=T, freq='MS')  # month start
@@ -25,9 +30,10 @@ def plot_order_placement_bar(order_placement, start_date="2024-01-01"):
     plt.legend(title="Supplier")
     plt.grid(axis='y')
     plt.tight_layout()
-    plt.show()
+    return finish_figure(ax.figure, output, "order_placement")
 
-def plot_price_distribution_band(price_df_s1, price_df_s2, start_date="2024-01-01", quantiles=(0.1, 0.9)):
+def plot_price_distribution_band(price_df_s1, price_df_s2, start_date="2024-01-01", quantiles=(0.1, 0.9),
+                                 output=None):
     """
     Plots shaded band of price distribution over time for each supplier.
 
@@ -44,6 +50,9 @@ def plot_price_distribution_band(price_df_s1, price_df_s2, start_date="2024-01-0
 
     quantiles : tuple
         Lower and upper quantile for the uncertainty band (e.g., (0.1, 0.9) for 10th–90th percentile)
+
+    output : FigureWriter or str, optional
+        Where the figure goes (see rendering.FigureWriter); None shows it.
     """
     T = price_df_s1.shape[0]
     time_index = pd.date_range(start=start_date, periods=T, freq='MS')
@@ -66,10 +75,11 @@ def plot_price_distribution_band(price_df_s1, price_df_s2, start_date="2024-01-0
     ax.legend()
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
+    return finish_figure(fig, output, "price_distribution_band")
 
 
-def plot_price_and_orders(price_df, order_placement, supplier, start_date="2024-01-01", quantiles=(0.1, 0.9)):
+def plot_price_and_orders(price_df, order_placement, supplier, start_date="2024-01-01", quantiles=(0.1, 0.9),
+                          output=None):
     """
     Plots price distribution band and order placement bars for a single supplier.
 
@@ -89,6 +99,9 @@ def plot_price_and_orders(price_df, order_placement, supplier, start_date="2024-
 
     quantiles : tuple
         Lower and upper quantile for uncertainty band
+
+    output : FigureWriter or str, optional
+        Where the figure goes (see rendering.FigureWriter); None shows it.
     """
     T = price_df.shape[0]
     time_index = pd.date_range(start=start_date, periods=T, freq='MS')
@@ -118,10 +131,11 @@ def plot_price_and_orders(price_df, order_placement, supplier, start_date="2024-
     fig.legend(loc='upper left', bbox_to_anchor=(0.1, 0.85))
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+    return finish_figure(fig, output, f"price_and_orders_{supplier}")
 
 
-def plot_price_and_orders_deterministic(price_series, order_placement, supplier, start_date="2024-01-01"):
+def plot_price_and_orders_deterministic(price_series, order_placement, supplier, start_date="2024-01-01",
+                                        output=None):
     """
     Plots deterministic price (line) and order quantities (bar) for a supplier.
 
@@ -138,6 +152,9 @@ def plot_price_and_orders_deterministic(price_series, order_placement, supplier,
 
     start_date : str
         Start date for the x-axis
+
+    output : FigureWriter or str, optional
+        Where the figure goes (see rendering.FigureWriter); None shows it.
     """
     T = len(price_series)
     time_index = pd.date_range(start=start_date, periods=T, freq='MS')
@@ -162,7 +179,7 @@ def plot_price_and_orders_deterministic(price_series, order_placement, supplier,
     fig.legend(loc='upper left', bbox_to_anchor=(0.1, 0.85))
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+    return finish_figure(fig, output, f"price_and_orders_deterministic_{supplier}")
 
 
 # def plot_data_25()
@@ -7,8 +7,11 @@ def extract_order_matrices(df_result):
 
     Parameters:
     -----------
-    df_result : pd.DataFrame
-        A dataframe containing variable_name and value columns from CVXPY/Gurobi results.
+    df_result : pd.DataFrame or model.SAAResult
+        The typed result from solve_price_saa(..., return_result=True), whose
+        matrices come straight from the (t, s, t') arrays, or a dataframe
+        containing variable_name and value columns from CVXPY/Gurobi results,
+        which is always parsed from those columns.
 
     Returns:
     --------
@@ -18,31 +21,30 @@ def extract_order_matrices(df_result):
     order_arrival : pd.DataFrame
         Matrix [T × S] where entry (t,s) is the total order arriving at time t for supplier s.
     """
+    from model import SAAResult
 
-    # Filter order_quantity variables
-    df_order = df_result[df_result['variable_name'].str.contains("order_quantity")].copy()
+    if isinstance(df_result, SAAResult):
+        return df_result.order_matrices()
+    return _parse_order_matrices(df_result)
 
-    # Parse placement time (t), supplier (s), and arrival time (t')
-    df_order[['t', 's', 't_prime']] = df_order['variable_name'] \
-        .str.extract(r"order_quantity\[(\d+),([a-zA-Z0-9_]+),(\d+)\]") \
-        .astype({0: int, 2: int, 1: str}) \
-        .rename(columns={0: 't', 1: 's', 2: 't_prime'})
+
+def _parse_order_matrices(df_result):
+    """Parses the order_quantity variable names once, then sums."""
+    names = df_result['variable_name'].astype(str)
+    df_order = names.str.extract(r"^order_quantity\[(\d+),([a-zA-Z0-9_]+),(\d+)\]$")
+    df_order.columns = ['t', 's', 't_prime']
+    df_order['value'] = pd.to_numeric(df_result['value'], errors='coerce').to_numpy()
+    df_order = df_order.dropna(subset=['t', 'value'])  # Skip undefined variables
+    df_order = df_order.astype({'t': int, 't_prime': int})
 
     # Determine time horizon and supplier list
     T = max(df_order['t'].max(), df_order['t_prime'].max()) + 1
     suppliers = sorted(df_order['s'].unique())
 
-    # Initialize empty matrices
-    order_placement = pd.DataFrame(0.0, index=range(T), columns=suppliers)
-    order_arrival = pd.DataFrame(0.0, index=range(T), columns=suppliers)
-
-    # Fill matrices
-    for _, row in df_order.iterrows():
-        t, s, t_prime, val = row['t'], row['s'], row['t_prime'], row['value']
-        if val is None:
-            continue  # Skip undefined variables
-        order_placement.at[t, s] += val
-        order_arrival.at[t_prime, s] += val
-
-
+    order_placement = (df_order.groupby(['t', 's'])['value'].sum().unstack(fill_value=0.0)
+                       .reindex(index=range(T), columns=suppliers, fill_value=0.0).astype(float))
+    order_arrival = (df_order.groupby(['t_prime', 's'])['value'].sum().unstack(fill_value=0.0)
+                     .reindex(index=range(T), columns=suppliers, fill_value=0.0).astype(float))
+    order_placement.index.name = order_arrival.index.name = None
+    order_placement.columns.name = order_arrival.columns.name = None
     return order_placement, order_arrival
@@ -1,79 +1,148 @@
 
+import re
+
 import numpy as np
 import pandas as pd
 
-class PriceDistributionGenerator:
-    def __init__(self, T: int, N: int, seed: int = None):
-        self.T = T
-        self.N = N
-        if seed is not None:
-            np.random.seed(seed)
+# Parameter names per distribution, without the legacy supplier suffix
+DISTRIBUTION_PARAMS = {
+    "normal": ("mean", "std"),
+    "lognormal": ("mean", "sigma"),
+    "gamma": ("shape", "scale"),
+    "pareto": ("alpha", "scale"),
+    "weibull": ("a", "scale"),
+    "beta": ("a", "b", "scale"),
+    "triangular": ("left", "mode", "right"),
+}
 
-    def generate_normal(self, mean1: float, std1: float, mean2: float, std2: float):
-        prices_s1 = np.random.normal(loc=mean1, scale=std1, size=(self.T, self.N))
-        prices_s2 = np.random.normal(loc=mean2, scale=std2, size=(self.T, self.N))
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
 
-    def generate_lognormal(self, mean1: float, sigma1: float, mean2: float, sigma2: float):
-        prices_s1 = np.random.lognormal(mean=mean1, sigma=sigma1, size=(self.T, self.N))
-        prices_s2 = np.random.lognormal(mean=mean2, sigma=sigma2, size=(self.T, self.N))
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
+def _draw(rng, dist, params, size):
+    """Draws one block of prices from a np.random.Generator."""
+    if dist == "normal":
+        return rng.normal(loc=params["mean"], scale=params["std"], size=size)
+    elif dist == "lognormal":
+        return rng.lognormal(mean=params["mean"], sigma=params["sigma"], size=size)
+    elif dist == "gamma":
+        return rng.gamma(shape=params["shape"], scale=params["scale"], size=size)
+    elif dist == "pareto":
+        return params["scale"] * (rng.pareto(a=params["alpha"], size=size) + 1)
+    elif dist == "weibull":
+        return params["scale"] * rng.weibull(a=params["a"], size=size)
+    elif dist == "beta":
+        return params["scale"] * rng.beta(a=params["a"], b=params["b"], size=size)
+    elif dist == "triangular":
+        return rng.triangular(left=params["left"], mode=params["mode"], right=params["right"], size=size)
+    else:
+        raise ValueError(f"Unsupported distribution: {dist}")
 
-    def generate_gamma(self, shape1: float, scale1: float, shape2: float, scale2: float):
-        prices_s1 = np.random.gamma(shape=shape1, scale=scale1, size=(self.T, self.N))
-        prices_s2 = np.random.gamma(shape=shape2, scale=scale2, size=(self.T, self.N))
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
 
-    def generate_pareto(self, alpha1: float, scale1: float, alpha2: float, scale2: float):
-        prices_s1 = scale1 * (np.random.pareto(a=alpha1, size=(self.T, self.N)) + 1)
-        prices_s2 = scale2 * (np.random.pareto(a=alpha2, size=(self.T, self.N)) + 1)
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
+def supplier_params(dist, params):
+    """
+    Normalizes distribution parameters to {supplier: {name: value}}.
 
-    def generate_weibull(self, a1: float, scale1: float, a2: float, scale2: float):
-        prices_s1 = scale1 * np.random.weibull(a=a1, size=(self.T, self.N))
-        prices_s2 = scale2 * np.random.weibull(a=a2, size=(self.T, self.N))
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
+    Accepts the per-supplier form used in config.yaml, e.g.
+        {"s1": {"mean": 45, "std": 5}, "s2": {"mean": 50, "std": 6}}
+    or the legacy suffixed form, e.g.
+        {"mean1": 45, "std1": 5, "mean2": 50, "std2": 6}
+    where suffix k maps to supplier "s{k}".
+    """
+    dist = dist.lower()
+    if dist not in DISTRIBUTION_PARAMS:
+        raise ValueError(f"Unsupported distribution: {dist}")
+    if all(isinstance(v, dict) for v in params.values()):
+        return {s: dict(p) for s, p in params.items()}
 
-    def generate_beta(self, a1: float, b1: float, scale1: float, a2: float, b2: float, scale2: float):
-        prices_s1 = scale1 * np.random.beta(a=a1, b=b1, size=(self.T, self.N))
-        prices_s2 = scale2 * np.random.beta(a=a2, b=b2, size=(self.T, self.N))
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
+    by_supplier = {}
+    for key, value in params.items():
+        match = re.fullmatch(r"([a-z]+)(\d+)", key)
+        if match is None or match.group(1) not in DISTRIBUTION_PARAMS[dist]:
+            raise ValueError(f"Unexpected parameter '{key}' for distribution {dist}")
+        by_supplier.setdefault(f"s{match.group(2)}", {})[match.group(1)] = value
+    return dict(sorted(by_supplier.items(), key=lambda item: int(item[0][1:])))
 
-    def generate_triangular(self, left1: float, mode1: float, right1: float,
-                                  left2: float, mode2: float, right2: float):
-        prices_s1 = np.random.triangular(left=left1, mode=mode1, right=right1, size=(self.T, self.N))
-        prices_s2 = np.random.triangular(left=left2, mode=mode2, right=right2, size=(self.T, self.N))
-        return pd.DataFrame(prices_s1), pd.DataFrame(prices_s2)
-    
+
+class PriceDistributionGenerator:
+    """
+    Price path generator on np.random.Generator with one independent stream per
+    (worker, supplier), derived from SeedSequence(seed, spawn_key=(worker, j)).
+
+    Samples are drawn sample-major, so the values for a given (seed, worker,
+    supplier) do not depend on the chunk size used to produce them.
+    """
+
+    def __init__(self, T: int, N: int, seed: int = None, worker: int = 0):
+        if N < 1:
+            raise ValueError(f"N must be at least 1, got {N}")
+        self.T = T
+        self.N = N
+        self.seed = seed
+        self.worker = worker
+
+    def _rng(self, j):
+        seed_seq = np.random.SeedSequence(self.seed, spawn_key=(self.worker, j))
+        return np.random.default_rng(seed_seq)
+
+    def iter_chunks(self, dist: str, params: dict, chunk_size: int = 10_000, dtype=np.float64):
+        """
+        Yields {supplier: (T, chunk) array} blocks until N samples are produced,
+        holding only one block per supplier in memory.
+        """
+        dist = dist.lower()
+        per_supplier = supplier_params(dist, params)
+        rngs = [self._rng(j) for j in range(len(per_supplier))]
+        for start in range(0, self.N, chunk_size):
+            size = (min(chunk_size, self.N - start), self.T)
+            yield {s: _draw(rng, dist, p, size).T.astype(dtype, copy=False)
+                   for rng, (s, p) in zip(rngs, per_supplier.items())}
+
+    def generate(self, dist: str, params: dict, dtype=np.float64):
+        """Returns {supplier: (T, N) array} with all samples."""
+        blocks = list(self.iter_chunks(dist, params, chunk_size=self.N, dtype=dtype))
+        return {s: np.concatenate([b[s] for b in blocks], axis=1) for s in blocks[0]}
+
+    def generate_array(self, dist: str, params: dict, suppliers=None, dtype=np.float64):
+        """
+        Returns prices as one contiguous (N, T, S) array, the ModelData.price_samples
+        layout, with suppliers in the given order (default: parameter order).
+        """
+        prices = self.generate(dist, params, dtype=dtype)
+        suppliers = list(prices) if suppliers is None else list(suppliers)
+        return np.ascontiguousarray(np.stack([prices[s].T for s in suppliers], axis=2))
 
     def generate_by_name(self, dist: str, params: dict):
         """
-        Dispatches to the appropriate distribution function based on dist name.
+        Dispatches to the appropriate distribution based on dist name.
 
         Args:
-            dist (str): Distribution name. Supported: 
+            dist (str): Distribution name. Supported:
                 ['normal', 'lognormal', 'gamma', 'pareto', 'weibull', 'beta', 'triangular']
-            params (dict): Dictionary of parameters specific to that distribution.
+            params (dict): Per-supplier parameters ({supplier: {name: value}}) or the
+                legacy suffixed form (e.g. mean1, std1, mean2, std2).
 
         Returns:
-            Tuple[pd.DataFrame, pd.DataFrame]
+            Tuple[pd.DataFrame, ...] one (T x N) frame per supplier, in parameter order
         """
-        dist = dist.lower()
-        if dist == "normal":
-            return self.generate_normal(**params)
-        elif dist == "lognormal":
-            return self.generate_lognormal(**params)
-        elif dist == "gamma":
-            return self.generate_gamma(**params)
-        elif dist == "pareto":
-            return self.generate_pareto(**params)
-        elif dist == "weibull":
-            return self.generate_weibull(**params)
-        elif dist == "beta":
-            return self.generate_beta(**params)
-        elif dist == "triangular":
-            return self.generate_triangular(**params)
-        else:
-            raise ValueError(f"Unsupported distribution: {dist}")
+        return tuple(pd.DataFrame(prices) for prices in self.generate(dist, params).values())
+
+    def generate_normal(self, mean1: float, std1: float, mean2: float, std2: float):
+        return self.generate_by_name("normal", dict(mean1=mean1, std1=std1, mean2=mean2, std2=std2))
+
+    def generate_lognormal(self, mean1: float, sigma1: float, mean2: float, sigma2: float):
+        return self.generate_by_name("lognormal", dict(mean1=mean1, sigma1=sigma1, mean2=mean2, sigma2=sigma2))
+
+    def generate_gamma(self, shape1: float, scale1: float, shape2: float, scale2: float):
+        return self.generate_by_name("gamma", dict(shape1=shape1, scale1=scale1, shape2=shape2, scale2=scale2))
+
+    def generate_pareto(self, alpha1: float, scale1: float, alpha2: float, scale2: float):
+        return self.generate_by_name("pareto", dict(alpha1=alpha1, scale1=scale1, alpha2=alpha2, scale2=scale2))
 
+    def generate_weibull(self, a1: float, scale1: float, a2: float, scale2: float):
+        return self.generate_by_name("weibull", dict(a1=a1, scale1=scale1, a2=a2, scale2=scale2))
+
+    def generate_beta(self, a1: float, b1: float, scale1: float, a2: float, b2: float, scale2: float):
+        return self.generate_by_name("beta", dict(a1=a1, b1=b1, scale1=scale1, a2=a2, b2=b2, scale2=scale2))
 
+    def generate_triangular(self, left1: float, mode1: float, right1: float,
+                                  left2: float, mode2: float, right2: float):
+        return self.generate_by_name("triangular", dict(left1=left1, mode1=mode1, right1=right1,
+                                                        left2=left2, mode2=mode2, right2=right2))
@@ -0,0 +1,280 @@
+
+"""
+Headless figure output for the plotting helpers.
+
+FigureWriter is where finished figures go:
+
+    output=None          plt.show(), the interactive behaviour
+    "report.pdf"         every figure becomes a page of one multi-page PDF
+    "figures/"           one <name>.png (or .svg, see fmt) file per figure
+
+Any output other than None switches matplotlib to the Agg backend, so reports
+can be written on machines without a display.
+
+render_bar_rows draws one bar chart per row of a (rows x months) array, such as
+the per-material plans of analysis.plot_material_bars_from_excel or the per-part
+orders of batch_parts. It reuses one figure per process and spreads PNG/SVG
+output over a process pool. A PDF is written by a single process, since the pages
+go into one file.
+"""
+
+import os
+import time as _time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+FORMATS = ("png", "svg", "pdf")
+
+
+def headless():
+    """Switches matplotlib to the non-interactive Agg backend."""
+    import matplotlib.pyplot as plt
+
+    if matplotlib.get_backend().lower() != "agg":
+        plt.switch_backend("Agg")
+
+
+def _safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name)).strip("_") or "figure"
+
+
+class FigureWriter:
+    """
+    Destination for finished figures (see the module docstring).
+
+    Parameters:
+    -----------
+    output : str or None
+        None to show figures, a .pdf path, or a directory.
+    fmt : str
+        "png" or "svg" for directory output.
+    dpi : int
+        Resolution of raster output.
+    """
+
+    def __init__(self, output=None, fmt="png", dpi=100):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported figure format: {fmt}")
+        self.output = output
+        self.fmt = "pdf" if output is not None and str(output).lower().endswith(".pdf") else fmt
+        self.dpi = dpi
+        self.paths = []
+        self._pdf = None
+        if output is None:
+            return
+        headless()
+        if self.fmt == "pdf":
+            from matplotlib.backends.backend_pdf import PdfPages
+
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            self._pdf = PdfPages(output)
+        else:
+            os.makedirs(output, exist_ok=True)
+
+    def save(self, fig, name, close=True):
+        """Shows or writes `fig`; close=False keeps it open for reuse."""
+        import matplotlib.pyplot as plt
+
+        if self.output is None:
+            plt.show()
+            return None
+        if self._pdf is not None:
+            self._pdf.savefig(fig)
+            path = self.output
+        else:
+            path = os.path.join(self.output, f"{_safe_name(name)}.{self.fmt}")
+            fig.savefig(path, format=self.fmt, dpi=self.dpi)
+            self.paths.append(path)
+        if close:
+            plt.close(fig)
+        return path
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+            self.paths.append(self.output)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def finish_figure(fig, output=None, name="figure"):
+    """
+    Ends a plotting function: plt.show() when output is None, otherwise saves
+    the figure to `output` (a FigureWriter or a file path) and closes it.
+    """
+    import matplotlib.pyplot as plt
+
+    if output is None:
+        plt.show()
+        return None
+    if isinstance(output, FigureWriter):
+        return output.save(fig, name)
+    fig.savefig(output)
+    plt.close(fig)
+    return output
+
+
+def _draw_bars(ax, timestamps, values, label, series=None, width=20):
+    """Draws one bar chart; values is (M,) or (M, K) with one bar group per series."""
+    values = np.asarray(values, dtype=float).reshape(len(values), -1)
+    K = values.shape[1]
+    offsets = (np.arange(K) - (K - 1) / 2) * width / K
+    containers = [ax.bar(timestamps[:len(values)] + pd.to_timedelta(offsets[k], unit="D"), values[:, k],
+                         width=width / K) for k in range(K)]
+    legend = ax.legend(containers, [label] if series is None else list(series))
+    ax.set_title(label)
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("Value")
+    ax.set_xticks(timestamps)
+    ax.set_xticklabels(timestamps.strftime("%b-%Y"), rotation=45)
+    return containers, legend
+
+
+class _BarChart:
+    """
+    One figure reused for many rows: the first row lays the chart out, later
+    rows only update bar heights, title and y-limits before saving.
+    """
+
+    def __init__(self, timestamps, series=None, width=20, figsize=(16, 5)):
+        import matplotlib.pyplot as plt
+
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        self.timestamps, self.series, self.width = timestamps, series, width
+        self.containers = self.legend = None
+
+    def draw(self, values, label):
+        values = np.nan_to_num(np.asarray(values, dtype=float).reshape(len(values), -1))
+        if self.containers is None or len(values) != len(self.containers[0]):
+            self.ax.clear()
+            self.containers, self.legend = _draw_bars(self.ax, self.timestamps, values, label,
+                                                      self.series, self.width)
+            self.fig.tight_layout()
+            return
+        for k, container in enumerate(self.containers):
+            for bar, height in zip(container, values[:, k]):
+                bar.set_height(height)
+        if self.series is None:
+            self.legend.texts[0].set_text(label)
+        self.ax.set_title(label)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def close(self):
+        import matplotlib.pyplot as plt
+
+        plt.close(self.fig)
+
+
+def _render_rows(labels, values, timestamps, writer_args, names, series, width, figsize):
+    """Renders rows onto one reused figure; runs in the calling process or a pool worker."""
+    headless()
+    writer = FigureWriter(**writer_args)
+    chart = _BarChart(timestamps, series=series, width=width, figsize=figsize)
+    try:
+        for label, row, name in zip(labels, values, names):
+            chart.draw(row, label)
+            writer.save(chart.fig, name, close=False)
+    finally:
+        writer.close()
+        chart.close()
+    return writer.paths
+
+
+def render_bar_rows(labels, values, timestamps, output, fmt="png", workers=None, chunk_size=50,
+                    series=None, width=20, figsize=(16, 5), dpi=100, skip_empty=True):
+    """
+    Writes one bar chart per row without a display.
+
+    Parameters:
+    -----------
+    labels : sequence of str
+        Chart title (and file name) of each row.
+    values : array of shape (rows, M), or (rows, M, K) for K bar series per month
+    timestamps : pd.DatetimeIndex of the M months
+    output : str
+        A .pdf path (all charts as pages) or a directory (one file per chart).
+    fmt : str
+        "png" or "svg" for directory output.
+    workers : int, optional
+        Pool size for directory output; 1 renders in this process.
+    skip_empty : bool
+        Leave out rows whose values sum to 0 (as the interactive plots do).
+
+    Returns:
+    --------
+    list of written paths
+    """
+    labels = [str(label) for label in labels]
+    values = np.asarray(values, dtype=float)
+    timestamps = pd.DatetimeIndex(timestamps)
+    keep = np.flatnonzero(np.nansum(values.reshape(len(values), -1), axis=1) > 0) if skip_empty \
+        else np.arange(len(values))
+    labels = [labels[i] for i in keep]
+    values = values[keep]
+    names = [f"{i:04d}-{label}" for i, label in zip(keep, labels)]
+
+    if str(output).lower().endswith(".pdf"):
+        return _render_rows(labels, values, timestamps, {"output": output, "dpi": dpi}, names,
+                            series, width, figsize)
+
+    writer_args = {"output": output, "fmt": fmt, "dpi": dpi}
+    if workers == 1 or len(labels) <= chunk_size:
+        return _render_rows(labels, values, timestamps, writer_args, names, series, width, figsize)
+
+    chunks = range(0, len(labels), chunk_size)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_render_rows, labels[i:i + chunk_size], values[i:i + chunk_size],
+                               timestamps, writer_args, names[i:i + chunk_size], series, width, figsize)
+                   for i in chunks]
+        return [path for future in futures for path in future.result()]
+
+
+if __name__ == "__main__":
+    import shutil
+    import sys
+    import tempfile
+
+    import matplotlib.pyplot as plt
+
+    # Synthetic materials (500 by default): a new figure per row in one process
+    # vs reused figures, serially and in a pool
+    rng = np.random.default_rng(0)
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    periods = 12
+    timestamps = pd.date_range("2025-04-01", periods=periods, freq="MS")
+    values = rng.gamma(2.0, 100.0, (n_rows, periods))
+    labels = [f"Material {i}" for i in range(n_rows)]
+    directory = tempfile.mkdtemp()
+    try:
+        headless()
+        start = _time.perf_counter()
+        for i in range(n_rows):
+            fig = plt.figure(figsize=(16, 5))
+            ax = fig.gca()
+            _draw_bars(ax, timestamps, values[i], labels[i])
+            fig.tight_layout()
+            fig.savefig(os.path.join(directory, f"naive-{i}.png"))
+            plt.close(fig)
+        print(f"New figure per row, serial: {_time.perf_counter() - start:.2f}s")
+
+        for workers in (1, None):
+            start = _time.perf_counter()
+            paths = render_bar_rows(labels, values, timestamps, os.path.join(directory, f"png-{workers}"),
+                                    workers=workers)
+            print(f"Reused figure, workers={workers or os.cpu_count()}: {len(paths)} PNGs "
+                  f"in {_time.perf_counter() - start:.2f}s")
+
+        start = _time.perf_counter()
+        render_bar_rows(labels, values, timestamps, os.path.join(directory, "materials.pdf"))
+        print(f"Multi-page PDF: {_time.perf_counter() - start:.2f}s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
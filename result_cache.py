@@ -0,0 +1,102 @@
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def cache_key(contents: bytes, params: dict) -> str:
+    """SHA-256 over the uploaded bytes and the canonical JSON of the solve parameters."""
+    digest = hashlib.sha256(contents)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier content-addressed cache for solve results.
+
+    - Memory: LRU over at most max_entries results.
+    - Disk (optional, when directory is set): one JSON file per key, surviving
+      restarts. When the directory grows beyond max_bytes, the least recently
+      used files (by modification time, refreshed on every hit) are deleted.
+
+    Values must be JSON-serializable. Integer dict keys come back from the disk
+    tier as strings, which serializes to the same response.
+    """
+
+    def __init__(self, max_entries=128, directory=None, max_bytes=100 * 2 ** 20):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Returns (value, tier) with tier "memory" or "disk", or (None, None) on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key], "memory"
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "r") as f:
+                    value = json.load(f)
+                os.utime(path)
+            except (FileNotFoundError, json.JSONDecodeError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value, "disk"
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.directory:
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(value, f, default=str)
+            os.replace(tmp, path)
+            self._evict_disk()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
@@ -0,0 +1,186 @@
+
+import time as _time
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+
+from cost import Cost
+from model import price_sample_matrix
+from parametric_model import ParametricPriceSAA
+
+
+class RollingHorizonSimulator:
+    """
+    Month-by-month receding-horizon replanning of the price SAA model.
+
+    At every period k the simulator plans over [k, k + window), commits the orders
+    placed in the first period, realizes actual demand with the Cost inventory
+    logic and rolls I_0/B_0 forward. Committed orders still in transit enter the
+    next plan as exogenous pipeline arrivals.
+
+    One ParametricPriceSAA is compiled per horizon length and reused across
+    periods and replays, so only the first solve per length pays for
+    canonicalization. Each re-solve is also given the previous plan shifted by
+    one period as a warm start; the default SCIPY (HiGHS) solver ignores it, so
+    this only helps with a solver that accepts warm starts (e.g. solver=cp.OSQP
+    for the LP relaxation).
+
+    window=None re-plans over the remaining horizon (shrinking); an integer window
+    re-plans over a fixed-length receding horizon, truncated at the end of the data.
+    """
+
+    def __init__(self, order_cost, lead_time, capacity_dict, price_samples, h, b,
+                 window=None, solver=cp.SCIPY):
+        self.S = list(order_cost.keys())
+        self.order_cost = order_cost
+        self.lead_time = lead_time
+        self.capacity_dict = capacity_dict
+        self.price_samples = price_samples
+        self.h = h
+        self.b = b
+        self.window = window
+        self.solver = solver
+        self._models = {}
+
+    def _model(self, length):
+        if length not in self._models:
+            self._models[length] = ParametricPriceSAA(length, self.S, self.lead_time, solver=self.solver)
+        return self._models[length]
+
+    @staticmethod
+    def _shift(prev_model, prev_q, prev_y, model):
+        """Maps the previous plan one period forward onto the new model's index."""
+        idx, prev_idx = model.idx, prev_model.idx
+        t1, tp1 = idx.k_t + 1, idx.k_tp + 1
+        ok = tp1 < prev_idx.T
+        pos = prev_idx.flat_position(t1[ok], idx.k_s[ok], tp1[ok])
+        q0, y0 = np.zeros(idx.K), np.zeros(idx.K)
+        q0[ok], y0[ok] = prev_q[pos], prev_y[pos]
+        return q0, y0
+
+    def run(self, actual_demand, forecast_demand=None, I_0=0.0, B_0=0.0,
+            fixed_orders_s2=None, realized_prices=None, verbose=False):
+        """
+        Replays the horizon period by period.
+
+        Parameters:
+        -----------
+        actual_demand : array-like
+            Realized demand per period (e.g. the demand sheet's Actual column).
+        forecast_demand : array-like, optional
+            Demand the planner sees for future periods. Defaults to actual_demand.
+        fixed_orders_s2 : dict, optional
+            {(t, t'): qty} fixed s2 orders in absolute periods.
+        realized_prices : array-like, optional
+            (T, S) prices actually paid. Defaults to the mean of price_samples.
+
+        Returns:
+        --------
+        pd.DataFrame with one row per period: placed/arrived quantities per supplier,
+        inventory, backlog, realized cost components, cumulative cost and replan_time.
+        """
+        actual = np.asarray(actual_demand, dtype=float)
+        forecast = actual if forecast_demand is None else np.asarray(forecast_demand, dtype=float)
+        T, n_s = len(actual), len(self.S)
+
+        prices = price_sample_matrix(self.price_samples, T, self.S)
+        mean_price = prices.mean(axis=0).reshape(T, n_s)
+        realized = mean_price if realized_prices is None else np.asarray(realized_prices, dtype=float)
+        capacity = np.array([[self.capacity_dict[t, s] for s in self.S] for t in range(T)], dtype=float)
+        order_cost = np.array([self.order_cost[s] for s in self.S], dtype=float)
+
+        pipeline = np.zeros((T, n_s))
+        inventory, backlog = I_0, B_0
+        prev = None
+        rows = []
+
+        for k in range(T):
+            length = T - k if self.window is None else min(self.window, T - k)
+            model = self._model(length)
+            fixed = {(t - k, tp - k): q for (t, tp), q in (fixed_orders_s2 or {}).items()
+                     if t >= k and tp < k + length}
+
+            start = _time.perf_counter()
+            model.update(h=self.h, b=self.b, I_0=inventory, B_0=backlog,
+                         order_cost=self.order_cost,
+                         demand=forecast[k:k + length],
+                         capacity=capacity[k:k + length].ravel(),
+                         price_samples=mean_price[k:k + length].reshape(1, -1),
+                         pipeline=pipeline[k:k + length].sum(axis=1),
+                         fixed_orders_s2=fixed)
+            if prev is not None:
+                model.warm_start_from(*self._shift(*prev, model))
+            obj_val, _ = model.solve(verbose=verbose, warm_start=prev is not None, return_result=True)
+            replan_time = _time.perf_counter() - start
+
+            if model.Q.value is None:
+                raise RuntimeError(f"Re-plan at period {k} failed: {model.problem.status}")
+
+            # Commit the orders placed in the first period of the plan
+            idx = model.idx
+            q, y = model.Q.value, model.Y.value
+            first = idx.k_t == 0
+            placed = np.bincount(idx.k_s[first], weights=q[first], minlength=n_s)
+            n_orders = np.bincount(idx.k_s[first], weights=(q[first] > 1e-9).astype(float), minlength=n_s)
+            np.add.at(pipeline, (idx.k_tp[first] + k, idx.k_s[first]), q[first])
+
+            # Realize the period against actual demand
+            arrived = pipeline[k].copy()
+            inventory, backlog = Cost.step(inventory, backlog, arrived.sum(), actual[k])
+
+            row = {"period": k, "horizon": length, "planned_objective": obj_val}
+            row.update({f"placed_{s}": placed[j] for j, s in enumerate(self.S)})
+            row.update({f"arrived_{s}": arrived[j] for j, s in enumerate(self.S)})
+            row.update({
+                "demand": actual[k],
+                "inventory": inventory,
+                "backlog": backlog,
+                "procurement_cost": realized[k] @ placed,
+                "order_cost": order_cost @ n_orders,
+                "holding_cost": self.h * inventory,
+                "backlog_cost": self.b * backlog,
+                "replan_time": replan_time,
+            })
+            rows.append(row)
+            prev = (model, q, y)
+
+        trajectory = pd.DataFrame(rows).set_index("period")
+        trajectory["total_cost"] = trajectory[["procurement_cost", "order_cost",
+                                               "holding_cost", "backlog_cost"]].sum(axis=1)
+        trajectory["cumulative_cost"] = trajectory["total_cost"].cumsum()
+        return trajectory
+
+
+if __name__ == "__main__":
+    import yaml
+    from price_distributions import PriceDistributionGenerator
+    from workbook_loader import load_problem_sheets
+
+    with open("config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    sheets = load_problem_sheets("pidsg25-02.xlsx", ("demand", "supplier", "capacity"))
+    demand_df = sheets["demand"]
+    supplier_df = sheets["supplier"]
+    capacity_df = sheets["capacity"]
+
+    actual = demand_df["Actual"].dropna().values
+    forecast = demand_df.filter(like="Syn").mean(axis=1).values[:len(actual)]
+    T = len(actual)
+    S = supplier_df["supplier"].tolist()
+    lead_time = dict(zip(supplier_df["supplier"], supplier_df["lead_time"]))
+    order_cost = dict(zip(supplier_df["supplier"], supplier_df["order_cost"]))
+    capacity_dict = {(t, s): capacity_df.loc[t + 1, s] for t in range(T) for s in S}
+
+    dist_name = config["distribution_name"]
+    generator = PriceDistributionGenerator(T=T, N=config["problem"]["N"], seed=config["problem"]["seed"])
+    price_samples = generator.generate_array(dist_name, config["distributions"][dist_name], suppliers=S)
+
+    simulator = RollingHorizonSimulator(order_cost, lead_time, capacity_dict, price_samples,
+                                        h=config["problem"]["h"], b=config["problem"]["b"])
+    start = _time.perf_counter()
+    trajectory = simulator.run(actual, forecast, I_0=config["problem"]["I_0"], B_0=config["problem"]["B_0"])
+    print(trajectory)
+    print(f"Replayed {T} periods in {_time.perf_counter() - start:.2f}s, "
+          f"realized cost {trajectory['cumulative_cost'].iloc[-1]:.2f}")
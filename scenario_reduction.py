@@ -0,0 +1,181 @@
+
+import numpy as np
+from scipy.optimize import nnls
+from scipy.spatial.distance import cdist
+
+
+def _chunked_distance_sum(X, candidates, members, chunk=8192):
+    """Sum of Euclidean distances from each candidate to all members, in member chunks."""
+    total = np.zeros(len(candidates))
+    for start in range(0, len(members), chunk):
+        total += cdist(X[candidates], X[members[start:start + chunk]]).sum(axis=1)
+    return total
+
+
+def kmedoids(X, k, seed=None, max_iter=50, n_candidates=64):
+    """
+    Vectorized k-medoids (Voronoi iteration) on the rows of X.
+
+    Medoids are seeded with k-means++. Each iteration assigns every sample to its
+    nearest medoid, then moves each medoid to the member that minimizes the total
+    distance to its cluster. For large clusters only the n_candidates members
+    closest to the cluster mean are considered, which keeps an update at
+    O(n_candidates * cluster size).
+
+    Returns (medoid indices (k,), labels (N,)).
+    """
+    X = np.asarray(X, dtype=float)
+    N = len(X)
+    if k >= N:
+        return np.arange(N), np.arange(N)
+
+    rng = np.random.default_rng(seed)
+    medoids = [int(rng.integers(N))]
+    d2 = ((X - X[medoids[0]]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        p = d2 / d2.sum() if d2.sum() > 0 else np.full(N, 1.0 / N)
+        medoids.append(int(rng.choice(N, p=p)))
+        d2 = np.minimum(d2, ((X - X[medoids[-1]]) ** 2).sum(axis=1))
+    medoids = np.array(medoids)
+
+    for _ in range(max_iter):
+        labels = cdist(X, X[medoids]).argmin(axis=1)
+        updated = medoids.copy()
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if len(members) == 0:
+                continue
+            candidates = members
+            if len(members) > n_candidates:
+                centre = X[members].mean(axis=0)
+                closest = np.argsort(((X[members] - centre) ** 2).sum(axis=1))[:n_candidates]
+                candidates = members[closest]
+            updated[c] = candidates[_chunked_distance_sum(X, candidates, members).argmin()]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    return medoids, cdist(X, X[medoids]).argmin(axis=1)
+
+
+def moment_matching_weights(X, representatives, mean_weight=10.0, sum_weight=100.0):
+    """
+    Nonnegative weights on X[representatives] (summing to one) whose weighted mean
+    and variance per dimension best match those of X in the least-squares sense.
+
+    Every residual is in units of the dimension's standard deviation.
+
+    Parameters:
+    -----------
+    mean_weight : float
+        Weight of the first-moment rows relative to the second-moment rows. The
+        aggregated SAA objective only sees the mean, so an error of one std in the
+        mean costs as much as an error of mean_weight in the variance ratio.
+    sum_weight : float
+        Weight of the sum-to-one row, per sqrt(dimension) so that it keeps
+        dominating the d moment rows. nnls has no equality constraints; a large
+        weight makes the sum close to one, and the result is normalized anyway.
+    """
+    X = np.asarray(X, dtype=float)
+    R = X[representatives]
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    scale = np.where(std > 0, std, 1.0)
+
+    unit = sum_weight * np.sqrt(X.shape[1])
+    A = np.vstack([
+        mean_weight * (R - mean).T / scale[:, None],        # first moments
+        ((R - mean) ** 2).T / (scale ** 2)[:, None],        # second moments
+        np.full((1, len(R)), unit),                         # sum-to-one
+    ])
+    target = np.concatenate([np.zeros(X.shape[1]), (std / scale) ** 2, [unit]])
+    weights, _ = nnls(A, target)
+    if weights.sum() <= 0:
+        weights = np.full(len(R), 1.0)
+    return weights / weights.sum()
+
+
+def reduction_report(X, representatives, weights, labels=None):
+    """
+    Compares the reduced set with the full sample.
+
+    Returns a dict with
+        - mean_error: max relative error of the weighted mean across dimensions.
+          The aggregated SAA objective depends on prices only through this mean.
+        - std_error: max error of the weighted standard deviation relative to
+          the dimension's std, floored at 1e-6 of the mean price level so that
+          (near-)constant dimensions do not report round-off as error.
+        - transport_distance: mean distance from each sample to its representative,
+          an upper bound on the Wasserstein-1 distance when weights are cluster shares.
+    """
+    X = np.asarray(X, dtype=float)
+    R = X[representatives]
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    r_mean = weights @ R
+    r_std = np.sqrt(weights @ (R - r_mean) ** 2)
+    floor = 1e-6 * max(float(np.abs(mean).mean()), np.finfo(float).tiny)
+    if labels is None:
+        labels = cdist(X, R).argmin(axis=1)
+    transport = np.linalg.norm(X - R[labels], axis=1).mean()
+    return {
+        "n_samples": len(X),
+        "n_scenarios": len(R),
+        "mean_error": float(np.max(np.abs(r_mean - mean) / np.maximum(np.abs(mean), floor))),
+        "std_error": float(np.max(np.abs(r_std - std) / np.maximum(std, floor))),
+        "transport_distance": float(transport),
+    }
+
+
+def reduce_scenarios(price_samples, n_scenarios, method="kmedoids", seed=None):
+    """
+    Shrinks N price samples to n_scenarios weighted representatives.
+
+    Parameters:
+    -----------
+    price_samples : np.ndarray or list of dict
+        (N, T, S) price array, or [(t, s) -> price] dicts, as passed to solve_price_saa.
+    n_scenarios : int or None
+        Number of representatives K. None keeps the full sample at uniform
+        weights: the aggregated SAA objective only sees the weighted mean price,
+        so reduction pays off only for per-scenario (e.g. CVaR) models.
+    method : str
+        "kmedoids": weights are cluster shares.
+        "moment_matching": k-medoids representatives, weights fitted to match
+        the per-(t, s) mean and variance of the full sample.
+
+    Returns:
+    --------
+    (reduced_samples, weights, report) where reduced_samples has the input's form
+    (a (K, T, S) array or a list of K dicts),
+    weights the scenario probabilities for solve_price_saa and report the output
+    of reduction_report. Samples with missing (non-finite) prices are dropped and
+    counted in report["n_dropped"].
+    """
+    if isinstance(price_samples, np.ndarray):
+        keys = None
+        X = np.asarray(price_samples, dtype=float).reshape(len(price_samples), -1)
+    else:
+        keys = list(price_samples[0].keys())
+        X = np.array([[sample[key] for key in keys] for sample in price_samples], dtype=float)
+    finite = np.isfinite(X).all(axis=1)
+    X = X[finite]
+    if n_scenarios is None:
+        n_scenarios, method = len(X), "kmedoids"
+    elif n_scenarios < 1:
+        raise ValueError(f"n_scenarios must be at least 1, got {n_scenarios}")
+
+    medoids, labels = kmedoids(X, n_scenarios, seed=seed)
+    if method == "kmedoids":
+        weights = np.bincount(labels, minlength=len(medoids)) / len(X)
+    elif method == "moment_matching":
+        weights = moment_matching_weights(X, medoids)
+        labels = None
+    else:
+        raise ValueError(f"Unsupported reduction method: {method}")
+
+    if keys is None:
+        reduced = np.asarray(price_samples, dtype=float)[finite][medoids]
+    else:
+        reduced = [dict(zip(keys, X[i])) for i in medoids]
+    report = reduction_report(X, medoids, weights, labels)
+    report["n_dropped"] = int((~finite).sum())
+    return reduced, weights, report
@@ -0,0 +1,153 @@
+
+import os
+import time as _time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import yaml
+
+from cost import Cost
+from model import solve_price_saa
+from postprocess_order import extract_order_matrices
+from price_distributions import PriceDistributionGenerator
+from scenario_reduction import reduce_scenarios
+from workbook_loader import load_problem_sheets
+
+_DATA = None
+
+
+def load_problem_data(file_path, config):
+    """
+    Loads the demand, supplier and capacity sheets and derives the solver inputs
+    shared by every sweep run.
+    """
+    sheets = load_problem_sheets(file_path, ("demand", "supplier", "capacity"))
+    demand_df = sheets["demand"]
+    supplier_df = sheets["supplier"]
+    capacity_df = sheets["capacity"]
+
+    fixed_demand = demand_df["Actual"].dropna().values
+    T = len(fixed_demand)
+    S = supplier_df["supplier"].tolist()
+    lead_time = dict(zip(supplier_df["supplier"], supplier_df["lead_time"]))
+    lead_time_s2 = int(lead_time["s2"])
+
+    raw_orders_s2 = dict(enumerate(config["problem"]["raw_orders_s2"]))
+    fixed_orders_s2 = {
+        (t, t + lead_time_s2): q
+        for t, q in raw_orders_s2.items()
+        if t + lead_time_s2 < T
+    } if config["problem"]["enforce_fixed_orders"] else None
+
+    return {
+        "fixed_demand": fixed_demand,
+        "S": S,
+        "lead_time": lead_time,
+        "order_cost": dict(zip(supplier_df["supplier"], supplier_df["order_cost"])),
+        "capacity_dict": {(t, s): capacity_df.loc[t + 1, s] for t in range(T) for s in S},
+        "fixed_orders_s2": fixed_orders_s2,
+    }
+
+
+def _init_worker(file_path, config):
+    """Loads the workbook once per worker process."""
+    global _DATA
+    _DATA = load_problem_data(file_path, config)
+
+
+def run_single(dist_name, params, seed, problem, n_samples, output_dir):
+    """
+    Generates prices for one (distribution, seed) pair, solves the SAA model and
+    writes order_placed_{dist}_seed{seed}.csv. Returns a summary row.
+    """
+    data = _DATA
+    start = _time.perf_counter()
+    fixed_demand = data["fixed_demand"]
+    T = len(fixed_demand)
+
+    generator = PriceDistributionGenerator(T=T, N=problem["N"], seed=seed)
+    price_samples = generator.generate_array(dist_name, params, suppliers=data["S"])
+    price_samples, scenario_weights, reduction = reduce_scenarios(
+        price_samples, n_samples, method=problem.get("scenario_reduction", "kmedoids"), seed=seed)
+
+    obj_val, result = solve_price_saa(
+        fixed_demand=fixed_demand,
+        price_samples=price_samples,
+        order_cost=data["order_cost"],
+        lead_time=data["lead_time"],
+        capacity_dict=data["capacity_dict"],
+        h=problem["h"],
+        b=problem["b"],
+        I_0=problem["I_0"],
+        B_0=problem["B_0"],
+        fixed_orders_s2=data["fixed_orders_s2"],
+        scenario_weights=scenario_weights,
+        return_result=True,
+        verbose=False,
+    )
+    order_placed, order_arr = extract_order_matrices(result)
+
+    output_filename = os.path.join(output_dir, f"order_placed_{dist_name}_seed{seed}.csv")
+    order_placed.to_csv(output_filename, index=True)
+
+    cost = Cost(result, order_placed, initial_inventory=problem["I_0"], demand=fixed_demand)
+    inv_cost, backlog_cost = cost.compute_inventory_backlog_cost(problem["h"], problem["b"])
+
+    return {
+        "distribution": dist_name,
+        "seed": seed,
+        "objective": obj_val,
+        "storage_cost": inv_cost.sum(),
+        "backlog_cost": backlog_cost.sum(),
+        "reduction_mean_error": reduction["mean_error"],
+        "order_placed_file": output_filename,
+        "runtime": _time.perf_counter() - start,
+        "error": None,
+    }
+
+
+def run_sweep(config, file_path="pidsg25-02.xlsx"):
+    """
+    Fans every configured (distribution, seed) run out over a ProcessPoolExecutor
+    and aggregates objective, storage cost and backlog cost into one table.
+    A failed run is recorded with its error instead of aborting the sweep.
+    """
+    sweep_cfg = config["sweep"]
+    problem = config["problem"]
+    names = sweep_cfg.get("distributions", "all")
+    if names == "all":
+        names = list(config["distributions"])
+    seeds = sweep_cfg.get("seeds", [problem["seed"]])
+    n_samples = sweep_cfg.get("n_samples", problem["N"])
+    output_dir = sweep_cfg.get("output_dir", "sweep_results")
+    os.makedirs(output_dir, exist_ok=True)
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=sweep_cfg.get("workers"),
+                             initializer=_init_worker, initargs=(file_path, config)) as pool:
+        futures = {
+            pool.submit(run_single, name, config["distributions"][name], seed,
+                        problem, n_samples, output_dir): (name, seed)
+            for name in names for seed in seeds
+        }
+        for future in as_completed(futures):
+            name, seed = futures[future]
+            try:
+                rows.append(future.result())
+            except Exception as exc:
+                rows.append({"distribution": name, "seed": seed, "error": repr(exc)})
+            print(f"Finished {name} (seed {seed})")
+
+    results = pd.DataFrame(rows).sort_values(["distribution", "seed"]).reset_index(drop=True)
+    results.to_csv(os.path.join(output_dir, "sweep_results.csv"), index=False)
+    return results
+
+
+if __name__ == "__main__":
+    with open("config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    start = _time.perf_counter()
+    results = run_sweep(config)
+    print(results[["distribution", "seed", "objective", "storage_cost", "backlog_cost", "error"]])
+    print(f"Sweep of {len(results)} runs took {_time.perf_counter() - start:.2f}s")
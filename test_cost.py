@@ -0,0 +1,50 @@
+
+"""
+Batched inventory/backlog simulation against the per-period Cost.step recurrence.
+
+Run with: python -m pytest test_cost.py
+"""
+
+import numpy as np
+import pytest
+
+from cost import Cost
+
+
+def _loop(plan, demand, h, b, initial_inventory, initial_backlog):
+    inventory, backlog, total = initial_inventory, initial_backlog, 0.0
+    for inflow, d in zip(plan.sum(axis=1), demand):
+        inventory, backlog = Cost.step(inventory, backlog, inflow, d)
+        total += h * inventory + b * backlog
+    return total
+
+
+@pytest.fixture(scope="module")
+def batch():
+    rng = np.random.default_rng(0)
+    return rng.uniform(0, 200, (3, 6, 2)), rng.uniform(100, 300, (5, 6))
+
+
+def test_totals_match_step_loop(batch):
+    plans, demands = batch
+    sim = Cost.simulate_batch(plans, demands, 5, 50, initial_inventory=80.0, initial_backlog=20.0, chunk_size=2)
+    expected = [[_loop(p, d, 5, 50, 80.0, 20.0) for d in demands] for p in plans]
+
+    np.testing.assert_allclose(sim["total_cost"], expected)
+    assert sim["inventory_cost"] is None and sim["backlog_cost"] is None
+
+
+def test_tensors_are_opt_in(batch):
+    plans, demands = batch
+    sim = Cost.simulate_batch(plans, demands, 5, 50, return_tensors=True)
+
+    assert sim["inventory_cost"].shape == (3, 5, 6)
+    np.testing.assert_allclose(sim["inventory_cost"].sum(axis=2) + sim["backlog_cost"].sum(axis=2),
+                               sim["total_cost"])
+
+
+def test_dtype_given_as_string(batch):
+    plans, demands = batch
+    sim = Cost.simulate_batch(plans, demands, 5, 50, initial_inventory=10.0, dtype="float32")
+
+    assert sim["total_cost"].dtype == np.float32
@@ -0,0 +1,58 @@
+
+"""
+Price array layout helpers.
+
+Run with: python -m pytest test_dataclass.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataclass import price_array_from_dicts, price_array_from_frames, price_dicts_from_array
+
+
+def _frames():
+    # T = 3 periods, N = 4 samples; s1 prices in the 100s, s2 in the 200s
+    return {"s1": pd.DataFrame(100 + np.arange(12.0).reshape(3, 4)),
+            "s2": pd.DataFrame(200 + np.arange(12.0).reshape(3, 4))}
+
+
+def test_stacks_suppliers_by_name_in_solver_order():
+    frames = _frames()
+    forward = price_array_from_frames(frames, ["s1", "s2"])
+    reverse = price_array_from_frames(frames, ["s2", "s1"])
+
+    assert forward.shape == (4, 3, 2)
+    assert forward.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(forward[:, :, 0], frames["s1"].to_numpy().T)
+    np.testing.assert_array_equal(reverse[:, :, 0], frames["s2"].to_numpy().T)
+    np.testing.assert_array_equal(reverse, forward[:, :, ::-1])
+
+
+def test_mapping_order_does_not_matter():
+    frames = _frames()
+    swapped = {"s2": frames["s2"], "s1": frames["s1"]}
+
+    np.testing.assert_array_equal(price_array_from_frames(swapped, ["s1", "s2"]),
+                                  price_array_from_frames(frames, ["s1", "s2"]))
+
+
+def test_n_samples_keeps_the_first_samples():
+    prices = price_array_from_frames(_frames(), ["s1", "s2"], n_samples=2)
+
+    assert prices.shape == (2, 3, 2)
+    np.testing.assert_array_equal(prices[:, :, 0], _frames()["s1"].to_numpy()[:, :2].T)
+
+
+def test_missing_supplier_raises():
+    with pytest.raises(ValueError):
+        price_array_from_frames(_frames(), ["s1", "s3"])
+
+
+def test_dict_round_trip():
+    prices = price_array_from_frames(_frames(), ["s1", "s2"])
+    dicts = price_dicts_from_array(prices, ["s1", "s2"])
+
+    assert dicts[1][(2, "s2")] == prices[1, 2, 1]
+    np.testing.assert_array_equal(price_array_from_dicts(dicts, 3, ["s1", "s2"]), prices)
@@ -0,0 +1,48 @@
+
+"""
+Streaming AI-forecast ingest against the in-memory load + groupby path.
+
+Run with: python -m pytest test_extraction_demand.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from extraction_demand import (generate_monthly_prediction_matrix, load_and_prepare_data,
+                               stream_monthly_prediction_matrix)
+
+
+@pytest.fixture(scope="module")
+def forecast():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        "date": rng.choice(["1/4/25", "15/4/25", "3/5/25", "28/6/25", "1/7/25"], n),
+        "Part Number": rng.choice(["ECGCX0J101R", "EEFSX0E471E4", "EEF 123", "A1", "ZZ9"], n),
+        "pred": rng.integers(0, 10_000, n).astype(float),
+        "Customer Code": rng.choice(["PDG/ANGR", "PDG/SONU"], n),
+    })
+
+
+def _compare(path, chunksize):
+    expected_matrix, expected_totals = generate_monthly_prediction_matrix(load_and_prepare_data(path))
+    matrix, totals = stream_monthly_prediction_matrix(path, chunksize=chunksize)
+
+    assert list(matrix.index) == list(expected_matrix.index)
+    assert list(matrix.columns) == list(expected_matrix.columns)
+    np.testing.assert_allclose(matrix.to_numpy(), expected_matrix.to_numpy())
+    np.testing.assert_allclose(totals.to_numpy(), expected_totals.to_numpy())
+
+
+@pytest.mark.parametrize("chunksize", [37, 100_000])
+def test_stream_matches_in_memory(forecast, tmp_path, chunksize):
+    path = tmp_path / "forecast.csv"
+    forecast.to_csv(path, index=False)
+    _compare(path, chunksize)
+
+
+def test_stream_without_customer_code(forecast, tmp_path):
+    path = tmp_path / "forecast.csv"
+    forecast.drop(columns="Customer Code").to_csv(path, index=False)
+    _compare(path, 64)
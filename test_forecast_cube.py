@@ -0,0 +1,76 @@
+
+"""
+ForecastCube totals against raw groupby sums of the forecast rows.
+
+Run with: python -m pytest test_forecast_cube.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from extraction_demand import generate_monthly_prediction_matrix, load_and_prepare_data
+from forecast_cube import UNKNOWN_CUSTOMER, ForecastCube
+
+
+@pytest.fixture(scope="module")
+def rows():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        "date": rng.choice(["1/4/25", "15/4/25", "3/5/25", "28/6/25", "1/7/25"], n),
+        "Part Number": rng.choice(["ECGCX0J101R", "EEFSX0E471E4", "A1", "ZZ9"], n),
+        "pred": rng.integers(0, 10_000, n).astype(float),
+        "Customer Code": rng.choice(["PDG/ANGR", "PDG/SONU", "PSI/SAN"], n).astype(object),
+    })
+    df.loc[rng.random(n) < 0.1, "Customer Code"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def csv_path(rows, tmp_path_factory):
+    path = tmp_path_factory.mktemp("cube") / "forecast.csv"
+    rows.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="module")
+def cube(csv_path):
+    return ForecastCube.from_csv(csv_path, chunksize=64)
+
+
+def test_total_matches_raw_sum(rows, cube):
+    assert cube.total() == pytest.approx(rows["pred"].sum())
+
+
+def test_missing_customers_are_kept_as_unknown(rows, cube):
+    by_customer = cube.total(by="customer")
+    expected = rows.fillna({"Customer Code": UNKNOWN_CUSTOMER}).groupby("Customer Code")["pred"].sum()
+
+    assert list(by_customer.index) == list(expected.index)
+    np.testing.assert_allclose(by_customer.to_numpy(), expected.to_numpy())
+    assert by_customer[UNKNOWN_CUSTOMER] == pytest.approx(rows.loc[rows["Customer Code"].isna(), "pred"].sum())
+
+
+def test_part_month_matrix_matches_extraction_demand(csv_path, cube):
+    expected, _ = generate_monthly_prediction_matrix(load_and_prepare_data(csv_path))
+    matrix = cube.part_month_matrix()
+
+    assert list(matrix.index) == list(expected.index)
+    assert list(matrix.columns) == list(expected.columns)
+    np.testing.assert_allclose(matrix.to_numpy(), expected.to_numpy())
+
+
+def test_from_frame_matches_from_csv(rows, cube):
+    frame_cube = ForecastCube.from_frame(rows, date_format="%d/%m/%y")
+
+    np.testing.assert_allclose(frame_cube.values, cube.values)
+    assert list(frame_cube.customers) == list(cube.customers)
+
+
+def test_save_and_load_round_trip(cube, tmp_path):
+    loaded = ForecastCube.load(cube.save(tmp_path / "cube.npz"))
+
+    np.testing.assert_array_equal(loaded.values, cube.values)
+    selection = {"customers": UNKNOWN_CUSTOMER, "months": "2025Q2"}
+    assert loaded.total(**selection) == cube.total(**selection)
@@ -0,0 +1,76 @@
+
+"""
+Forecast revisions aligned on canonical part keys and compared pairwise.
+
+Run with: python -m pytest test_forecast_versions.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from forecast_versions import canonical_part_keys, compare_forecast_versions, stack_versions
+
+MONTHS = pd.period_range("2025-04", periods=3, freq="M")
+
+
+def _matrix(rows):
+    return pd.DataFrame.from_dict(rows, orient="index", columns=MONTHS, dtype=float)
+
+
+def test_variants_map_onto_the_base_part_of_another_version():
+    keys = canonical_part_keys({
+        "production": _matrix({"EEFCX1C680R": [1, 2, 3], "ECGCX0J101R": [1, 1, 1]}),
+        "ai": _matrix({"EEFCX1C680R EA1": [1, 0, 0], "EEFCX1C680R WA1": [0, 1, 0], "ECG CX0J101R": [2, 2, 2]}),
+    })
+
+    assert set(keys["ai"].values()) == {"EEFCX1C680R", "ECGCX0J101R"}
+    assert keys["ai"]["EEFCX1C680R EA1"] == keys["ai"]["EEFCX1C680R WA1"] == "EEFCX1C680R"
+    assert keys["ai"]["ECG CX0J101R"] == "ECGCX0J101R"
+
+
+def test_parts_of_one_version_are_never_merged():
+    keys = canonical_part_keys({
+        "material": _matrix({"EEFCX1C680R": [1, 2, 3], "EEFCX1C680R EA1": [4, 5, 6]}),
+        "ai": _matrix({"EEFCX1C680R WA1": [1, 1, 1]}),
+    })
+
+    assert keys["material"]["EEFCX1C680R"] != keys["material"]["EEFCX1C680R EA1"]
+    assert keys["ai"]["EEFCX1C680R WA1"] == "EEFCX1C680R"
+
+
+def test_stack_sums_variants_onto_the_canonical_row():
+    cube, versions, parts, months = stack_versions({
+        "production": _matrix({"EEFCX1C680R": [10, 20, 30]}),
+        "ai": _matrix({"EEFCX1C680R EA1": [1, 2, 3], "EEFCX1C680R WA1": [4, 5, 6], "NEW1": [7, 7, 7]}),
+    })
+
+    assert versions == ["production", "ai"]
+    assert list(parts) == ["EEFCX1C680R", "NEW1"]
+    np.testing.assert_array_equal(cube[1, 0], [5, 7, 9])
+    assert np.isnan(cube[0, 1]).all()
+
+
+def test_stack_without_matching_keeps_variants_apart():
+    _, _, parts, _ = stack_versions({
+        "production": _matrix({"EEFCX1C680R": [10, 20, 30]}),
+        "ai": _matrix({"EEFCX1C680R EA1": [1, 2, 3]}),
+    }, match=False)
+
+    assert list(parts) == ["EEFCX1C680R", "EEFCX1C680REA1"]
+
+
+def test_pairs_without_common_cells_are_reported(tmp_path):
+    specs = []
+    for name, part, dates in [("a", "P1", ["1/4/25", "1/5/25"]), ("b", "P1 X", ["9/4/25", "1/6/25"]),
+                              ("c", "Q9", ["1/7/25"])]:
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({"date": dates, "Part Number": part, "pred": 100.0}).to_csv(path, index=False)
+        specs.append({"name": name, "path": str(path), "kind": "ai_forecast"})
+
+    result = compare_forecast_versions(specs, workers=1)
+    metrics = result["metrics"].set_index(["version_a", "version_b"])
+
+    assert metrics.loc[("a", "b"), "common_cells"] == 1
+    assert metrics.loc[("a", "b"), "mae"] == 0.0
+    assert sorted(result["no_overlap"]) == [("a", "c"), ("b", "c")]
+    assert np.isnan(metrics.loc[("a", "c"), "mae"])
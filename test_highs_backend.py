@@ -0,0 +1,48 @@
+
+"""
+Parity of the direct HiGHS backend with the CVXPY path (pidsg25-02.xlsx, 5 price samples).
+
+Run with: python -m pytest test_highs_backend.py
+"""
+
+import numpy as np
+import pytest
+
+from dataclass import price_array_from_frames
+from highs_backend import solve_price_saa_highs
+from model import solve_price_saa
+from workbook_loader import load_problem_sheets
+
+
+@pytest.fixture(scope="module")
+def params():
+    sheets = load_problem_sheets("pidsg25-02.xlsx")
+    supplier_df = sheets["supplier"]
+    capacity_df = sheets["capacity"]
+
+    fixed_demand = sheets["demand"]["Actual"].dropna().values
+    T = len(fixed_demand)
+    S = supplier_df["supplier"].tolist()
+    return dict(
+        fixed_demand=fixed_demand,
+        price_samples=price_array_from_frames({"s1": sheets["p1normal"], "s2": sheets["p2normal"]}, S, 5)[:, :T],
+        order_cost=dict(zip(supplier_df["supplier"], supplier_df["order_cost"])),
+        lead_time=dict(zip(supplier_df["supplier"], supplier_df["lead_time"])),
+        capacity_dict={(t, s): capacity_df.loc[t + 1, s] for t in range(T) for s in S},
+        h=5, b=50, I_0=0, B_0=0,
+    )
+
+
+def test_lp_relaxation_matches_cvxpy(params):
+    obj_cvxpy, df_cvxpy = solve_price_saa(**params, verbose=False)
+    obj_lp, df_lp = solve_price_saa_highs(**params, integer_orders=False, verbose=False)
+
+    assert np.isclose(obj_cvxpy, obj_lp, rtol=1e-6)
+    assert df_cvxpy["variable_name"].tolist() == df_lp["variable_name"].tolist()
+
+
+def test_milp_is_not_below_lp_relaxation(params):
+    obj_lp, _ = solve_price_saa_highs(**params, integer_orders=False, verbose=False)
+    obj_milp, _ = solve_price_saa_highs(**params, integer_orders=True, verbose=False)
+
+    assert obj_milp >= obj_lp - 1e-6 * abs(obj_lp)
@@ -0,0 +1,64 @@
+
+"""
+ParametricPriceSAA against the one-shot solve_price_saa on a small synthetic instance.
+
+Run with: python -m pytest test_parametric_model.py
+"""
+
+import numpy as np
+import pytest
+
+from model import solve_price_saa
+from parametric_model import ParametricPriceSAA
+
+T, S = 8, ["s1", "s2"]
+
+
+@pytest.fixture(scope="module")
+def instance():
+    rng = np.random.default_rng(0)
+    demand = rng.uniform(100, 300, T)
+    return dict(
+        fixed_demand=demand,
+        price_samples=rng.normal([45.0, 50.0], [5.0, 6.0], (6, T, 2)),
+        order_cost={"s1": 60.0, "s2": 40.0},
+        lead_time={"s1": 1, "s2": 2},
+        capacity_dict={(t, s): 0.8 * demand.max() for t in range(T) for s in S},
+        h=5, b=50, I_0=0.0, B_0=0.0,
+    )
+
+
+def _model(instance):
+    model = ParametricPriceSAA(T, S, instance["lead_time"])
+    return model.update(h=instance["h"], b=instance["b"], I_0=instance["I_0"], B_0=instance["B_0"],
+                        order_cost=instance["order_cost"], demand=instance["fixed_demand"],
+                        capacity=instance["capacity_dict"], price_samples=instance["price_samples"])
+
+
+def test_objective_matches_solve_price_saa(instance):
+    obj_param, _ = _model(instance).solve()
+    obj_direct, _ = solve_price_saa(**instance, verbose=False)
+
+    assert np.isclose(obj_param, obj_direct, rtol=1e-6)
+
+
+def test_resolve_after_update_matches_fresh_solve(instance):
+    model = _model(instance)
+    model.solve()
+    obj_param, _ = model.solve(h=10, b=80)
+    obj_direct, _ = solve_price_saa(**{**instance, "h": 10, "b": 80}, verbose=False)
+
+    assert np.isclose(obj_param, obj_direct, rtol=1e-6)
+
+
+def test_scenario_weights_alone_reweight_stored_samples(instance):
+    weights = np.array([5.0, 1.0, 1.0, 1.0, 1.0, 1.0])
+    obj_param, _ = _model(instance).update(scenario_weights=weights).solve()
+    obj_direct, _ = solve_price_saa(**instance, scenario_weights=weights, verbose=False)
+
+    assert np.isclose(obj_param, obj_direct, rtol=1e-6)
+
+
+def test_scenario_weights_without_samples_raise():
+    with pytest.raises(ValueError):
+        ParametricPriceSAA(T, S, {"s1": 1, "s2": 2}).update(scenario_weights=[1.0, 1.0])
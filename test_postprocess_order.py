@@ -0,0 +1,48 @@
+
+"""
+Order matrices from the typed SAAResult and from the (variable_name, value) frame.
+
+Run with: python -m pytest test_postprocess_order.py
+"""
+
+import numpy as np
+import pytest
+
+from model import solve_price_saa
+from postprocess_order import extract_order_matrices
+
+T, S = 8, ["s1", "s2"]
+
+
+@pytest.fixture(scope="module")
+def result():
+    rng = np.random.default_rng(1)
+    demand = rng.uniform(100, 300, T)
+    _, result = solve_price_saa(
+        fixed_demand=demand, price_samples=rng.normal([45.0, 50.0], [5.0, 6.0], (4, T, 2)),
+        order_cost={"s1": 60.0, "s2": 40.0}, lead_time={"s1": 1, "s2": 2},
+        capacity_dict={(t, s): 0.8 * demand.max() for t in range(T) for s in S},
+        h=5, b=50, I_0=0.0, B_0=0.0, return_result=True, verbose=False)
+    return result
+
+
+def test_frame_and_result_give_the_same_matrices(result):
+    from_result = extract_order_matrices(result)
+    from_frame = extract_order_matrices(result.to_frame())
+
+    for typed, parsed in zip(from_result, from_frame):
+        assert list(typed.columns) == list(parsed.columns)
+        np.testing.assert_allclose(typed.to_numpy(), parsed.to_numpy())
+
+
+def test_frame_values_are_used(result):
+    frame = result.to_frame()
+    frame["value"] = 0.0
+    placement, arrival = extract_order_matrices(frame)
+
+    assert placement.to_numpy().sum() == 0.0
+    assert arrival.to_numpy().sum() == 0.0
+
+
+def test_frame_does_not_carry_the_result(result):
+    assert "result" not in result.to_frame().attrs
@@ -0,0 +1,50 @@
+
+"""
+PriceDistributionGenerator streams and validation.
+
+Run with: python -m pytest test_price_distributions.py
+"""
+
+import numpy as np
+import pytest
+
+from price_distributions import PriceDistributionGenerator, supplier_params
+
+PARAMS = {"s1": {"mean": 45, "std": 5}, "s2": {"mean": 50, "std": 6}}
+
+
+@pytest.mark.parametrize("N", [0, -1])
+def test_n_below_one_raises(N):
+    with pytest.raises(ValueError):
+        PriceDistributionGenerator(T=12, N=N, seed=0)
+
+
+def test_generate_array_layout():
+    prices = PriceDistributionGenerator(T=12, N=7, seed=0).generate_array("normal", PARAMS)
+
+    assert prices.shape == (7, 12, 2)
+    assert prices.flags["C_CONTIGUOUS"]
+
+
+def test_samples_do_not_depend_on_chunk_size():
+    generator = PriceDistributionGenerator(T=5, N=23, seed=3)
+    whole = generator.generate("gamma", {"s1": {"shape": 2.0, "scale": 22.0}})["s1"]
+    chunks = np.concatenate([block["s1"] for block in generator.iter_chunks(
+        "gamma", {"s1": {"shape": 2.0, "scale": 22.0}}, chunk_size=4)], axis=1)
+
+    np.testing.assert_array_equal(whole, chunks)
+
+
+def test_seed_and_worker_select_the_stream():
+    def draw(seed, worker):
+        return PriceDistributionGenerator(T=4, N=3, seed=seed, worker=worker).generate_array("normal", PARAMS)
+
+    np.testing.assert_array_equal(draw(1, 0), draw(1, 0))
+    assert not np.array_equal(draw(1, 0), draw(1, 1))
+    assert not np.array_equal(draw(1, 0), draw(2, 0))
+
+
+def test_legacy_suffixed_params():
+    assert supplier_params("normal", {"mean1": 45, "std1": 5, "mean2": 50, "std2": 6}) == PARAMS
+    with pytest.raises(ValueError):
+        supplier_params("normal", {"shape1": 2.0})
@@ -0,0 +1,91 @@
+
+"""
+Incremental ReconciliationStore against the full reconcile_monthly_forecast.
+
+Run with: python -m pytest test_reconciliation_store.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from extraction_demand import reconcile_monthly_forecast
+from reconciliation_store import ReconciliationStore
+
+
+def _matrix(rng, parts, months):
+    values = rng.integers(0, 5, (len(parts), len(months))).astype(float) * 100
+    values[rng.random(values.shape) < 0.1] = np.nan
+    return pd.DataFrame(values, index=pd.Index(parts, name="Part Number"),
+                        columns=pd.period_range(months[0], periods=len(months), freq="M"))
+
+
+@pytest.fixture(scope="module")
+def versions():
+    rng = np.random.default_rng(0)
+    parts = [f"P{i:03d}" for i in range(40)]
+    reference = _matrix(rng, parts[5:], ["2025-04"] * 4)
+    first = _matrix(rng, parts[:35], ["2025-04"] * 3)
+
+    second = first.copy()
+    second.iloc[:4, :2] *= 1.5                      # changed cells
+    second = second.drop(second.index[-3:])         # removed parts
+    second.loc["P900"] = 700.0                      # new part
+    second["2025-07"] = 50.0                        # new month
+
+    third = second.drop(columns=second.columns[0])  # a month drops out
+    return reference, [first, second, third]
+
+
+def _assert_matches_full(store, df1, df2):
+    full = reconcile_monthly_forecast(df1.copy(), df2.copy()).fillna(0)
+    matrix = store.matrix()
+
+    assert set(matrix.index) == set(full.index)
+    np.testing.assert_allclose(matrix.loc[full.index, full.columns].to_numpy(), full.to_numpy())
+    extra = matrix.columns.difference(full.columns)
+    assert not matrix[extra].to_numpy().any()
+
+
+def test_updates_match_full_reconciliation(versions):
+    reference, predictions = versions
+    store = ReconciliationStore()
+    for prediction in predictions:
+        store.update(prediction, reference)
+        _assert_matches_full(store, prediction, reference)
+
+
+def test_unchanged_update_recomputes_nothing(versions):
+    reference, predictions = versions
+    store = ReconciliationStore()
+    store.update(predictions[0], reference)
+    delta = store.update(predictions[0], reference)
+
+    assert delta.empty
+    assert delta.attrs["recomputed_parts"] == 0
+
+
+def test_delta_reports_changed_cells(versions):
+    reference, (first, second, _) = versions
+    store = ReconciliationStore()
+    store.update(first, reference)
+    before = store.matrix()
+    delta = store.update(second, reference)
+    after = store.matrix()
+    index, columns = before.index.union(after.index), before.columns.union(after.columns)
+    before = before.reindex(index=index, columns=columns, fill_value=0.0)
+    after = after.reindex(index=index, columns=columns, fill_value=0.0)
+
+    assert len(delta) == int((before != after).to_numpy().sum())
+    assert set(delta["kind"]) <= {"added", "removed", "changed"}
+
+
+def test_state_survives_a_new_instance(versions, tmp_path):
+    reference, (first, second, _) = versions
+    ReconciliationStore(str(tmp_path)).update(first, reference, version="v1")
+    store = ReconciliationStore(str(tmp_path))
+    store.update(second, reference, version="v2")
+
+    assert store.versions == ["v1", "v2"]
+    assert (tmp_path / "deltas").is_dir()
+    _assert_matches_full(store, second, reference)
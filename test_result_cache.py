@@ -0,0 +1,60 @@
+
+"""
+ResultCache hits and misses across the memory and disk tiers.
+
+Run with: python -m pytest test_result_cache.py
+"""
+
+import os
+
+from result_cache import ResultCache, cache_key
+
+PARAMS = {"h": 5, "b": 50, "n_scenarios": None}
+
+
+def test_key_depends_on_contents_and_params():
+    key = cache_key(b"workbook", PARAMS)
+
+    assert key == cache_key(b"workbook", {"n_scenarios": None, "b": 50, "h": 5})
+    assert key != cache_key(b"workbook2", PARAMS)
+    assert key != cache_key(b"workbook", {**PARAMS, "h": 6})
+
+
+def test_memory_hit_and_miss():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"objective": 1.0})
+
+    assert cache.get("a") == ({"objective": 1.0}, "memory")
+    assert cache.get("b") == (None, None)
+    assert cache.stats() == {"hits": 1, "misses": 1, "memory_entries": 1}
+
+
+def test_memory_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") == (None, None)
+    assert cache.get("a") == (1, "memory")
+    assert cache.get("c") == (3, "memory")
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    ResultCache(directory=str(tmp_path)).put("a", {"order": {1: 2.0}})
+    cache = ResultCache(directory=str(tmp_path))
+
+    assert cache.get("a") == ({"order": {"1": 2.0}}, "disk")
+    assert cache.get("a")[1] == "memory"
+    assert cache.get("missing") == (None, None)
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = ResultCache(max_entries=1, directory=str(tmp_path), max_bytes=64)
+    cache.put("old", "x" * 40)
+    os.utime(tmp_path / "old.json", (0, 0))
+    cache.put("new", "y" * 40)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.json"]
+    assert ResultCache(directory=str(tmp_path)).get("old") == (None, None)
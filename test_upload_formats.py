@@ -0,0 +1,68 @@
+
+"""
+Upload readers: bundle and JSON round trips, and rejection of corrupt payloads.
+
+Run with: python -m pytest test_upload_formats.py
+"""
+
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from upload_formats import UploadError, encode_bundle, encode_json, read_upload
+
+T, N = 4, 3
+
+
+@pytest.fixture(scope="module")
+def tables():
+    rng = np.random.default_rng(0)
+    return {
+        "demand": pd.DataFrame({"Actual": rng.uniform(100, 300, T)}, index=pd.Index(range(T), name="time")),
+        "p1normal": pd.DataFrame(rng.normal(45, 5, (T, N)), index=pd.Index(range(T), name="time")),
+        "p2normal": pd.DataFrame(rng.normal(50, 6, (T, N)), index=pd.Index(range(T), name="time")),
+        "supplier": pd.DataFrame({"supplier": ["s1", "s2"], "order_cost": [60.0, 40.0], "lead_time": [1, 2]}),
+        "capacity": pd.DataFrame({"s1": [250.0] * T, "s2": [250.0] * T}, index=pd.Index(range(1, T + 1), name="time")),
+    }
+
+
+@pytest.mark.parametrize("suffix", ["parquet", "arrow"])
+def test_bundle_round_trip(tables, suffix):
+    parsed = read_upload(encode_bundle(tables, suffix), "bundle")
+
+    for name in ("p1normal", "p2normal"):
+        np.testing.assert_allclose(parsed[name].to_numpy(), tables[name].to_numpy())
+    np.testing.assert_allclose(parsed["demand"]["Actual"], tables["demand"]["Actual"])
+
+
+def test_json_round_trip(tables):
+    parsed = read_upload(encode_json(tables), "json")
+
+    np.testing.assert_allclose(parsed["p1normal"].to_numpy(), tables["p1normal"].to_numpy())
+    assert list(parsed["capacity"].index) == list(range(1, T + 1))
+
+
+@pytest.mark.parametrize("suffix", ["parquet", "arrow"])
+def test_corrupt_bundle_member_names_the_member(tables, suffix):
+    source = zipfile.ZipFile(io.BytesIO(encode_bundle(tables, suffix)))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for info in source.infolist():
+            data = source.read(info.filename)
+            archive.writestr(info.filename, data[: len(data) // 2] if info.filename.startswith("p2normal") else data)
+
+    with pytest.raises(UploadError, match=f"p2normal.{suffix}"):
+        read_upload(buffer.getvalue(), "bundle")
+
+
+@pytest.mark.parametrize("fmt, contents", [
+    ("xlsx", b"not a workbook"),
+    ("bundle", b"not a zip"),
+    ("json", b"{not json"),
+])
+def test_garbage_raises_upload_error(fmt, contents):
+    with pytest.raises(UploadError):
+        read_upload(contents, fmt)
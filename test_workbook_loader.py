@@ -0,0 +1,56 @@
+
+"""
+Workbook loader: sidecar round trip, bounded in-process cache, uncached uploads.
+
+Run with: python -m pytest test_workbook_loader.py
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import workbook_loader
+from workbook_loader import load_sheets
+
+
+@pytest.fixture(scope="module")
+def workbook():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for i in range(4):
+            pd.DataFrame({"a": np.arange(3.0) + i, 7: ["x", "y", "z"]}).to_excel(writer, sheet_name=f"s{i}", index=False)
+    return buffer.getvalue()
+
+
+def test_sidecars_return_the_parsed_frames(workbook, tmp_path):
+    workbook_loader._MEMORY.clear()
+    first = load_sheets(workbook, ["s0", "s1"], cache_dir=str(tmp_path), workers=1)
+    workbook_loader._MEMORY.clear()
+    second = load_sheets(workbook, ["s0", "s1"], cache_dir=str(tmp_path), workers=1)
+
+    for name in ("s0", "s1"):
+        pd.testing.assert_frame_equal(first[name], second[name])
+    assert list(second["s0"].columns) == ["a", 7]
+
+
+def test_memory_cache_is_bounded(workbook, tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_loader, "MEMORY_MAX_ENTRIES", 2)
+    workbook_loader._MEMORY.clear()
+    load_sheets(workbook, ["s0", "s1", "s2", "s3"], cache_dir=str(tmp_path), workers=1)
+
+    assert len(workbook_loader._MEMORY) == 2
+
+
+def test_uncached_load_does_not_hash_or_remember(workbook, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook_key called for an uncached load")
+
+    monkeypatch.setattr(workbook_loader, "workbook_key", fail)
+    workbook_loader._MEMORY.clear()
+    frames = load_sheets(workbook, ["s2"], cache_dir=str(tmp_path), workers=1, use_cache=False)
+
+    assert frames["s2"]["a"].tolist() == [2.0, 3.0, 4.0]
+    assert len(workbook_loader._MEMORY) == 0
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,266 @@
+
+"""
+Readers for the optimize service's upload formats.
+
+Every format carries the same five logical tables as the Excel workbook:
+
+    demand      index: period,   columns: Actual (float, may end in NaN), Syn-* (optional)
+    p1normal    index: period,   columns: one float column per price sample (supplier s1)
+    p2normal    index: period,   columns: one float column per price sample (supplier s2)
+    supplier    columns: supplier ("s1", "s2" in any order), order_cost (float), lead_time (int)
+    capacity    index: period (1..T), columns: one float column per supplier
+
+Accepted encodings, all parsed from memory:
+
+    xlsx        the original workbook, one sheet per table
+    zip bundle  one member per table named <table>.parquet or <table>.arrow
+                (Arrow IPC file or stream). p1normal and p2normal are stored
+                sample-major (one row per sample, one column per period) so
+                the columnar files stay T columns wide; for demand and
+                capacity the first column is the index
+    json        {"demand": {"Actual": [...]},
+                 "p1normal": [[...], ...], "p2normal": [[...], ...],   # T rows x N samples
+                 "supplier": {"supplier": [...], "order_cost": [...], "lead_time": [...]},
+                 "capacity": {"s1": [...], "s2": [...]}}                # T rows, period 1..T
+
+Parse + validate time on this machine (python upload_formats.py, T = 12, two
+price tables of N samples each, median of 3 runs; payload size in brackets):
+
+    N         xlsx              zip/parquet        zip/arrow          json
+    100       0.080 s (<0.1MB)  0.021 s (0.1MB)    0.010 s (0.1MB)    0.004 s (<0.1MB)
+    10000     5.3 s (2.9MB)     0.029 s (2.3MB)    0.015 s (1.9MB)    0.155 s (4.4MB)
+    100000    n/a               0.106 s (23MB)     0.075 s (18MB)     1.59 s (44MB)
+
+xlsx cannot hold 100000 samples (16384-column sheet limit).
+"""
+
+import io
+import json
+import time as _time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from workbook_loader import load_problem_sheets, sheet_names
+
+TABLES = ("demand", "p1normal", "p2normal", "supplier", "capacity")
+INDEXED_TABLES = ("demand", "p1normal", "p2normal", "capacity")
+PRICE_TABLES = ("p1normal", "p2normal")
+
+
+class UploadError(ValueError):
+    """The upload cannot be parsed or does not match the table schema."""
+
+
+def read_excel_tables(contents: bytes):
+    # One-off uploads go through the shared loader without writing sidecars
+    try:
+        names = sheet_names(contents)
+    except Exception as exc:
+        raise UploadError(f"Not an xlsx workbook: {exc!r}")
+    missing = [name for name in TABLES if name not in names]
+    if missing:
+        raise UploadError(f"Workbook is missing sheets: {missing}")
+    try:
+        return load_problem_sheets(contents, TABLES, use_cache=False)
+    except Exception as exc:
+        raise UploadError(f"Unreadable workbook: {exc!r}")
+
+
+def _read_member(data: bytes, suffix, filename):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    try:
+        if suffix == "parquet":
+            table = pq.read_table(pa.BufferReader(data))
+        else:
+            try:
+                table = pa.ipc.open_file(pa.BufferReader(data)).read_all()
+            except pa.ArrowInvalid:
+                table = pa.ipc.open_stream(pa.BufferReader(data)).read_all()
+        return table.to_pandas()
+    except (pa.ArrowInvalid, OSError, ValueError) as exc:
+        raise UploadError(f"Unreadable bundle member {filename}: {exc}")
+
+
+def read_bundle_tables(contents: bytes):
+    """Reads a zip of <table>.parquet / <table>.arrow members."""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(contents))
+    except zipfile.BadZipFile as exc:
+        raise UploadError(f"Not a zip bundle: {exc}")
+    members = {}
+    for info in archive.infolist():
+        stem, _, suffix = info.filename.rpartition("/")[-1].rpartition(".")
+        if stem in TABLES and suffix in ("parquet", "arrow", "feather", "ipc"):
+            members[stem] = (info.filename, suffix)
+    missing = [name for name in TABLES if name not in members]
+    if missing:
+        raise UploadError(f"Bundle is missing tables: {missing}")
+
+    tables = {}
+    for name, (filename, suffix) in members.items():
+        df = _read_member(archive.read(filename), suffix, filename)
+        if name in PRICE_TABLES:
+            df = pd.DataFrame(df.to_numpy(dtype=float).T)
+        elif name in INDEXED_TABLES:
+            df = df.set_index(df.columns[0])
+        tables[name] = df
+    return tables
+
+
+def read_json_tables(contents: bytes):
+    """Reads the JSON payload described in the module docstring."""
+    try:
+        payload = json.loads(contents)
+    except json.JSONDecodeError as exc:
+        raise UploadError(f"Invalid JSON: {exc}")
+    if not isinstance(payload, dict):
+        raise UploadError("JSON body must be an object keyed by table name")
+    missing = [name for name in TABLES if name not in payload]
+    if missing:
+        raise UploadError(f"JSON body is missing tables: {missing}")
+
+    try:
+        demand = pd.DataFrame(payload["demand"], dtype=float)
+        prices = {name: pd.DataFrame(np.asarray(payload[name], dtype=float)) for name in PRICE_TABLES}
+        supplier = pd.DataFrame(payload["supplier"])
+        capacity = pd.DataFrame(payload["capacity"], dtype=float)
+    except (TypeError, ValueError) as exc:
+        raise UploadError(f"Malformed table payload: {exc}")
+    capacity.index = range(1, len(capacity) + 1)
+    return {"demand": demand, **prices, "supplier": supplier, "capacity": capacity}
+
+
+READERS = {
+    "xlsx": read_excel_tables,
+    "bundle": read_bundle_tables,
+    "json": read_json_tables,
+}
+
+
+def detect_format(filename=None, content_type=None):
+    """Upload format from the file name or content type; defaults to xlsx."""
+    name = (filename or "").lower()
+    if name.endswith(".zip") or content_type == "application/zip":
+        return "bundle"
+    if name.endswith(".json") or content_type == "application/json":
+        return "json"
+    return "xlsx"
+
+
+def validate_tables(tables):
+    """
+    Checks the parsed tables against the schema and returns them with
+    normalized dtypes. Raises UploadError describing the first problem found.
+    """
+    demand = tables["demand"]
+    if "Actual" not in demand.columns:
+        raise UploadError("demand table needs an 'Actual' column")
+    actual = pd.to_numeric(demand["Actual"], errors="coerce").dropna()
+    T = len(actual)
+    if T == 0:
+        raise UploadError("demand.Actual has no values")
+
+    supplier = tables["supplier"]
+    missing = [c for c in ("supplier", "order_cost", "lead_time") if c not in supplier.columns]
+    if missing:
+        raise UploadError(f"supplier table is missing columns: {missing}")
+    supplier = supplier.assign(supplier=supplier["supplier"].astype(str))
+    for column in ("order_cost", "lead_time"):
+        if not pd.api.types.is_numeric_dtype(supplier[column]):
+            raise UploadError(f"supplier.{column} must be numeric")
+    if sorted(supplier["supplier"]) != ["s1", "s2"]:
+        raise UploadError("supplier table must list suppliers 's1' and 's2' (prices from p1normal and p2normal)")
+
+    capacity = tables["capacity"].rename(columns=str)
+    missing = [s for s in supplier["supplier"] if s not in capacity.columns]
+    if missing:
+        raise UploadError(f"capacity table is missing supplier columns: {missing}")
+    if not all(t in capacity.index for t in range(1, T + 1)):
+        raise UploadError(f"capacity table must cover periods 1..{T}")
+
+    for name in PRICE_TABLES:
+        prices = tables[name]
+        if len(prices) < T:
+            raise UploadError(f"{name} has {len(prices)} periods, demand has {T}")
+        if prices.shape[1] == 0 or not all(pd.api.types.is_numeric_dtype(d) for d in set(prices.dtypes)):
+            raise UploadError(f"{name} must hold one numeric column per price sample")
+
+    return {**tables, "supplier": supplier, "capacity": capacity}
+
+
+def read_upload(contents: bytes, fmt="xlsx"):
+    """Parses and validates an upload in the given format into the five tables."""
+    if fmt not in READERS:
+        raise UploadError(f"Unsupported upload format: {fmt}")
+    return validate_tables(READERS[fmt](contents))
+
+
+def encode_bundle(tables, suffix="parquet"):
+    """Writes tables to an in-memory zip bundle (the inverse of read_bundle_tables)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, df in tables.items():
+            if name in PRICE_TABLES:
+                values = df.to_numpy(dtype=float)
+                df = pd.DataFrame(values.T, columns=[f"t{t}" for t in range(values.shape[0])])
+            elif name in INDEXED_TABLES:
+                df = df.copy().reset_index()  # copy() defragments wide Excel frames
+            table = pa.Table.from_pandas(df.rename(columns=str), preserve_index=False)
+            sink = pa.BufferOutputStream()
+            if suffix == "parquet":
+                pq.write_table(table, sink)
+            else:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            archive.writestr(f"{name}.{suffix}", sink.getvalue().to_pybytes())
+    return buffer.getvalue()
+
+
+def encode_json(tables):
+    """Encodes tables as the JSON payload (the inverse of read_json_tables)."""
+    supplier = tables["supplier"]
+    return json.dumps({
+        "demand": {"Actual": [None if pd.isna(v) else float(v) for v in tables["demand"]["Actual"]]},
+        "p1normal": tables["p1normal"].to_numpy(dtype=float).tolist(),
+        "p2normal": tables["p2normal"].to_numpy(dtype=float).tolist(),
+        "supplier": {c: supplier[c].tolist() for c in ("supplier", "order_cost", "lead_time")},
+        "capacity": {str(c): tables["capacity"][c].astype(float).tolist() for c in tables["capacity"].columns},
+    }).replace("NaN", "null").encode()
+
+
+if __name__ == "__main__":
+    # Parse throughput per format for wide synthetic price sheets
+    base = read_excel_tables(open("pidsg25-02.xlsx", "rb").read())
+    T = int(base["demand"]["Actual"].notna().sum())
+    rng = np.random.default_rng(0)
+
+    for n_samples in (100, 10_000, 100_000):
+        tables = dict(base)
+        for name in ("p1normal", "p2normal"):
+            tables[name] = pd.DataFrame(rng.normal(35, 2, (T, n_samples)), index=pd.Index(range(T), name="time"))
+        payloads = {
+            "zip/parquet": ("bundle", encode_bundle(tables, "parquet")),
+            "zip/arrow": ("bundle", encode_bundle(tables, "arrow")),
+            "json": ("json", encode_json(tables)),
+        }
+        if n_samples <= 10_000:
+            buffer = io.BytesIO()
+            with pd.ExcelWriter(buffer) as writer:
+                for name, df in tables.items():
+                    df.to_excel(writer, sheet_name=name, index=name in INDEXED_TABLES)
+            payloads = {"xlsx": ("xlsx", buffer.getvalue()), **payloads}
+
+        for label, (fmt, contents) in payloads.items():
+            times = []
+            for _ in range(3):
+                start = _time.perf_counter()
+                read_upload(contents, fmt)
+                times.append(_time.perf_counter() - start)
+            print(f"N={n_samples:>6}  {label:<12} {len(contents) / 2 ** 20:8.1f} MB  {np.median(times):.3f}s")
@@ -0,0 +1,269 @@
+
+"""
+Shared, cached access to the Excel workbooks.
+
+The first load of a workbook reads the requested sheets in parallel (one process
+per sheet, for workbooks over PARALLEL_MIN_BYTES) and writes each parsed sheet to a Parquet sidecar under CACHE_DIR,
+keyed by the workbook's mtime and size (or its content hash). Later loads, in
+this or any other process, read the sidecars instead of going through openpyxl.
+Frames whose columns Parquet cannot represent (e.g. mixed-type object columns)
+fall back to a pickle sidecar. Each call returns fresh copies, so callers may
+modify the frames. Parsed sheets are also kept in an in-process LRU of
+MEMORY_MAX_ENTRIES entries.
+
+Usage:
+    tables = load_sheets("pidsg25-02.xlsx", {"demand": {"index_col": 0},
+                                             "supplier": {},
+                                             "capacity": {"index_col": 0}})
+    df = load_sheet("Production Qty (Forecast).xlsx", "Production qty (forecast)", header=1)
+"""
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.environ.get("WORKBOOK_CACHE_DIR", os.path.join(".cache", "workbooks"))
+
+# Below this size, starting worker processes costs more than parsing the sheets serially
+PARALLEL_MIN_BYTES = 1 << 20
+
+# In-process LRU over parsed sheets and sheet-name lists; each workbook version adds entries
+MEMORY_MAX_ENTRIES = int(os.environ.get("WORKBOOK_MEMORY_ENTRIES", 64))
+
+_MEMORY = OrderedDict()
+
+
+def _recall(memo_key):
+    value = _MEMORY.get(memo_key)
+    if value is not None:
+        _MEMORY.move_to_end(memo_key)
+    return value
+
+
+def _remember(memo_key, value):
+    _MEMORY[memo_key] = value
+    _MEMORY.move_to_end(memo_key)
+    while len(_MEMORY) > MEMORY_MAX_ENTRIES:
+        _MEMORY.popitem(last=False)
+
+
+def workbook_key(source, key="mtime"):
+    """
+    Cache key of a workbook path (or raw bytes).
+
+    key="mtime" uses the file's size and modification time (no read needed);
+    key="hash" uses the SHA-256 of its content. Bytes are always hashed.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    if key == "hash":
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    if key == "mtime":
+        stat = os.stat(source)
+        identity = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+    raise ValueError(f"Unsupported cache key: {key}")
+
+
+def _kwargs_tag(read_kwargs):
+    return hashlib.sha256(json.dumps(read_kwargs, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def _sidecar_stem(cache_dir, source, wb_key, sheet, read_kwargs):
+    name = "upload" if isinstance(source, (bytes, bytearray)) else os.path.splitext(os.path.basename(source))[0]
+    safe_sheet = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(sheet))
+    directory = os.path.join(cache_dir, f"{name}-{wb_key[:16]}")
+    return os.path.join(directory, f"{safe_sheet}-{_kwargs_tag(read_kwargs)}")
+
+
+def _read_sheet(source, sheet, read_kwargs):
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pd.read_excel(source, sheet_name=sheet, **read_kwargs)
+
+
+# Column labels are stored as strings in Parquet; their original types go in the metadata
+_LABEL_TYPES = {"int": int, "float": float, "str": str}
+
+
+def _encode_labels(labels):
+    encoded = []
+    for label in labels:
+        if isinstance(label, (bool, np.bool_)):
+            return None
+        if isinstance(label, (int, np.integer)):
+            encoded.append(["int", int(label)])
+        elif isinstance(label, (float, np.floating)):
+            encoded.append(["float", float(label)])
+        elif isinstance(label, str):
+            encoded.append(["str", label])
+        else:
+            return None
+    return encoded
+
+
+def _write_sidecar(stem, df):
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        pa = None
+
+    labels = _encode_labels(df.columns) if df.columns.nlevels == 1 else None
+    if pa is not None and labels is not None:
+        try:
+            table = pa.Table.from_pandas(df.set_axis([str(value) for _, value in labels], axis=1))
+            metadata = {**(table.schema.metadata or {}), b"workbook_loader.columns": json.dumps(labels).encode()}
+            tmp = f"{stem}.{os.getpid()}.parquet.tmp"
+            pq.write_table(table.replace_schema_metadata(metadata), tmp)
+            os.replace(tmp, stem + ".parquet")
+            return
+        except (pa.ArrowException, TypeError, ValueError):
+            pass  # e.g. mixed-type object columns
+
+    tmp = f"{stem}.{os.getpid()}.pkl.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, stem + ".pkl")
+
+
+def _read_sidecar(stem):
+    if os.path.exists(stem + ".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(stem + ".parquet")
+        df = table.to_pandas()
+        labels = json.loads(table.schema.metadata[b"workbook_loader.columns"])
+        df.columns = pd.Index([_LABEL_TYPES[kind](value) for kind, value in labels], dtype=object)
+        return df
+    if os.path.exists(stem + ".pkl"):
+        with open(stem + ".pkl", "rb") as f:
+            return pickle.load(f)
+    return None
+
+
+def sheet_names(source):
+    """Sheet names of a workbook path or raw bytes (memoized per path and mtime)."""
+    if isinstance(source, (bytes, bytearray)):
+        with pd.ExcelFile(io.BytesIO(source)) as xls:
+            return list(xls.sheet_names)
+    memo_key = ("sheet_names", workbook_key(source))
+    names = _recall(memo_key)
+    if names is None:
+        with pd.ExcelFile(source) as xls:
+            names = list(xls.sheet_names)
+        _remember(memo_key, names)
+    return list(names)
+
+
+def load_sheets(source, sheets=None, cache_dir=None, key="mtime", workers=None, use_cache=True):
+    """
+    Loads several sheets of a workbook through the sidecar cache.
+
+    Parameters:
+    -----------
+    source : str or bytes
+        Workbook path, or the raw bytes of an uploaded workbook.
+    sheets : list, dict or None
+        Sheet names, or {sheet name: pd.read_excel keyword arguments}. None loads
+        every sheet with default arguments.
+    cache_dir : str, optional
+        Sidecar directory, default CACHE_DIR.
+    key : str
+        "mtime" (default) or "hash", see workbook_key.
+    workers : int, optional
+        Processes used for the sheets that are not cached yet; 1 reads serially.
+    use_cache : bool
+        False parses straight from the workbook without hashing it or reading
+        or writing sidecars (e.g. for one-off uploads).
+
+    Returns:
+    --------
+    dict of {sheet name: pd.DataFrame}, in the requested order.
+    """
+    if sheets is None:
+        sheets = sheet_names(source)
+    if not isinstance(sheets, dict):
+        sheets = {name: {} for name in sheets}
+    if not use_cache:
+        # Nothing is looked up, so the workbook is not hashed
+        missing = [(sheet, read_kwargs, None) for sheet, read_kwargs in sheets.items()]
+        frames = {}
+    else:
+        cache_dir = cache_dir or CACHE_DIR
+        wb_key = workbook_key(source, key)
+        frames, missing = {}, []
+        for sheet, read_kwargs in sheets.items():
+            stem = _sidecar_stem(cache_dir, source, wb_key, sheet, read_kwargs)
+            df = _recall(stem)
+            if df is None:
+                df = _read_sidecar(stem)
+            if df is None:
+                missing.append((sheet, read_kwargs, stem))
+            else:
+                _remember(stem, df)
+                frames[sheet] = df
+
+    # Pool workers cannot start pools of their own; read serially there
+    size = len(source) if isinstance(source, (bytes, bytearray)) else os.path.getsize(source)
+    parallel = (len(missing) > 1 and workers != 1 and size >= PARALLEL_MIN_BYTES
+                and multiprocessing.parent_process() is None)
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(len(missing), workers or os.cpu_count() or 1)) as pool:
+            parsed = list(pool.map(_read_sheet, [source] * len(missing),
+                                   [sheet for sheet, _, _ in missing],
+                                   [kwargs for _, kwargs, _ in missing]))
+    else:
+        parsed = [_read_sheet(source, sheet, kwargs) for sheet, kwargs, _ in missing]
+
+    for (sheet, _, stem), df in zip(missing, parsed):
+        if use_cache:
+            try:
+                _write_sidecar(stem, df)
+            except OSError as exc:
+                print(f"Could not write sidecar for sheet {sheet}: {exc!r}")
+            _remember(stem, df)
+        frames[sheet] = df
+
+    return {sheet: frames[sheet].copy() for sheet in sheets}
+
+
+def load_sheet(source, sheet_name, cache_dir=None, key="mtime", **read_kwargs):
+    """Loads one sheet through the sidecar cache; read_kwargs go to pd.read_excel."""
+    return load_sheets(source, {sheet_name: read_kwargs}, cache_dir=cache_dir, key=key)[sheet_name]
+
+
+# read_excel arguments of the procurement workbook sheets (pidsg25*.xlsx)
+PROBLEM_SHEETS = {
+    "demand": {"index_col": 0},
+    "p1normal": {"index_col": 0},
+    "p2normal": {"index_col": 0},
+    "supplier": {},
+    "capacity": {"index_col": 0},
+}
+
+
+def load_problem_sheets(source, names=tuple(PROBLEM_SHEETS), **kwargs):
+    """Loads the named procurement workbook sheets with their usual read arguments."""
+    return load_sheets(source, {name: PROBLEM_SHEETS[name] for name in names}, **kwargs)
+
+
+def clear_cache(cache_dir=None):
+    """Drops the in-process cache and deletes the sidecar directory."""
+    import shutil
+
+    _MEMORY.clear()
+    shutil.rmtree(cache_dir or CACHE_DIR, ignore_errors=True)